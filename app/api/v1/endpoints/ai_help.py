@@ -101,7 +101,7 @@ async def stock_financial_data_aggregation(
         country_code = investing_info["country_code"]
         investing_code = investing_info["exchange_code"]
         try:
-            translations = await run_in_threadpool(InvestingService.get_translations, req.stock_symbol, [country_code])
+            translations = await InvestingService.get_translations_async(req.stock_symbol, [country_code])
             # 过滤逻辑
             filtered_quotes = []
             if "quotes" in translations and isinstance(translations["quotes"], list):
@@ -1,7 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from typing import List, Dict, Any
+import pandas as pd
 from app.services.google_service import GoogleService
-from app.schemas.response import BaseResponse
+from app.services.ohlcv_serializer import records_to_columns, columns_to_arrow_ipc, ARROW_STREAM_MEDIA_TYPE
+from app.schemas.response import BaseResponse, HistoryResponseFormat
 from app.schemas.google import (
     GoogleSearchRequest, GoogleSearchResponse,
     GoogleDetailRequest, GoogleDetailResponse,
@@ -12,13 +14,15 @@ from app.schemas.google import (
 
 router = APIRouter()
 
+GOOGLE_HISTORY_FIELDS = ["date", "close", "volume"]
+
 @router.post("/search", response_model=BaseResponse, summary="Google Finance 搜索股票")
 async def search(request: GoogleSearchRequest):
     """
     搜索股票，返回匹配的代码、交易所和名称。
     """
     try:
-        results = GoogleService.search(request.query)
+        results = await GoogleService.search_async(request.query)
         # Map raw dicts to Response Model manually or let Pydantic handle it if keys match
         # GoogleService returns dicts with 'symbol', 'exchange', 'name' etc.
         # Ensure 'code' maps to 'symbol' or update schema
@@ -45,7 +49,7 @@ async def get_detail(request: GoogleDetailRequest):
     获取单个股票的实时行情数据。
     """
     try:
-        data = GoogleService.get_detail(request.symbol, request.exchange)
+        data = await GoogleService.get_detail_async(request.symbol, request.exchange)
         # Service returns 'symbol', Schema uses 'code'.
         if data:
             data['code'] = data.pop('symbol', None)
@@ -61,7 +65,7 @@ async def get_details(request: GoogleDetailsRequest):
     try:
         # Convert Pydantic models to dict list
         items = [{"symbol": item.symbol, "exchange": item.exchange} for item in request.symbols]
-        results = GoogleService.get_details(items)
+        results = await GoogleService.get_details_async(items)
         
         mapped_results = []
         for data in results:
@@ -79,9 +83,16 @@ async def get_details(request: GoogleDetailsRequest):
 async def get_history(request: GoogleHistoryRequest):
     """
     获取股票历史K线数据 (Simple Format: Date, Close, Volume)。
+    format=columnar 返回按字段的数组，format=arrow 直接返回 Arrow IPC 二进制流。
     """
     try:
-        data = GoogleService.get_history(request.symbol, request.exchange, request.range.value)
+        data = await GoogleService.get_history_async(request.symbol, request.exchange, request.range.value)
+        if request.format == HistoryResponseFormat.arrow:
+            columns = records_to_columns(data, GOOGLE_HISTORY_FIELDS)
+            columns["date"] = pd.to_datetime(columns["date"], utc=True)
+            return Response(content=columns_to_arrow_ipc(columns), media_type=ARROW_STREAM_MEDIA_TYPE)
+        if request.format == HistoryResponseFormat.columnar:
+            data = records_to_columns(data, GOOGLE_HISTORY_FIELDS)
         return BaseResponse.success(data={
             "symbol": request.symbol,
             "exchange": request.exchange,
@@ -97,7 +108,7 @@ async def scrape_quote(request: GoogleScrapeRequest):
     直接从 Google Finance 网页爬取数据 (包含价格、统计信息、简介、同行比较)。
     """
     try:
-        data = GoogleService.scrape_quote(request.symbol, request.exchange)
+        data = await GoogleService.scrape_quote_async(request.symbol, request.exchange)
         return BaseResponse.success(data=data)
     except Exception as e:
         raise e
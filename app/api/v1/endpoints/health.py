@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from app.schemas.response import BaseResponse
+from app.core.metrics import collect_metrics
 
 router = APIRouter()
 
@@ -9,3 +10,10 @@ async def health_check():
     检查服务是否运行正常
     """
     return BaseResponse.success(data={"status": "ok", "message": "Service is running"})
+
+@router.post("/metrics", response_model=BaseResponse, summary="运行时指标", tags=["Health"])
+async def get_metrics():
+    """
+    获取运行时指标快照 (数据库连接池等)
+    """
+    return BaseResponse.success(data=collect_metrics())
@@ -23,7 +23,7 @@ async def search_investing(request: SearchRequest):
     - **country_code**: Optional domain ID to filter results (header: domain-id)
     """
     try:
-        results = InvestingService.search(keyword=request.keyword, country_code=request.country_code)
+        results = await InvestingService.search_async(keyword=request.keyword, country_code=request.country_code)
         return BaseResponse.success(data=results)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -34,7 +34,7 @@ async def get_translations(request: TranslationsRequest):
     Get translations for a stock symbol.
     """
     try:
-        data = InvestingService.get_translations(request.symbol, request.country_codes)
+        data = await InvestingService.get_translations_async(request.symbol, request.country_codes)
         return BaseResponse.success(data=data)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException
-from app.services.tradingview.core import TA_Handler, TradingView, get_multiple_analysis
+from app.services.tradingview.core import TA_Handler, TradingView, get_multiple_analysis_async
 from app.schemas.response import BaseResponse
 from app.schemas.tradingview import AnalysisRequest, MultipleAnalysisRequest, SearchRequest
 import logging
@@ -18,7 +18,7 @@ async def get_analysis(request: AnalysisRequest):
             screener=request.screener.value, # Enum value
             interval=request.interval.value
         )
-        analysis = handler.get_analysis()
+        analysis = await handler.get_analysis_async()
         
         data = {
             "symbol": analysis.symbol,
@@ -41,9 +41,11 @@ async def get_analysis(request: AnalysisRequest):
 async def get_analysis_multiple(request: MultipleAnalysisRequest):
     """
     获取多个股票的技术分析数据。
+    股票按 TRADINGVIEW_SCAN_CHUNK_SIZE 分组并发请求 (TRADINGVIEW_SCAN_CONCURRENCY)，失败的分组单独重试，
+    仍失败的分组对应股票返回 null。
     """
     try:
-        results = get_multiple_analysis(
+        results = await get_multiple_analysis_async(
             symbols=request.symbols,
             screener=request.screener.value,
             interval=request.interval.value
@@ -74,7 +76,7 @@ async def search_symbols(request: SearchRequest):
     搜索股票，返回 Symbol, Exchange, Type 等信息。
     """
     try:
-        results = TradingView.search(request.text, request.type)
+        results = await TradingView.search_async(request.text, request.type)
         return BaseResponse.success(data=results)
     except Exception as e:
         raise e
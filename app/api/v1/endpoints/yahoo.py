@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Dict, Any
 from app.services.yahoo_service import YahooService
-from app.schemas.response import BaseResponse
+from app.core.executor import yahoo_executor
+from app.schemas.response import BaseResponse, HistoryResponseFormat
+from app.services.ohlcv_serializer import ARROW_STREAM_MEDIA_TYPE
 from app.schemas.yahoo import (
     YahooInfoRequest, 
     YahooLatestPriceRequest,
@@ -18,7 +21,9 @@ from app.schemas.yahoo import (
     StockBaseDataRequestItem,
     StockBaseDataBatchRequest,
     StockBaseDataResponseItem,
-    YahooLatestPriceResponse
+    YahooLatestPriceResponse,
+    YahooBatchLatestPriceRequest,
+    YahooBatchLatestPriceResponseItem
 )
 
 router = APIRouter()
@@ -29,7 +34,7 @@ async def get_ticker_info(request: YahooInfoRequest):
     获取单个股票的基本面详细信息。
     """
     try:
-        data = YahooService.get_ticker_info(request.symbol)
+        data = await yahoo_executor.run("info", YahooService.get_ticker_info, request.symbol)
         return BaseResponse.success(data=data)
     except Exception as e:
         raise e
@@ -45,15 +50,26 @@ async def get_stock_latest_price(request: YahooLatestPriceRequest):
         yahoo_info = get_stock_info(request.stock_symbol, request.exchange_acronym, PLATFORM_YAHOO)
         yahoo_symbol = yahoo_info["stock_symbol"] if yahoo_info else request.stock_symbol
         
-        data = YahooService.get_stock_latest_price(yahoo_symbol)
+        data = await yahoo_executor.run("latest_price", YahooService.get_stock_latest_price, yahoo_symbol)
         return BaseResponse.success(data=data)
     except Exception as e:
         raise e
 
+@router.post("/batch/latest_price", response_model=BaseResponse[List[YahooBatchLatestPriceResponseItem]], summary="批量获取最新常规市场价格")
+async def get_batch_latest_price(request: YahooBatchLatestPriceRequest):
+    """
+    批量查询最新常规市场价格 (Price, Change, Time)，结果顺序与请求一致。
+    未缓存的股票按 YAHOO_QUOTE_BATCH_SIZE 分组，每组一次上游行情请求；结果短暂缓存 (L1_CACHE_TTLS["quote"])。
+    """
+    items_dicts = [item.model_dump() for item in request.stock_list]
+    data = await yahoo_executor.run("latest_price", YahooService.get_batch_latest_price, items_dicts)
+    return BaseResponse.success(data=data)
+
 @router.post("/history", response_model=BaseResponse, summary="获取历史K线数据")
 async def get_history(request: YahooHistoryRequest):
     """
     获取股票的历史市场数据。
+    format=columnar 返回按字段的数组，format=arrow 直接返回 Arrow IPC 二进制流。
     """
     try:
         from app.core.constants import get_stock_info, PLATFORM_YAHOO
@@ -61,13 +77,18 @@ async def get_history(request: YahooHistoryRequest):
         yahoo_info = get_stock_info(request.stock_symbol, request.exchange_acronym, PLATFORM_YAHOO)
         yahoo_symbol = yahoo_info["stock_symbol"] if yahoo_info else request.stock_symbol
         
-        data = YahooService.get_history(
+        data = await yahoo_executor.run(
+            "history",
+            YahooService.get_history,
             symbol=yahoo_symbol, 
             period=request.period.value, 
             interval=request.interval.value, 
             auto_adjust=request.auto_adjust,
-            repair=request.repair
+            repair=request.repair,
+            output=request.format.value
         )
+        if request.format == HistoryResponseFormat.arrow:
+            return Response(content=data, media_type=ARROW_STREAM_MEDIA_TYPE)
         return BaseResponse.success(data=data)
     except Exception as e:
         raise e
@@ -82,7 +103,7 @@ async def get_financials(request: YahooFinancialsRequest):
         yahoo_info = get_stock_info(request.stock_symbol, request.exchange_acronym, PLATFORM_YAHOO)
         yahoo_symbol = yahoo_info["stock_symbol"] if yahoo_info else request.stock_symbol
 
-        data = YahooService.get_financials(yahoo_symbol, request.type.value, request.freq.value)
+        data = await yahoo_executor.run("financials", YahooService.get_financials, yahoo_symbol, request.type.value, request.freq.value)
         return BaseResponse.success(data=data)
     except Exception as e:
         raise e
@@ -93,7 +114,7 @@ async def search_tickers(request: YahooSearchRequest):
     搜索股票代码。
     """
     try:
-        results = YahooService.search_tickers(request.query)
+        results = await yahoo_executor.run("search", YahooService.search_tickers, request.query)
         return BaseResponse.success(data={
             "query": request.query,
             "count": len(results),
@@ -112,7 +133,7 @@ async def get_news(request: YahooNewsRequest):
         yahoo_info = get_stock_info(request.stock_symbol, request.exchange_acronym, PLATFORM_YAHOO)
         yahoo_symbol = yahoo_info["stock_symbol"] if yahoo_info else request.stock_symbol
 
-        data = YahooService.get_news(yahoo_symbol)
+        data = await yahoo_executor.run("news", YahooService.get_news, yahoo_symbol)
         return BaseResponse.success(data=data)
     except Exception as e:
         raise e
@@ -123,7 +144,7 @@ async def get_holders(request: YahooHoldersRequest):
     获取主要股东、机构股东和公募基金持仓数据。
     """
     try:
-        data = YahooService.get_holders(request.symbol)
+        data = await yahoo_executor.run("holders", YahooService.get_holders, request.symbol)
         return BaseResponse.success(data=data)
     except Exception as e:
         raise e
@@ -134,7 +155,7 @@ async def get_analysis(request: YahooAnalysisRequest):
     获取分析师评级、目标价、升级/降级记录。
     """
     try:
-        data = YahooService.get_analysis(request.symbol)
+        data = await yahoo_executor.run("analysis", YahooService.get_analysis, request.symbol)
         return BaseResponse.success(data=data)
     except Exception as e:
         raise e
@@ -145,7 +166,7 @@ async def get_calendar(request: YahooCalendarRequest):
     获取公司财报日历、分红日等。
     """
     try:
-        data = YahooService.get_calendar(request.symbol)
+        data = await yahoo_executor.run("calendar", YahooService.get_calendar, request.symbol)
         return BaseResponse.success(data=data)
     except Exception as e:
         raise e
@@ -156,7 +177,7 @@ async def get_splits(request: YahooSplitsRequest):
     获取股票的历史拆分记录。
     """
     try:
-        data = YahooService.get_splits(request.symbol, request.period.value)
+        data = await yahoo_executor.run("splits", YahooService.get_splits, request.symbol, request.period.value)
         return BaseResponse.success(data=data)
     except Exception as e:
         raise e
@@ -167,7 +188,7 @@ async def get_dividends(request: YahooDividendsRequest):
     获取股票的历史分红记录。
     """
     try:
-        data = YahooService.get_dividends(request.symbol, request.period.value)
+        data = await yahoo_executor.run("dividends", YahooService.get_dividends, request.symbol, request.period.value)
         return BaseResponse.success(data=data)
     except Exception as e:
         raise e
@@ -182,20 +203,37 @@ async def get_batch_stock_base_data(request: StockBaseDataBatchRequest):
         items_dicts = [item.model_dump() for item in request.stock_list]
         is_return_history = request.is_return_history
         
-        # Run in threadpool
-        data = await run_in_threadpool(YahooService.get_batch_stock_base_data, items_dicts, is_return_history)
+        data = await YahooService.get_batch_stock_base_data_async(items_dicts, is_return_history, request.history_format.value)
         return BaseResponse.success(data=data)
     except Exception as e:
         logger.error(f"Error in get_batch_stock_base_data: {e}")
         raise e
 
+@router.post("/batch/get_stock_base_data/stream", summary="批量获取股票基础数据 (NDJSON 流式)")
+async def stream_batch_stock_base_data(request: StockBaseDataBatchRequest):
+    """
+    与 /batch/get_stock_base_data 参数相同，但以 NDJSON (application/x-ndjson) 流式返回：
+    每只股票处理完成后立即输出一行 StockBaseDataResponseItem，顺序为完成顺序而非请求顺序。
+    """
+    items_dicts = [item.model_dump() for item in request.stock_list]
+
+    async def ndjson_lines():
+        async for item in YahooService.iter_batch_stock_base_data_async(
+            items_dicts, request.is_return_history, request.history_format.value
+        ):
+            yield StockBaseDataResponseItem.model_validate(item).model_dump_json() + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
 @router.post("/rank/market_actives", response_model=BaseResponse, summary="获取活跃股票排行")
 async def get_market_actives(request: YahooMarketActivesRequest):
     """
     获取不同国家地区最活跃的股票列表 (基于交易量排序)。
     """
     try:
-        data = YahooService.get_active_stocks(
+        data = await yahoo_executor.run(
+            "market_actives",
+            YahooService.get_active_stocks,
             regions=request.regions,
             min_intraday_market_cap=request.minIntradayMarketCap,
             min_day_volume=request.minDayVolume,
@@ -237,7 +275,7 @@ async def yahoo_web_crawler(req: StockFinancialDataAggregationReq):
         # User output example implies strictness, but let's be flexible for crawler testing.
         yahoo_symbol = yahoo_info["stock_symbol"] if yahoo_info else req.stock_symbol
 
-        raw_data = await run_in_threadpool(YahooService.web_crawler, yahoo_symbol)
+        raw_data = await YahooService.web_crawler_async(yahoo_symbol)
         
         if not raw_data:
             return BaseResponse.success({
@@ -302,7 +340,7 @@ async def yahoo_web_crawler(req: StockFinancialDataAggregationReq):
 @router.post("/yahoo_stock_related", response_model=BaseResponse[YahooStockRelatedResponse], summary="获取关联股票 (Enriched)", description="从数据库或爬虫获取关联股票数据")
 async def yahoo_stock_related(req: StockFinancialDataAggregationReq):
     try:
-        data = await run_in_threadpool(YahooService.get_related_stock, req.stock_symbol, req.exchange_acronym)
+        data = await YahooService.get_related_stock_async(req.stock_symbol, req.exchange_acronym)
         return BaseResponse.success(data=data)
     except Exception as e:
         logger.error(f"Error in yahoo_stock_related: {e}")
@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+import aiomysql
+
+from app.core.config import settings
+from app.core.metrics import register_metrics_source
+from app.core.cache import get_cache
+from app.core.sql_instrumentation import record_statement
+
+logger = logging.getLogger("fastapi")
+
+
+class InstrumentedDictCursor(aiomysql.DictCursor):
+    """aiomysql counterpart of database.LoggingCursor: same histograms, same lazy/sampled logging."""
+
+    async def execute(self, query, args=None):
+        start = time.perf_counter()
+        try:
+            result = await super().execute(query, args)
+        except Exception:
+            record_statement(query, args, (time.perf_counter() - start) * 1000, error=True)
+            raise
+        record_statement(query, args, (time.perf_counter() - start) * 1000)
+        return result
+
+
+class AsyncDBManager:
+    """
+    asyncio-native counterpart of DBManager for code running on the event loop.
+    Mirrors the DBManager cache/log methods (same names, same return values and
+    the same "log and return a default" error handling).
+    Table DDL stays in DBManager.init_db().
+    """
+    _pool: Optional[aiomysql.Pool] = None
+    _pool_lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    async def get_pool(cls) -> aiomysql.Pool:
+        if cls._pool is None:
+            if cls._pool_lock is None:
+                cls._pool_lock = asyncio.Lock()
+            async with cls._pool_lock:
+                if cls._pool is None:
+                    cls._pool = await aiomysql.create_pool(
+                        host=settings.MYSQL_SERVER,
+                        port=settings.MYSQL_PORT,
+                        user=settings.MYSQL_USER,
+                        password=settings.MYSQL_PASSWORD,
+                        db=settings.MYSQL_DB,
+                        charset='utf8mb4',
+                        cursorclass=InstrumentedDictCursor,
+                        # Autocommit: every statement here is standalone, and aiomysql
+                        # closes (rather than reuses) connections released mid-transaction.
+                        autocommit=True,
+                        init_command='SET time_zone = "+08:00"',
+                        minsize=0,
+                        maxsize=settings.MYSQL_POOL_SIZE,
+                        pool_recycle=settings.MYSQL_POOL_RECYCLE
+                    )
+                    register_metrics_source("mysql_async_pool", cls.pool_stats)
+        return cls._pool
+
+    @classmethod
+    def pool_stats(cls) -> Dict[str, Any]:
+        pool = cls._pool
+        if pool is None:
+            return {"size": 0, "idle": 0, "max_size": settings.MYSQL_POOL_SIZE}
+        return {
+            "size": pool.size,
+            "idle": pool.freesize,
+            "in_use": pool.size - pool.freesize,
+            "max_size": pool.maxsize
+        }
+
+    @classmethod
+    async def close_pool(cls):
+        if cls._pool is not None:
+            cls._pool.close()
+            await cls._pool.wait_closed()
+            cls._pool = None
+
+    @classmethod
+    @asynccontextmanager
+    async def cursor(cls):
+        pool = await cls.get_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                yield cursor
+
+    # --- Job Logging Methods ---
+
+    @classmethod
+    async def log_job_start(cls, job_id: str, job_name: str) -> int:
+        try:
+            async with cls.cursor() as cursor:
+                await cursor.execute("""
+                    INSERT INTO fast_finance_job_execution_logs (job_id, job_name, status, start_time)
+                    VALUES (%s, %s, 'RUNNING', %s)
+                """, (job_id, job_name, datetime.now()))
+                return cursor.lastrowid
+        except Exception as e:
+            logger.error(f"Error logging job start: {e}")
+            return -1
+
+    @classmethod
+    async def log_job_finish(cls, log_id: int, status: str, message: str = ""):
+        if log_id < 0:
+            return
+
+        try:
+            async with cls.cursor() as cursor:
+                now = datetime.now()
+                await cursor.execute("SELECT start_time FROM fast_finance_job_execution_logs WHERE id = %s", (log_id,))
+                row = await cursor.fetchone()
+                start_time = None
+                if row:
+                    if isinstance(row['start_time'], str):
+                        try:
+                            start_time = datetime.fromisoformat(row['start_time'])
+                        except ValueError:
+                            pass
+                    else:
+                        start_time = row['start_time']
+
+                duration = (now - start_time).total_seconds() if start_time else 0.0
+
+                await cursor.execute("""
+                    UPDATE fast_finance_job_execution_logs
+                    SET status = %s, end_time = %s, duration_seconds = %s, message = %s
+                    WHERE id = %s
+                """, (status, now, duration, message, log_id))
+        except Exception as e:
+            logger.error(f"Error logging job finish: {e}")
+
+    @classmethod
+    async def get_job_logs(cls, limit: int = 50) -> List[Dict[str, Any]]:
+        try:
+            async with cls.cursor() as cursor:
+                await cursor.execute("SELECT * FROM fast_finance_job_execution_logs ORDER BY id DESC LIMIT %s", (limit,))
+                return list(await cursor.fetchall())
+        except Exception as e:
+            logger.error(f"Error getting job logs: {e}")
+            return []
+
+    # --- History Cache Methods ---
+
+    @classmethod
+    async def get_history_cache(cls, cache_key: str) -> Optional[Union[bytes, str]]:
+        cached = get_cache("history").get(cache_key)
+        if cached is not None:
+            return cached
+        try:
+            async with cls.cursor() as cursor:
+                await cursor.execute("SELECT data, data_bin FROM fast_finance_stock_history_cache WHERE cache_key = %s", (cache_key,))
+                row = await cursor.fetchone()
+                if not row:
+                    return None
+                data = row['data_bin'] if row['data_bin'] is not None else row['data']
+                get_cache("history").set(cache_key, data)
+                return data
+        except Exception as e:
+            logger.error(f"Error getting history cache: {e}")
+            return None
+
+    @classmethod
+    async def upsert_history_cache(cls, cache_key: str, data: Union[bytes, str]):
+        try:
+            data_text, data_bin = (None, data) if isinstance(data, (bytes, bytearray)) else (data, None)
+            async with cls.cursor() as cursor:
+                await cursor.execute("""
+                    INSERT INTO fast_finance_stock_history_cache (cache_key, data, data_bin)
+                    VALUES (%s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        data=VALUES(data),
+                        data_bin=VALUES(data_bin)
+                """, (cache_key, data_text, data_bin))
+            get_cache("history").set(cache_key, data)
+        except Exception as e:
+            get_cache("history").invalidate(cache_key)
+            logger.error(f"Error upserting history cache: {e}")
+
+    # --- Analysis Cache Methods ---
+
+    @classmethod
+    async def get_analysis_cache(cls, symbol: str) -> Optional[Dict[str, Any]]:
+        cached = get_cache("analysis").get(symbol)
+        if cached is not None:
+            return cached
+        try:
+            async with cls.cursor() as cursor:
+                await cursor.execute("SELECT data, update_time FROM fast_finance_yahoo_analysis_cache WHERE symbol = %s", (symbol,))
+                row = await cursor.fetchone()
+                if row:
+                    cached = {
+                        "data": row["data"],
+                        "updated_at": row["update_time"]
+                    }
+                    get_cache("analysis").set(symbol, cached)
+                    return cached
+                return None
+        except Exception as e:
+            logger.error(f"Error getting analysis cache for {symbol}: {e}")
+            return None
+
+    @classmethod
+    async def upsert_analysis_cache(cls, symbol: str, data: str):
+        try:
+            async with cls.cursor() as cursor:
+                await cursor.execute("""
+                    INSERT INTO fast_finance_yahoo_analysis_cache (symbol, data)
+                    VALUES (%s, %s)
+                    ON DUPLICATE KEY UPDATE data=VALUES(data), update_time=CURRENT_TIMESTAMP
+                """, (symbol, data))
+        except Exception as e:
+            logger.error(f"Error upserting analysis cache for {symbol}: {e}")
+        finally:
+            get_cache("analysis").invalidate(symbol)
+
+    # --- Yahoo Stock Methods ---
+
+    @classmethod
+    async def get_yahoo_stock_by_symbols(cls, yahoo_symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not yahoo_symbols:
+            return {}
+        try:
+            placeholders = ','.join(['%s'] * len(yahoo_symbols))
+            sql = f"SELECT * FROM fast_finance_yahoo_stock WHERE yahoo_stock_symbol IN ({placeholders})"
+            async with cls.cursor() as cursor:
+                await cursor.execute(sql, yahoo_symbols)
+                rows = await cursor.fetchall()
+
+            return {row['yahoo_stock_symbol']: row for row in rows}
+        except Exception as e:
+            logger.error(f"Error getting yahoo stocks by symbols: {e}")
+            return {}
+
+    @classmethod
+    async def get_yahoo_stock_related_cache(cls, symbol: str) -> Optional[Dict[str, Any]]:
+        cached = get_cache("related").get(symbol)
+        if cached is not None:
+            return cached
+        try:
+            async with cls.cursor() as cursor:
+                await cursor.execute("SELECT data, update_time FROM fast_finance_yahoo_stock_related_cache WHERE symbol = %s", (symbol,))
+                row = await cursor.fetchone()
+                if row:
+                    cached = {
+                        "data": row["data"],
+                        "updated_at": row["update_time"]
+                    }
+                    get_cache("related").set(symbol, cached)
+                    return cached
+                return None
+        except Exception as e:
+            logger.error(f"Error getting related cache for {symbol}: {e}")
+            return None
+
+    @classmethod
+    async def upsert_yahoo_stock_related_cache(cls, symbol: str, data: str):
+        try:
+            async with cls.cursor() as cursor:
+                await cursor.execute("""
+                    INSERT INTO fast_finance_yahoo_stock_related_cache (symbol, data)
+                    VALUES (%s, %s)
+                    ON DUPLICATE KEY UPDATE data=VALUES(data), update_time=CURRENT_TIMESTAMP
+                """, (symbol, data))
+        except Exception as e:
+            logger.error(f"Error upserting related cache for {symbol}: {e}")
+        finally:
+            get_cache("related").invalidate(symbol)
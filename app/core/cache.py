@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.config import settings
+from app.core.metrics import register_metrics_source
+
+_MISSING = object()
+
+
+def _weigh(value: Any) -> int:
+    # Approximate payload size; only used for the per-namespace byte budget
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_weigh(v) for v in value.values()) + 64
+    return 64
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache with per-entry expiry.
+
+    Bounded by entry count and by an approximate byte budget (len() of str/bytes payloads);
+    the least recently used entries are evicted first. Cached values are shared between
+    callers and must be treated as read-only.
+
+    With `stale_ttl`, expired entries are kept that much longer: get() misses on them as
+    usual, get_stale() still returns them (last known value while the upstream is down).
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int, max_bytes: int, stale_ttl: float = 0.0):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, expires_at, weight)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0, "sets": 0, "stale_hits": 0}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self._stats["misses"] += 1
+                return default
+            value, expires_at, weight = entry
+            if expires_at <= now:
+                if expires_at + self.stale_ttl <= now:
+                    self._remove(key, weight)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def get_stale(self, key: Hashable, default: Any = None) -> Any:
+        """Value of an entry, expired or not, as long as it is within stale_ttl past expiry."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[1] + self.stale_ttl <= now:
+                return default
+            self._stats["stale_hits"] += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        if value is None:
+            return
+        weight = _weigh(value)
+        if self.max_bytes and weight > self.max_bytes:
+            self.invalidate(key)
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (value, expires_at, weight)
+            self._bytes += weight
+            self._stats["sets"] += 1
+            while len(self._data) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                old_key, (_, _, old_weight) = next(iter(self._data.items()))
+                self._remove(old_key, old_weight)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._remove(key, entry[2])
+                self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["entries"] = len(self._data)
+            snapshot["bytes"] = self._bytes
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_ratio"] = snapshot["hits"] / lookups if lookups else 0.0
+        snapshot["ttl"] = self.ttl
+        snapshot["stale_ttl"] = self.stale_ttl
+        return snapshot
+
+    def _remove(self, key: Hashable, weight: int):
+        del self._data[key]
+        self._bytes -= weight
+
+
+class _DisabledCache(TTLCache):
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        pass
+
+
+_caches: Dict[str, TTLCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str) -> TTLCache:
+    """
+    L1 cache for a namespace ("history", "analysis", "related" ...), created on first use.
+    TTL comes from settings.L1_CACHE_TTLS (fallback L1_CACHE_DEFAULT_TTL).
+    """
+    cache = _caches.get(namespace)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(namespace)
+            if cache is None:
+                cls = TTLCache if settings.L1_CACHE_ENABLED else _DisabledCache
+                cache = _caches[namespace] = cls(
+                    name=namespace,
+                    ttl=settings.L1_CACHE_TTLS.get(namespace, settings.L1_CACHE_DEFAULT_TTL),
+                    max_entries=settings.L1_CACHE_MAX_ENTRIES,
+                    max_bytes=settings.L1_CACHE_MAX_BYTES,
+                    stale_ttl=settings.L1_CACHE_STALE_TTLS.get(namespace, 0.0)
+                )
+    return cache
+
+
+def cache_stats() -> Dict[str, Any]:
+    with _caches_lock:
+        caches = list(_caches.items())
+    return {name: cache.stats() for name, cache in caches}
+
+
+register_metrics_source("l1_cache", cache_stats)
@@ -1,6 +1,6 @@
 import logging
 import sys
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 
 from pydantic import AnyHttpUrl, EmailStr, validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -20,6 +20,26 @@ class Settings(BaseSettings):
     PROXY_INVESTING: Optional[str] = None
     PROXY_GOOGLE: Optional[str] = None
 
+    # 上游 HTTP 连接 (每个数据源一个共享 Session，见 app/core/http_client.py)
+    HTTP_TIMEOUT: float = 10.0  # 未指定超时的请求的默认超时 (秒)
+    HTTP_POOL_CONNECTIONS: int = 10  # 每个 Session 缓存连接池的主机数
+    HTTP_POOL_MAXSIZE: int = 16  # 每个主机保持的最大连接数
+    HTTP_POOL_BLOCK: bool = True  # 连接用尽时等待空闲连接，而不是临时新建
+    HTTP_RETRIES: int = 2  # 连接错误与 5xx 的重试次数 (429/403 不重试)
+    HTTP_RETRY_BACKOFF: float = 0.5  # 重试退避基数 (秒)，按 0.5, 1, 2 ... 递增
+    HTTP2_ENABLED: bool = True  # 异步客户端启用 HTTP/2 (需安装 h2，否则回退 HTTP/1.1)
+    HTTP_ASYNC_MAX_CONNECTIONS: int = 50  # 每个数据源异步客户端的最大连接数
+
+    # 上游限流与熔断 (每个数据源一个自适应令牌桶 + 熔断器，见 app/core/provider_guard.py)
+    PROVIDER_RATE_LIMITS: Dict[str, float] = {"tradingview": 5.0, "investing": 2.0, "google": 5.0, "yahoo": 5.0}  # 按数据源的请求速率 (次/秒)，0 为不限
+    PROVIDER_RATE_DEFAULT: float = 5.0  # 未单独配置的数据源的请求速率 (次/秒)
+    PROVIDER_RATE_BURST: int = 10  # 允许的突发请求数
+    PROVIDER_RATE_MIN: float = 0.2  # 收到 429/403 后降速的下限 (次/秒)，成功请求逐步恢复
+    PROVIDER_THROTTLE_HOLD: float = 5.0  # 429/403 未带 Retry-After 时暂停该数据源的秒数
+    PROVIDER_RATE_MAX_WAIT: float = 10.0  # 等待令牌的最长秒数，超过则直接失败 (503000)
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # 连续失败 (429/403、5xx、连接错误) 多少次后熔断
+    CIRCUIT_RESET_TIMEOUT: float = 30.0  # 熔断持续秒数，之后放行一个探测请求
+
     @validator("BACKEND_CORS_ORIGINS", pre=True)
     def assemble_cors_origins(cls, v: str | list[str]) -> list[str] | str:
         if isinstance(v, str) and not v.startswith("["):
@@ -43,6 +63,73 @@ class Settings(BaseSettings):
     MYSQL_DB: str = "fast_finance"
     MYSQL_PORT: int = 3306
 
+    # MySQL 连接池设置
+    MYSQL_POOL_SIZE: int = 10  # 最大连接数 (空闲 + 使用中)
+    MYSQL_POOL_TIMEOUT: float = 10.0  # 等待空闲连接的最长秒数
+    MYSQL_POOL_RECYCLE: int = 3600  # 连接最长存活秒数，超过后重建
+    MYSQL_POOL_PING_INTERVAL: int = 30  # 空闲超过该秒数的连接在复用前先 ping
+
+    # SQL 日志与耗时统计 (耗时直方图见 /system/metrics 的 "sql")
+    SQL_LOG_LEVEL: str = "DEBUG"  # SQL 语句日志级别，默认 DEBUG 即在 INFO 日志下不输出
+    SQL_LOG_SAMPLE_RATE: float = 1.0  # 输出 SQL 日志的采样比例 (0~1)
+    SQL_LOG_SLOW_MS: float = 500.0  # 慢 SQL 阈值 (毫秒)，超过时总以 WARNING 输出
+    SQL_LOG_MAX_QUERY_LENGTH: int = 1000  # 日志中 SQL 文本的最大长度
+    SQL_LOG_MAX_ARG_LENGTH: int = 200  # 日志中单个参数的最大长度 (二进制参数只记录字节数)
+
+    # 批量写入 (executemany，分块提交)
+    DB_BULK_CHUNK_SIZE: int = 1000  # 每个事务写入的最大行数，中途失败时之前的分块已提交
+
+    # Yahoo 上游调用线程池 (阻塞的 yfinance 调用不在事件循环里执行)
+    YAHOO_EXECUTOR_WORKERS: int = 32  # 专用线程数
+    YAHOO_ROUTE_CONCURRENCY: int = 8  # 每个路由同时占用的线程上限 (批量基础数据接口共用 "batch" 路由)
+    YAHOO_ROUTE_CONCURRENCY_OVERRIDES: Dict[str, int] = {"market_actives": 2}  # 按路由覆盖
+    YAHOO_ROUTE_MAX_WAITING: int = 64  # 每个路由排队上限，超过直接返回 503000
+    YAHOO_UPSTREAM_TIMEOUT: float = 30.0  # 单次请求等待上游的最长秒数，超时返回 504000
+    YAHOO_BATCH_WORKERS: int = 8  # 批量基础数据接口并发处理的股票数
+    YAHOO_BATCH_SYMBOL_TIMEOUT: float = 20.0  # 批量接口单只股票的最长处理秒数，超时返回空条目
+    YAHOO_QUOTE_BATCH_SIZE: int = 100  # 批量最新价格接口每次上游行情请求的股票数
+
+    # Yahoo 股票全量同步 (yf.screen)
+    YAHOO_SYNC_EXCHANGE_CONCURRENCY: int = 4  # 同时同步的交易所数
+    YAHOO_SYNC_PAGE_SIZE: int = 100  # 初始分页大小
+    YAHOO_SYNC_MIN_PAGE_SIZE: int = 25  # 自适应分页下限
+    YAHOO_SYNC_MAX_PAGE_SIZE: int = 250  # 自适应分页上限 (Yahoo screener 单页最多 250)
+    YAHOO_SYNC_TARGET_LATENCY: float = 3.0  # 单页响应快于该秒数时加大分页，慢于两倍时减半
+    YAHOO_SYNC_MAX_RETRIES: int = 3  # 单页连续失败重试次数，超过后放弃该交易所
+    YAHOO_SYNC_WRITE_QUEUE_SIZE: int = 16  # 待写库批次队列上限 (写库跟不上时抓取暂停)
+
+    # TradingView 批量技术分析 (/tradingview/analysis/multiple)
+    TRADINGVIEW_SCAN_CHUNK_SIZE: int = 200  # 每次 scanner 请求的股票数，超出则分组
+    TRADINGVIEW_SCAN_CONCURRENCY: int = 4  # 同时请求的分组数 (仍受 PROVIDER_RATE_LIMITS["tradingview"] 限速)
+    TRADINGVIEW_SCAN_CHUNK_RETRIES: int = 2  # 单个分组超时或被限流 (429) 时的重试次数 (5xx 已由 HTTP_RETRIES 重试)
+
+    # TradingView 股票全量同步
+    TRADINGVIEW_SYNC_FETCH_WORKERS: int = 4  # 同时抓取的交易所数
+    TRADINGVIEW_SYNC_QUEUE_SIZE: int = 8  # 待写库页队列上限 (写库跟不上时抓取暂停)
+    TRADINGVIEW_SYNC_WRITE_BATCH: int = 2000  # 每次写库的行数
+
+    # Investing.com 股票同步
+    INVESTING_SYNC_FETCH_WORKERS: int = 4  # 同时请求的页数 (CN/EN 两种语言共享)
+    INVESTING_SYNC_PAGE_PREFETCH: int = 2  # 每种语言最多提前请求的页数
+    INVESTING_SYNC_WRITE_CHUNK: int = 500  # 每次写库的行数
+
+    # K线缓存 (fast_finance_stock_history_cache) 二进制编码是否 zlib 压缩
+    HISTORY_CACHE_COMPRESS: bool = True
+
+    # 进程内 L1 缓存 (位于 MySQL 缓存表之前)
+    L1_CACHE_ENABLED: bool = True
+    L1_CACHE_DEFAULT_TTL: float = 300.0  # 未单独配置的命名空间的 TTL (秒)
+    L1_CACHE_TTLS: Dict[str, float] = {"history": 300.0, "analysis": 600.0, "related": 600.0, "quote": 15.0}  # 按命名空间的 TTL (秒)
+    L1_CACHE_STALE_TTLS: Dict[str, float] = {"quote": 3600.0}  # 过期后继续保留的秒数，上游熔断时兜底返回
+    L1_CACHE_MAX_ENTRIES: int = 1000  # 每个命名空间的最大条目数 (LRU 淘汰)
+    L1_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 每个命名空间的最大字节数 (近似)
+
+    # 缓存后台刷新 (stale-while-revalidate)
+    CACHE_REFRESH_WORKERS: int = 4  # 后台刷新线程数
+    CACHE_REFRESH_MAX_PENDING: int = 256  # 最多排队的刷新任务数，超出则丢弃
+    CACHE_REFRESH_JITTER: float = 0.1  # 过期时间随机提前比例 (0~1)，避免同时过期
+    CACHE_REFRESH_COOLDOWN: float = 300.0  # 同一 key 两次刷新的最小间隔 (秒)
+
     model_config = SettingsConfigDict(case_sensitive=True, env_file=".env")
 
 
@@ -1,28 +1,44 @@
 import pymysql
 import os
+import json
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
 from app.core.config import settings
+from app.core.db_pool import ConnectionPool
+from app.core.metrics import register_metrics_source
+from app.core.cache import get_cache
+from app.core.sql_instrumentation import record_statement
+from app.core.migrations import run_migrations
 
 logger = logging.getLogger("fastapi")
 
 class LoggingCursor(pymysql.cursors.DictCursor):
-    def execute(self, query, args=None):
-        if args:
-            log_query = f"{query} % {args}"
-        else:
-            log_query = query
-        logger.info(f"[SQL] {log_query}")
-        return super().execute(query, args)
+    """
+    DictCursor that times every statement into the SQL latency histograms and logs it
+    lazily / sampled (see app/core/sql_instrumentation.py).
+    executemany() needs no override: pymysql runs each batch through execute().
+    """
 
-    def executemany(self, query, args):
-        logger.info(f"[SQL] [Msg: batch execution of {len(args) if args else 0} rows] {query}")
-        return super().executemany(query, args)
+    def execute(self, query, args=None):
+        start = time.perf_counter()
+        try:
+            result = super().execute(query, args)
+        except Exception:
+            record_statement(query, args, (time.perf_counter() - start) * 1000, error=True)
+            raise
+        record_statement(query, args, (time.perf_counter() - start) * 1000)
+        return result
 
 class DBManager:
+    _pool: Optional[ConnectionPool] = None
+    _pool_lock = threading.Lock()
+
     @staticmethod
-    def get_connection():
+    def _create_connection():
         return pymysql.connect(
             host=settings.MYSQL_SERVER,
             port=settings.MYSQL_PORT,
@@ -35,6 +51,34 @@ class DBManager:
             init_command='SET time_zone = "+08:00"'
         )
 
+    @classmethod
+    def get_pool(cls) -> ConnectionPool:
+        if cls._pool is None:
+            with cls._pool_lock:
+                if cls._pool is None:
+                    cls._pool = ConnectionPool(
+                        creator=cls._create_connection,
+                        max_size=settings.MYSQL_POOL_SIZE,
+                        acquire_timeout=settings.MYSQL_POOL_TIMEOUT,
+                        max_lifetime=settings.MYSQL_POOL_RECYCLE,
+                        ping_interval=settings.MYSQL_POOL_PING_INTERVAL
+                    )
+                    register_metrics_source("mysql_pool", cls._pool.stats)
+        return cls._pool
+
+    @classmethod
+    def get_connection(cls):
+        """
+        Borrow a connection from the shared pool.
+        Calling close() on it returns it to the pool.
+        """
+        return cls.get_pool().acquire()
+
+    @classmethod
+    def close_pool(cls):
+        if cls._pool is not None:
+            cls._pool.close_all()
+
     @staticmethod
     def init_db():
         """
@@ -54,6 +98,7 @@ class DBManager:
             
             # Create stock_history_cache table
             DBManager.init_history_cache_table(cursor)
+            DBManager.purge_legacy_history_cache(cursor)
 
             # Create yahoo_analysis_cache table
             DBManager.init_analysis_cache_table(cursor)
@@ -66,6 +111,9 @@ class DBManager:
 
             # Create job_execution_logs table
             DBManager.init_job_log_table(cursor)
+
+            # Indexes and other changes to existing tables (app/core/migrations.py)
+            run_migrations(cursor)
             
             conn.commit()
             conn.close()
@@ -226,11 +274,14 @@ class DBManager:
                     ipo_deal_amount DECIMAL(38, 18),
                     sector_tr VARCHAR(255),
                     sector VARCHAR(255),
+                    content_hash CHAR(32) COMMENT '行内容哈希，用于跳过未变化的行',
                     
                     create_time DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
                     update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '修改时间'
                 )
             """)
+            # Tables created before delta-aware upserts lack the hash column
+            DBManager._ensure_column(cursor, "fast_finance_tradingview_stock", "content_hash", "CHAR(32) AFTER sector")
             
             if close_conn:
                 conn.commit()
@@ -274,11 +325,14 @@ class DBManager:
                     investing_sector_en VARCHAR(255),
                     investing_industry_cn VARCHAR(255),
                     investing_industry_en VARCHAR(255),
+                    content_hash CHAR(32) COMMENT '行内容哈希，用于跳过未变化的行',
                     
                     create_time DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
                     update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '修改时间'
                 )
             """)
+            # Tables created before delta-aware upserts lack the hash column
+            DBManager._ensure_column(cursor, "fast_finance_investing_stock", "content_hash", "CHAR(32) AFTER investing_industry_en")
             
             if close_conn:
                 conn.commit()
@@ -289,9 +343,14 @@ class DBManager:
                 conn.close()
 
     @staticmethod
-    def upsert_tradingview_batch(items: List[Dict[str, Any]]) -> int:
+    def upsert_tradingview_batch(items: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Delta upsert into fast_finance_tradingview_stock (see _delta_upsert). Rows are committed every
+        DB_BULK_CHUNK_SIZE rows: if a chunk fails, the chunks before it stay committed and the
+        error is logged with empty stats returned; re-running the sync fills in the rest.
+        """
         if not items:
-            return 0
+            return DBManager._empty_upsert_stats()
             
         try:
             conn = DBManager.get_connection()
@@ -326,13 +385,17 @@ class DBManager:
                 ))
 
             # No created_at, updated_at passed
-            sql = """
-                INSERT INTO fast_finance_tradingview_stock (
-                    tradingview_full_stock_symbol, stock_symbol, exchange_acronym, name, 
-                    description, logoid, logo_url, 
-                    ipo_offer_date, ipo_offer_price, ipo_deal_amount, sector_tr, sector
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
+            stats = DBManager._delta_upsert(
+                conn,
+                cursor,
+                "fast_finance_tradingview_stock",
+                [
+                    "tradingview_full_stock_symbol", "stock_symbol", "exchange_acronym", "name",
+                    "description", "logoid", "logo_url",
+                    "ipo_offer_date", "ipo_offer_price", "ipo_deal_amount", "sector_tr", "sector"
+                ],
+                db_rows,
+                """
                     stock_symbol=VALUES(stock_symbol),
                     exchange_acronym=VALUES(exchange_acronym),
                     name=VALUES(name),
@@ -344,16 +407,15 @@ class DBManager:
                     ipo_deal_amount=VALUES(ipo_deal_amount),
                     sector_tr=VALUES(sector_tr),
                     sector=VALUES(sector)
-            """
-            cursor.executemany(sql, db_rows)
+                """
+            )
             
             conn.commit()
-            count = cursor.rowcount
             conn.close()
-            return len(items) 
+            return stats
         except Exception as e:
             logger.error(f"Error upserting tradingview batch: {e}")
-            return 0
+            return DBManager._empty_upsert_stats()
 
     @staticmethod
     def get_tradingview_stocks(exchange_acronym: Optional[str] = None, 
@@ -411,9 +473,14 @@ class DBManager:
             return 0
 
     @staticmethod
-    def upsert_investing_batch(items: List[Dict[str, Any]]) -> int:
+    def upsert_investing_batch(items: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Delta upsert into fast_finance_investing_stock (see _delta_upsert). Rows are committed every
+        DB_BULK_CHUNK_SIZE rows: if a chunk fails, the chunks before it stay committed and the
+        error is logged with empty stats returned; re-running the sync fills in the rest.
+        """
         if not items:
-            return 0
+            return DBManager._empty_upsert_stats()
             
         try:
             conn = DBManager.get_connection()
@@ -437,15 +504,19 @@ class DBManager:
                    item.get('investing_industry_en')
                 ))
 
-            sql = """
-                INSERT INTO fast_finance_investing_stock (
-                    investing_stock_pair_id, investing_stock_uid,
-                    stock_symbol, exchange_acronym, logo_url,
-                    name_cn, name_en, 
-                    investing_sector_cn, investing_sector_en,
-                    investing_industry_cn, investing_industry_en
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
+            stats = DBManager._delta_upsert(
+                conn,
+                cursor,
+                "fast_finance_investing_stock",
+                [
+                    "investing_stock_pair_id", "investing_stock_uid",
+                    "stock_symbol", "exchange_acronym", "logo_url",
+                    "name_cn", "name_en",
+                    "investing_sector_cn", "investing_sector_en",
+                    "investing_industry_cn", "investing_industry_en"
+                ],
+                db_rows,
+                """
                     investing_stock_uid=VALUES(investing_stock_uid),
                     stock_symbol=VALUES(stock_symbol),
                     exchange_acronym=VALUES(exchange_acronym),
@@ -457,17 +528,15 @@ class DBManager:
                     investing_sector_en=COALESCE(VALUES(investing_sector_en), investing_sector_en),
                     investing_industry_cn=COALESCE(VALUES(investing_industry_cn), investing_industry_cn),
                     investing_industry_en=COALESCE(VALUES(investing_industry_en), investing_industry_en)
-            """
-            
-            cursor.executemany(sql, db_rows)
+                """
+            )
             
             conn.commit()
-            count = cursor.rowcount
             conn.close()
-            return len(items)
+            return stats
         except Exception as e:
             logger.error(f"Error upserting investing batch: {e}")
-            return 0
+            return DBManager._empty_upsert_stats()
 
     @staticmethod
     def get_investing_stocks(exchange_acronym: Optional[str] = None, min_created_at: Optional[datetime] = None) -> List[Dict[str, Any]]:
@@ -496,6 +565,104 @@ class DBManager:
 
     # --- History Cache Methods ---
 
+    @staticmethod
+    def _ensure_column(cursor, table: str, column: str, definition: str):
+        """
+        ALTER TABLE ... ADD COLUMN unless the column already exists (CREATE TABLE IF NOT EXISTS
+        never touches tables created by an older release).
+        """
+        cursor.execute("""
+            SELECT COUNT(*) AS cnt FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """, (table, column))
+        row = cursor.fetchone()
+        if not row or not row['cnt']:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            logger.info(f"Added column {table}.{column}")
+
+    @staticmethod
+    def _empty_upsert_stats() -> Dict[str, int]:
+        return {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    @staticmethod
+    def _row_hash(row: tuple) -> str:
+        return hashlib.md5(json.dumps(row, default=str, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _delta_upsert(conn, cursor, table: str, columns: List[str], rows: List[tuple], update_clause: str) -> Dict[str, int]:
+        """
+        INSERT ... ON DUPLICATE KEY UPDATE only the rows that are new or whose content changed.
+
+        columns[0] must be the table's unique key and every row a tuple in `columns` order.
+        Each written row stores a hash of its values in content_hash; rows whose hash matches
+        the stored one are skipped, so unchanged rows cause no write (no binlog entry, no
+        update_time bump). Rows stored before the column existed have no hash and are rewritten once.
+        Returns {"inserted", "updated", "unchanged"} counts.
+        """
+        stats = DBManager._empty_upsert_stats()
+        key_column = columns[0]
+
+        # Last occurrence of a key wins, as with a plain upsert
+        by_key = {row[0]: row for row in rows}
+        placeholders = ','.join(['%s'] * len(by_key))
+        cursor.execute(
+            f"SELECT {key_column} AS k, content_hash FROM {table} WHERE {key_column} IN ({placeholders})",
+            list(by_key.keys())
+        )
+        existing = {row['k']: row['content_hash'] for row in cursor.fetchall()}
+
+        to_write = []
+        for key, row in by_key.items():
+            content_hash = DBManager._row_hash(row)
+            if key not in existing:
+                stats["inserted"] += 1
+            elif existing[key] == content_hash:
+                stats["unchanged"] += 1
+                continue
+            else:
+                stats["updated"] += 1
+            to_write.append(row + (content_hash,))
+
+        if to_write:
+            DBManager._bulk_upsert(
+                conn, cursor, table, columns + ["content_hash"], to_write,
+                f"{update_clause.strip()}, content_hash=VALUES(content_hash)"
+            )
+        return stats
+
+    @staticmethod
+    def _bulk_upsert(conn, cursor, table: str, columns: List[str], rows: List[tuple], update_clause: str,
+                     chunk_size: Optional[int] = None) -> int:
+        """
+        INSERT ... ON DUPLICATE KEY UPDATE via executemany, committed every DB_BULK_CHUNK_SIZE rows.
+
+        pymysql already rewrites executemany into multi-row VALUES statements (kept under its
+        max_stmt_length). The commits are there so that a full-universe sync holds its row locks
+        and undo log for one chunk at a time rather than for tens of thousands of rows; the price
+        is that a failure part-way leaves the earlier chunks committed. bench_db_bulk.py compares
+        it with a single executemany/commit over all rows.
+        Returns the number of rows written.
+        """
+        chunk_size = max(1, chunk_size or settings.DB_BULK_CHUNK_SIZE)
+        values = ", ".join(["%s"] * len(columns))
+        sql = f"""
+            INSERT INTO {table} ({', '.join(columns)}) VALUES ({values})
+            ON DUPLICATE KEY UPDATE
+                {update_clause.strip()}
+        """
+
+        written = 0
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                cursor.executemany(sql, chunk)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            written += len(chunk)
+        return written
+
     @staticmethod
     def init_history_cache_table(conn_or_cursor=None):
         close_conn = False
@@ -519,10 +686,13 @@ class DBManager:
                     id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
                     cache_key VARCHAR(255) UNIQUE NOT NULL,
                     data LONGTEXT,
+                    data_bin LONGBLOB,
                     create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
                     update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
                 )
             """)
+            # Existing tables predate the binary column (see app/core/history_codec.py)
+            DBManager._ensure_column(cursor, "fast_finance_stock_history_cache", "data_bin", "LONGBLOB AFTER data")
             if close_conn:
                 conn.commit()
         except Exception as e:
@@ -532,35 +702,69 @@ class DBManager:
                 conn.close()
 
     @staticmethod
-    def get_history_cache(cache_key: str) -> Optional[str]:
+    def purge_legacy_history_cache(cursor) -> int:
+        """
+        Delete the old per-day rows keyed "{as_of_date}_{symbol}_{market_state}",
+        superseded by one "{symbol}_1d" row per symbol.
+        """
+        try:
+            deleted = cursor.execute(
+                "DELETE FROM fast_finance_stock_history_cache WHERE cache_key REGEXP %s",
+                (r'^[0-9]{4}-[0-9]{2}-[0-9]{2}_',)
+            )
+            if deleted:
+                logger.info(f"Purged {deleted} legacy per-day history cache rows")
+            return deleted
+        except Exception as e:
+            logger.error(f"Failed to purge legacy history cache rows: {e}")
+            return 0
+
+    @staticmethod
+    def get_history_cache(cache_key: str) -> Optional[Union[bytes, str]]:
+        """
+        Returns the binary payload (data_bin) when present, otherwise the legacy JSON text.
+        Served from the in-process L1 cache when possible.
+        """
+        cached = get_cache("history").get(cache_key)
+        if cached is not None:
+            return cached
         try:
             conn = DBManager.get_connection()
             cursor = conn.cursor()
-            cursor.execute("SELECT data FROM fast_finance_stock_history_cache WHERE cache_key = %s", (cache_key,))
+            cursor.execute("SELECT data, data_bin FROM fast_finance_stock_history_cache WHERE cache_key = %s", (cache_key,))
             row = cursor.fetchone()
             conn.close()
-            return row['data'] if row else None
+            if not row:
+                return None
+            data = row['data_bin'] if row['data_bin'] is not None else row['data']
+            get_cache("history").set(cache_key, data)
+            return data
         except Exception as e:
             logger.error(f"Error getting history cache: {e}")
             return None
 
     @staticmethod
-    def upsert_history_cache(cache_key: str, data: str):
+    def upsert_history_cache(cache_key: str, data: Union[bytes, str]):
         try:
             conn = DBManager.get_connection()
             cursor = conn.cursor()
-            
+
+            data_text, data_bin = (None, data) if isinstance(data, (bytes, bytearray)) else (data, None)
             # Use INSERT ON DUPLICATE to handle timestamps properly (REPLACE creates new row, resetting create_time)
             cursor.execute("""
-                INSERT INTO fast_finance_stock_history_cache (cache_key, data)
-                VALUES (%s, %s)
+                INSERT INTO fast_finance_stock_history_cache (cache_key, data, data_bin)
+                VALUES (%s, %s, %s)
                 ON DUPLICATE KEY UPDATE
-                    data=VALUES(data)
-            """, (cache_key, data))
-            
+                    data=VALUES(data),
+                    data_bin=VALUES(data_bin)
+            """, (cache_key, data_text, data_bin))
+
             conn.commit()
             conn.close()
+            # Write-through: the payload is exactly what the getter returns
+            get_cache("history").set(cache_key, data)
         except Exception as e:
+            get_cache("history").invalidate(cache_key)
             logger.error(f"Error upserting history cache: {e}")
 
     # --- Analysis Cache Methods ---
@@ -600,18 +804,23 @@ class DBManager:
 
     @staticmethod
     def get_analysis_cache(symbol: str) -> Optional[Dict[str, Any]]:
+        cached = get_cache("analysis").get(symbol)
+        if cached is not None:
+            return cached
         try:
             conn = DBManager.get_connection()
             cursor = conn.cursor()
-            cursor.execute("SELECT data, create_time FROM fast_finance_yahoo_analysis_cache WHERE symbol = %s", (symbol,))
+            cursor.execute("SELECT data, update_time FROM fast_finance_yahoo_analysis_cache WHERE symbol = %s", (symbol,))
             row = cursor.fetchone()
             conn.close()
             
             if row:
-                return {
+                cached = {
                     "data": row["data"],
-                    "created_at": row["create_time"] # Map back to expected key in app? Or fix app
+                    "updated_at": row["update_time"]  # set on every upsert, so it dates the last refresh
                 }
+                get_cache("analysis").set(symbol, cached)
+                return cached
             return None
         except Exception as e:
             logger.error(f"Error getting analysis cache for {symbol}: {e}")
@@ -626,13 +835,16 @@ class DBManager:
             cursor.execute("""
                 INSERT INTO fast_finance_yahoo_analysis_cache (symbol, data)
                 VALUES (%s, %s)
-                ON DUPLICATE KEY UPDATE data=VALUES(data)
+                ON DUPLICATE KEY UPDATE data=VALUES(data), update_time=CURRENT_TIMESTAMP
             """, (symbol, data))
             
             conn.commit()
             conn.close()
         except Exception as e:
             logger.error(f"Error upserting analysis cache for {symbol}: {e}")
+        finally:
+            # updated_at comes from the row, so drop the entry instead of writing through
+            get_cache("analysis").invalidate(symbol)
 
     @staticmethod
     def init_yahoo_stock_table(conn_or_cursor=None):
@@ -661,10 +873,13 @@ class DBManager:
                     currency VARCHAR(10),
                     market_cap DECIMAL(38, 18),
                     market_cap_usd DECIMAL(38, 18),
+                    content_hash CHAR(32) COMMENT '行内容哈希，用于跳过未变化的行',
                     create_time DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
                     update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '修改时间'
                 )
             """)
+            # Tables created before delta-aware upserts lack the hash column
+            DBManager._ensure_column(cursor, "fast_finance_yahoo_stock", "content_hash", "CHAR(32) AFTER market_cap_usd")
             
             if close_conn:
                 conn.commit()
@@ -675,9 +890,14 @@ class DBManager:
                 conn.close()
 
     @staticmethod
-    def upsert_yahoo_stock_batch(items: List[Dict[str, Any]]) -> int:
+    def upsert_yahoo_stock_batch(items: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Delta upsert into fast_finance_yahoo_stock (see _delta_upsert). Rows are committed every
+        DB_BULK_CHUNK_SIZE rows: if a chunk fails, the chunks before it stay committed and the
+        error is logged with empty stats returned; re-running the sync fills in the rest.
+        """
         if not items:
-            return 0
+            return DBManager._empty_upsert_stats()
         try:
             conn = DBManager.get_connection()
             cursor = conn.cursor()
@@ -695,12 +915,16 @@ class DBManager:
                     item.get('market_cap_usd', 0)
                 ))
             
-            sql = """
-                INSERT INTO fast_finance_yahoo_stock (
-                    yahoo_stock_symbol, yahoo_exchange_symbol, stock_symbol, exchange_acronym, 
-                    name, currency, market_cap, market_cap_usd
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
+            stats = DBManager._delta_upsert(
+                conn,
+                cursor,
+                "fast_finance_yahoo_stock",
+                [
+                    "yahoo_stock_symbol", "yahoo_exchange_symbol", "stock_symbol", "exchange_acronym",
+                    "name", "currency", "market_cap", "market_cap_usd"
+                ],
+                db_rows,
+                """
                     yahoo_exchange_symbol=VALUES(yahoo_exchange_symbol),
                     stock_symbol=VALUES(stock_symbol),
                     exchange_acronym=VALUES(exchange_acronym),
@@ -708,26 +932,21 @@ class DBManager:
                     currency=VALUES(currency),
                     market_cap=VALUES(market_cap),
                     market_cap_usd=VALUES(market_cap_usd)
-            """
-            
-            cursor.executemany(sql, db_rows)
+                """
+            )
             
             conn.commit()
-            count = cursor.rowcount
             conn.close()
-            return len(items)
+            return stats
         except Exception as e:
             logger.error(f"Error upserting yahoo stock batch: {e}")
-            return 0
+            return DBManager._empty_upsert_stats()
 
     @staticmethod
     def get_yahoo_stock_by_symbols(yahoo_symbols: List[str]) -> Dict[str, Dict[str, Any]]:
         if not yahoo_symbols:
             return {}
         try:
-            import time
-            start_ts = time.time()
-            
             conn = DBManager.get_connection()
             cursor = conn.cursor()
             
@@ -737,10 +956,6 @@ class DBManager:
             rows = cursor.fetchall()
             conn.close()
             
-            duration_ms = (time.time() - start_ts) * 1000
-            # user-requested log style: [DEBU] [duration] [rows] SQL
-            logger.info(f"[DEBU] [{duration_ms:.2f} ms] [rows:{len(rows)}] SQL: {sql} Params: {yahoo_symbols}")
-            
             result = {}
             for row in rows:
                 result[row['yahoo_stock_symbol']] = row
@@ -784,18 +999,23 @@ class DBManager:
 
     @staticmethod
     def get_yahoo_stock_related_cache(symbol: str) -> Optional[Dict[str, Any]]:
+        cached = get_cache("related").get(symbol)
+        if cached is not None:
+            return cached
         try:
             conn = DBManager.get_connection()
             cursor = conn.cursor()
-            cursor.execute("SELECT data, create_time FROM fast_finance_yahoo_stock_related_cache WHERE symbol = %s", (symbol,))
+            cursor.execute("SELECT data, update_time FROM fast_finance_yahoo_stock_related_cache WHERE symbol = %s", (symbol,))
             row = cursor.fetchone()
             conn.close()
             
             if row:
-                return {
+                cached = {
                     "data": row["data"],
-                    "created_at": row["create_time"] # App expects created_at
+                    "updated_at": row["update_time"]  # set on every upsert, so it dates the last refresh
                 }
+                get_cache("related").set(symbol, cached)
+                return cached
             return None
         except Exception as e:
             logger.error(f"Error getting related cache for {symbol}: {e}")
@@ -810,10 +1030,12 @@ class DBManager:
             cursor.execute("""
                 INSERT INTO fast_finance_yahoo_stock_related_cache (symbol, data)
                 VALUES (%s, %s)
-                ON DUPLICATE KEY UPDATE data=VALUES(data)
+                ON DUPLICATE KEY UPDATE data=VALUES(data), update_time=CURRENT_TIMESTAMP
             """, (symbol, data))
             
             conn.commit()
             conn.close()
         except Exception as e:
             logger.error(f"Error upserting related cache for {symbol}: {e}")
+        finally:
+            get_cache("related").invalidate(symbol)
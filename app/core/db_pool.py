@@ -0,0 +1,204 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger("fastapi")
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the acquire timeout."""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a pymysql connection handed out by ConnectionPool.
+    close() returns the connection to the pool instead of closing the socket,
+    so existing `conn = get_connection() ... conn.close()` call sites keep working.
+    """
+
+    def __init__(self, pool: "ConnectionPool", raw, created_at: float):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._pool._release(self._raw, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # Safety net for call sites that raise before reaching conn.close()
+        try:
+            if not self._released:
+                self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe MySQL connection pool.
+
+    - At most `max_size` connections are open (idle + in use); callers wait up to
+      `acquire_timeout` seconds for one to be released.
+    - Connections idle for longer than `ping_interval` are pinged before reuse.
+    - Connections older than `max_lifetime` are closed and replaced on checkout.
+    - Every release rolls back, so a read-only REPEATABLE READ snapshot never
+      leaks into the next borrower.
+    """
+
+    def __init__(self, creator: Callable[[], Any], max_size: int = 10,
+                 acquire_timeout: float = 10.0, max_lifetime: float = 3600.0,
+                 ping_interval: float = 30.0):
+        self._creator = creator
+        self._max_size = max(1, max_size)
+        self._acquire_timeout = acquire_timeout
+        self._max_lifetime = max_lifetime
+        self._ping_interval = ping_interval
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (raw, created_at, last_used)
+        self._size = 0
+
+        self._stats = {
+            "acquired": 0,
+            "created": 0,
+            "recycled": 0,
+            "discarded": 0,
+            "timeouts": 0,
+            "waits": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "in_use": 0,
+            "peak_in_use": 0,
+        }
+
+    def acquire(self) -> PooledConnection:
+        start = time.monotonic()
+        deadline = start + self._acquire_timeout
+        entry = None
+        waited = False
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    # LIFO: the most recently used connection is the warmest
+                    entry = self._idle.pop()
+                    break
+                if self._size < self._max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeoutError(
+                        f"Timed out after {self._acquire_timeout}s waiting for a MySQL connection "
+                        f"(pool size {self._max_size})"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            self._stats["in_use"] += 1
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], self._stats["in_use"])
+
+        raw, created_at = None, None
+        if entry:
+            raw, created_at, last_used = entry
+            now = time.monotonic()
+            if now - created_at > self._max_lifetime:
+                self._close_quietly(raw)
+                raw = None
+                self._incr("recycled")
+            elif now - last_used > self._ping_interval:
+                try:
+                    raw.ping(reconnect=False)
+                except Exception as e:
+                    logger.warning(f"Discarding dead pooled MySQL connection: {e}")
+                    self._close_quietly(raw)
+                    raw = None
+                    self._incr("discarded")
+
+        if raw is None:
+            try:
+                raw = self._creator()
+                created_at = time.monotonic()
+                self._incr("created")
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._stats["in_use"] -= 1
+                    self._cond.notify()
+                raise
+
+        wait_seconds = time.monotonic() - start
+        with self._cond:
+            self._stats["acquired"] += 1
+            if waited:
+                self._stats["waits"] += 1
+            self._stats["wait_seconds_total"] += wait_seconds
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], wait_seconds)
+
+        return PooledConnection(self, raw, created_at)
+
+    def _release(self, raw, created_at: float):
+        healthy = bool(getattr(raw, "open", False))
+        if healthy:
+            try:
+                raw.rollback()
+            except Exception:
+                healthy = False
+
+        with self._cond:
+            self._stats["in_use"] -= 1
+            if healthy:
+                self._idle.append((raw, created_at, time.monotonic()))
+            else:
+                self._size -= 1
+                self._stats["discarded"] += 1
+            self._cond.notify()
+
+        if not healthy:
+            self._close_quietly(raw)
+
+    def close_all(self):
+        """Close idle connections (used on shutdown). Borrowed ones are closed on release."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+        for raw, _, _ in idle:
+            self._close_quietly(raw)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot["size"] = self._size
+            snapshot["idle"] = len(self._idle)
+            snapshot["max_size"] = self._max_size
+        acquired = snapshot["acquired"]
+        snapshot["wait_seconds_avg"] = snapshot["wait_seconds_total"] / acquired if acquired else 0.0
+        return snapshot
+
+    def _incr(self, key: str):
+        with self._cond:
+            self._stats[key] += 1
+
+    @staticmethod
+    def _close_quietly(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
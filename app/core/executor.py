@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.exceptions import CustomException
+from app.core.metrics import register_metrics_source
+from app.schemas.response import ResponseCode
+
+logger = logging.getLogger("fastapi")
+
+
+class UpstreamTimeoutError(CustomException):
+    def __init__(self, message: str):
+        super().__init__(code=ResponseCode.GATEWAY_TIMEOUT, message=message)
+
+
+class UpstreamBusyError(CustomException):
+    def __init__(self, message: str):
+        super().__init__(code=ResponseCode.SERVICE_UNAVAILABLE, message=message)
+
+
+class _RouteLimiter:
+    """Per-route concurrency slot + counters. Only touched from the event loop thread."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(limit)
+        self.waiting = 0
+        self.active = 0
+        self.peak_waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.seconds_total = 0.0
+        self.seconds_max = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            "limit": self.limit,
+            "waiting": self.waiting,
+            "active": self.active,
+            "peak_waiting": self.peak_waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "seconds_avg": self.seconds_total / finished if finished else 0.0,
+            "seconds_max": self.seconds_max
+        }
+
+
+class UpstreamExecutor:
+    """
+    Dedicated thread pool for blocking upstream calls (yfinance, requests...) made from async routes.
+
+    - run(route, fn, ...): at most `route_limits.get(route, default_limit)` calls of a route
+      occupy worker threads at once; at most `max_waiting` more may queue for a slot, beyond
+      that the call is rejected (UpstreamBusyError) instead of piling up.
+    - Callers give up after `timeout` seconds (UpstreamTimeoutError). The worker thread cannot be
+      interrupted, so the route slot is only freed once the call really returns.
+    - submit(fn, ...): plain dispatch onto the pool, no route limit; run() builds on it.
+      Callers bypass the route limits, so keep their fan-out bounded.
+    """
+
+    def __init__(self, name: str, max_workers: int, default_limit: int, timeout: float,
+                 max_waiting: int, route_limits: Optional[Dict[str, int]] = None):
+        self.name = name
+        self._max_workers = max(1, max_workers)
+        self._default_limit = max(1, default_limit)
+        self._timeout = timeout
+        self._max_waiting = max_waiting
+        self._route_limits = dict(route_limits or {})
+
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._routes: Dict[str, _RouteLimiter] = {}
+
+        # Executor-level counters, updated from worker threads
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._peak_queued = 0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self._max_workers,
+                        thread_name_prefix=f"{self.name}-upstream"
+                    )
+        return self._pool
+
+    def _route(self, route: str) -> _RouteLimiter:
+        limiter = self._routes.get(route)
+        if limiter is None:
+            limit = max(1, self._route_limits.get(route, self._default_limit))
+            limiter = self._routes[route] = _RouteLimiter(limit)
+        return limiter
+
+    def submit(self, fn: Callable, *args, **kwargs) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            self._queued += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+
+        def call():
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        return loop.run_in_executor(self._get_pool(), call)
+
+    async def run(self, route: str, fn: Callable, *args, **kwargs) -> Any:
+        limiter = self._route(route)
+        if limiter.waiting >= self._max_waiting:
+            limiter.rejected += 1
+            raise UpstreamBusyError(f"{self.name} {route}: too many pending requests, retry later")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._timeout
+
+        limiter.waiting += 1
+        limiter.peak_waiting = max(limiter.peak_waiting, limiter.waiting)
+        try:
+            await asyncio.wait_for(limiter.semaphore.acquire(), self._timeout)
+        except asyncio.TimeoutError:
+            limiter.timeouts += 1
+            raise UpstreamTimeoutError(f"{self.name} {route}: timed out waiting for a free slot")
+        finally:
+            limiter.waiting -= 1
+
+        limiter.active += 1
+        start = time.monotonic()
+        try:
+            future = self.submit(fn, *args, **kwargs)
+        except BaseException:
+            limiter.active -= 1
+            limiter.semaphore.release()
+            raise
+
+        def on_done(f: asyncio.Future):
+            elapsed = time.monotonic() - start
+            limiter.active -= 1
+            limiter.semaphore.release()
+            limiter.seconds_total += elapsed
+            limiter.seconds_max = max(limiter.seconds_max, elapsed)
+            if f.cancelled() or f.exception() is not None:
+                limiter.failed += 1
+            else:
+                limiter.completed += 1
+
+        future.add_done_callback(on_done)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            limiter.timeouts += 1
+            logger.warning(f"{self.name} {route} call {getattr(fn, '__name__', fn)} exceeded {self._timeout}s")
+            raise UpstreamTimeoutError(f"{self.name} {route}: upstream did not respond within {self._timeout}s")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {
+                "max_workers": self._max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "peak_queued": self._peak_queued
+            }
+        snapshot["routes"] = {route: limiter.stats() for route, limiter in list(self._routes.items())}
+        return snapshot
+
+    def shutdown(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+yahoo_executor = UpstreamExecutor(
+    name="yahoo",
+    max_workers=settings.YAHOO_EXECUTOR_WORKERS,
+    default_limit=settings.YAHOO_ROUTE_CONCURRENCY,
+    timeout=settings.YAHOO_UPSTREAM_TIMEOUT,
+    max_waiting=settings.YAHOO_ROUTE_MAX_WAITING,
+    route_limits=settings.YAHOO_ROUTE_CONCURRENCY_OVERRIDES
+)
+register_metrics_source("yahoo_executor", yahoo_executor.stats)
@@ -0,0 +1,118 @@
+"""
+Binary columnar codec for cached daily history (fast_finance_stock_history_cache.data_bin).
+
+Layout (little endian):
+
+    magic  b"FFHC"        4 bytes
+    version               uint8
+    flags                 uint8   (bit 0: body is zlib compressed)
+    header length         uint32
+    header                UTF-8 JSON: rows, tz, index name, [(column, dtype)], meta
+    body                  int64 epoch-ns UTC timestamps, then each column's raw array
+
+Timestamps are stored as absolute instants, so decoding needs no date re-parsing
+and no timezone guessing; the frame is re-localised to the stored exchange timezone.
+"""
+import json
+import struct
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b"FFHC"
+VERSION = 1
+FLAG_ZLIB = 0x01
+
+_PREAMBLE = struct.Struct("<4sBBI")
+_SUPPORTED_KINDS = ("f", "i", "u", "b")
+
+
+class HistoryCodecError(ValueError):
+    pass
+
+
+def is_encoded_history(payload: Any) -> bool:
+    return isinstance(payload, (bytes, bytearray, memoryview)) and bytes(payload[:4]) == MAGIC
+
+
+def encode_history(df: pd.DataFrame, meta: Optional[Dict[str, Any]] = None,
+                   compress: bool = True, level: int = 6) -> bytes:
+    """Encode a DatetimeIndex-ed numeric frame (yfinance history) into the binary format."""
+    if not isinstance(df.index, pd.DatetimeIndex):
+        raise HistoryCodecError("history frame must have a DatetimeIndex")
+
+    index = df.index
+    tz = str(index.tz) if index.tz is not None else None
+    if tz is not None:
+        index = index.tz_convert("UTC")
+    timestamps = np.ascontiguousarray(index.as_unit("ns").asi8, dtype="<i8")
+
+    columns = []
+    arrays = [timestamps.tobytes()]
+    for name in df.columns:
+        values = df[name].to_numpy()
+        if values.dtype.kind not in _SUPPORTED_KINDS:
+            # nullable / object columns: fall back to float64 (NaN for missing)
+            values = pd.to_numeric(df[name], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+        columns.append([str(name), values.dtype.str])
+        arrays.append(values.tobytes())
+
+    header = json.dumps({
+        "rows": len(df),
+        "tz": tz,
+        "index": df.index.name,
+        "unit": df.index.unit,
+        "columns": columns,
+        "meta": meta or {}
+    }, separators=(",", ":")).encode("utf-8")
+
+    body = b"".join(arrays)
+    flags = 0
+    if compress:
+        body = zlib.compress(body, level)
+        flags |= FLAG_ZLIB
+
+    return _PREAMBLE.pack(MAGIC, VERSION, flags, len(header)) + header + body
+
+
+def decode_history(payload: bytes) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Decode a payload produced by encode_history. Returns (frame, meta)."""
+    payload = bytes(payload)
+    if len(payload) < _PREAMBLE.size:
+        raise HistoryCodecError("payload too short")
+
+    magic, version, flags, header_len = _PREAMBLE.unpack_from(payload, 0)
+    if magic != MAGIC:
+        raise HistoryCodecError("not an encoded history payload")
+    if version != VERSION:
+        raise HistoryCodecError(f"unsupported history codec version {version}")
+
+    offset = _PREAMBLE.size
+    header = json.loads(payload[offset:offset + header_len].decode("utf-8"))
+    body = payload[offset + header_len:]
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+
+    rows = header["rows"]
+    timestamps = np.frombuffer(body, dtype="<i8", count=rows)
+    pos = timestamps.nbytes
+
+    data = {}
+    for name, dtype_str in header["columns"]:
+        dtype = np.dtype(dtype_str)
+        values = np.frombuffer(body, dtype=dtype, count=rows, offset=pos)
+        pos += values.nbytes
+        data[name] = values
+
+    index = pd.DatetimeIndex(pd.to_datetime(timestamps, unit="ns", utc=True), name=header.get("index"))
+    index = index.as_unit(header.get("unit") or "ns")
+    if header.get("tz"):
+        index = index.tz_convert(header["tz"])
+    else:
+        index = index.tz_localize(None)
+
+    df = pd.DataFrame(data, index=index, columns=[name for name, _ in header["columns"]], copy=True)
+    return df, header.get("meta") or {}
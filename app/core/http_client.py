@@ -0,0 +1,222 @@
+"""
+Shared HTTP sessions, one per upstream provider ("tradingview", "investing", "google", "yahoo").
+
+Every provider module issues its requests through get_session(provider) instead of bare
+requests.get/post, so TCP/TLS connections are kept alive and reused across calls:
+
+- connections are pooled per host (HTTP_POOL_MAXSIZE); with HTTP_POOL_BLOCK a caller waits
+  for a free connection instead of opening an extra one, bounding connections per host;
+- the proxy comes from settings.PROXY_<PROVIDER>;
+- requests without an explicit timeout get HTTP_TIMEOUT;
+- connection errors and 5xx responses are retried HTTP_RETRIES times with exponential
+  backoff (HTTP_RETRY_BACKOFF). 429/403 are returned to the caller untouched;
+- every request first passes the provider's rate limiter / circuit breaker
+  (app/core/provider_guard.py), which the final status then feeds back into.
+
+yfinance keeps its own (curl_cffi) session; the "yahoo" session here serves the pages
+scraped directly from finance.yahoo.com.
+
+get_async_client(provider) is the asyncio counterpart for the *_async provider variants:
+one httpx.AsyncClient per provider (HTTP/2 when the optional h2 package is installed and
+HTTP2_ENABLED), same proxy, timeout and retry policy, at most HTTP_ASYNC_MAX_CONNECTIONS
+connections. Many concurrent calls then share a few connections on the event loop instead
+of holding one worker thread each.
+"""
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.core.config import settings
+from app.core.metrics import register_metrics_source
+from app.core.provider_guard import get_guard
+
+logger = logging.getLogger("fastapi")
+
+RETRY_STATUSES = (500, 502, 503, 504)
+
+try:
+    import h2  # noqa: F401  (enables http2=True in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class ProviderSession(requests.Session):
+    """requests.Session with a default timeout and per-provider request counters."""
+
+    def __init__(self, provider: str, timeout: float):
+        super().__init__()
+        self.provider = provider
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "errors": 0, "status": {}}
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        guard = get_guard(self.provider)
+        guard.acquire()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.RequestException:
+            guard.record_error()
+            with self._lock:
+                self._stats["requests"] += 1
+                self._stats["errors"] += 1
+            raise
+        guard.record(response.status_code, response.headers.get("Retry-After"))
+        status = f"{response.status_code // 100}xx"
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["status"][status] = self._stats["status"].get(status, 0) + 1
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "status": dict(self._stats["status"])}
+
+
+def _proxy_for(provider: str) -> Optional[str]:
+    return getattr(settings, f"PROXY_{provider.upper()}", None)
+
+
+def _create_session(provider: str) -> ProviderSession:
+    session = ProviderSession(provider, settings.HTTP_TIMEOUT)
+    retry = Retry(
+        total=settings.HTTP_RETRIES,
+        backoff_factor=settings.HTTP_RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        # Scanner/screener POSTs are read-only queries, safe to repeat
+        allowed_methods=None,
+        raise_on_status=False,
+        # Retry-After is honoured by the provider guard; urllib3 would otherwise retry 429s
+        # itself and sleep inside the pooled connection
+        respect_retry_after_header=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+        pool_block=settings.HTTP_POOL_BLOCK,
+        max_retries=retry
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    proxy = _proxy_for(provider)
+    if proxy:
+        session.proxies.update({"http": proxy, "https": proxy})
+        logger.info(f"HTTP session for {provider} uses proxy {proxy}")
+    return session
+
+
+_sessions: Dict[str, ProviderSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(provider: str) -> ProviderSession:
+    """The shared session of a provider, created on first use."""
+    session = _sessions.get(provider)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(provider)
+            if session is None:
+                session = _sessions[provider] = _create_session(provider)
+    return session
+
+
+def close_sessions():
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+class AsyncProviderClient:
+    """
+    httpx.AsyncClient of one provider, bound to the event loop it was created on.
+    request() retries transport errors and 5xx like the sync sessions (HTTP_RETRIES,
+    exponential HTTP_RETRY_BACKOFF) and returns the last response otherwise.
+    """
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.loop = asyncio.get_running_loop()
+        self.http2 = settings.HTTP2_ENABLED and HTTP2_AVAILABLE
+        self.client = httpx.AsyncClient(
+            http2=self.http2,
+            proxy=_proxy_for(provider),
+            timeout=settings.HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_POOL_MAXSIZE
+            ),
+            follow_redirects=True
+        )
+        self._stats = {"requests": 0, "errors": 0, "retries": 0, "status": {}}
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        guard = get_guard(self.provider)
+        attempt = 0
+        while True:
+            await guard.acquire_async(retry=attempt > 0)
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if attempt >= settings.HTTP_RETRIES:
+                    guard.record_error()
+                    self._stats["requests"] += 1
+                    self._stats["errors"] += 1
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= settings.HTTP_RETRIES:
+                    guard.record(response.status_code, response.headers.get("Retry-After"))
+                    status = f"{response.status_code // 100}xx"
+                    self._stats["requests"] += 1
+                    self._stats["status"][status] = self._stats["status"].get(status, 0) + 1
+                    return response
+                await response.aclose()
+            self._stats["retries"] += 1
+            await asyncio.sleep(settings.HTTP_RETRY_BACKOFF * (2 ** attempt))
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "status": dict(self._stats["status"]), "http2": self.http2}
+
+
+_async_clients: Dict[str, AsyncProviderClient] = {}
+
+
+def get_async_client(provider: str) -> AsyncProviderClient:
+    """The shared async client of a provider for the running event loop, created on first use."""
+    client = _async_clients.get(provider)
+    if client is None or client.loop is not asyncio.get_running_loop():
+        # A client cannot outlive its loop (tests, or a loop restarted in-process)
+        client = _async_clients[provider] = AsyncProviderClient(provider)
+    return client
+
+
+async def close_async_clients():
+    clients = list(_async_clients.values())
+    _async_clients.clear()
+    loop = asyncio.get_running_loop()
+    for client in clients:
+        if client.loop is loop:
+            await client.client.aclose()
+
+
+def session_stats() -> Dict[str, Any]:
+    with _sessions_lock:
+        sessions = list(_sessions.items())
+    stats = {provider: session.stats() for provider, session in sessions}
+    for provider, client in list(_async_clients.items()):
+        stats[f"{provider}_async"] = client.stats()
+    return stats
+
+
+register_metrics_source("http_sessions", session_stats)
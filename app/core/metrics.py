@@ -0,0 +1,36 @@
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger("fastapi")
+
+# name -> callable returning a JSON-serializable snapshot
+_sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+_lock = threading.Lock()
+
+
+def register_metrics_source(name: str, collector: Callable[[], Dict[str, Any]]):
+    """
+    Register a named metrics snapshot provider (connection pool, executors, caches...).
+    Re-registering the same name replaces the previous collector.
+    """
+    with _lock:
+        _sources[name] = collector
+
+
+def collect_metrics() -> Dict[str, Any]:
+    """
+    Collect a snapshot from every registered source.
+    A failing collector never breaks the others.
+    """
+    with _lock:
+        sources = list(_sources.items())
+
+    snapshot = {}
+    for name, collector in sources:
+        try:
+            snapshot[name] = collector()
+        except Exception as e:
+            logger.warning(f"Failed to collect metrics for {name}: {e}")
+            snapshot[name] = {"error": str(e)}
+    return snapshot
@@ -0,0 +1,98 @@
+"""
+Versioned schema migrations for the fast_finance_* tables.
+
+init_*_table() only runs CREATE TABLE IF NOT EXISTS, which never changes a table created by
+an older release. Schema changes after that go here: each migration has a version, a short
+description and a function taking a cursor. run_migrations() (called from DBManager.init_db()
+after the tables exist) applies the pending ones in version order and records each in
+fast_finance_schema_migrations.
+
+Steps check information_schema before changing anything, so re-running a migration (several
+workers starting at once, an index already added by hand) is harmless.
+"""
+import logging
+from typing import Callable, List, Sequence, Tuple
+
+logger = logging.getLogger("fastapi")
+
+MIGRATIONS_TABLE = "fast_finance_schema_migrations"
+
+
+def index_exists(cursor, table: str, index: str) -> bool:
+    cursor.execute("""
+        SELECT COUNT(*) AS cnt FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, (table, index))
+    row = cursor.fetchone()
+    return bool(row and row['cnt'])
+
+
+def ensure_index(cursor, table: str, index: str, columns: Sequence[str]):
+    """CREATE INDEX unless an index with that name already exists on the table."""
+    if index_exists(cursor, table, index):
+        return
+    cursor.execute(f"CREATE INDEX {index} ON {table} ({', '.join(columns)})")
+    logger.info(f"Created index {table}.{index} ({', '.join(columns)})")
+
+
+def _listing_indexes(table: str) -> Callable:
+    # The list endpoints filter on exchange_acronym and/or create_time >= ?:
+    # (exchange_acronym, create_time) covers "exchange" and "exchange + since",
+    # create_time alone covers "since" across all exchanges.
+    def apply(cursor):
+        ensure_index(cursor, table, "idx_exchange_create_time", ("exchange_acronym", "create_time"))
+        ensure_index(cursor, table, "idx_create_time", ("create_time",))
+    return apply
+
+
+# yahoo_stock needs nothing here: the IN (...) lookups of the related endpoint go through
+# the UNIQUE key on yahoo_stock_symbol.
+
+# (version, description, apply(cursor)) - append only, never renumber
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "tradingview_stock: exchange/create_time indexes", _listing_indexes("fast_finance_tradingview_stock")),
+    (2, "investing_stock: exchange/create_time indexes", _listing_indexes("fast_finance_investing_stock")),
+]
+
+
+def init_migrations_table(cursor):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            version INT NOT NULL PRIMARY KEY COMMENT '迁移版本号',
+            description VARCHAR(255) COMMENT '迁移说明',
+            applied_time DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '执行时间'
+        )
+    """)
+
+
+def applied_versions(cursor) -> List[int]:
+    cursor.execute(f"SELECT version FROM {MIGRATIONS_TABLE} ORDER BY version")
+    return [row['version'] for row in cursor.fetchall()]
+
+
+def run_migrations(cursor, migrations: List[Tuple[int, str, Callable]] = None) -> List[int]:
+    """
+    Apply the pending migrations in version order; returns the versions applied now.
+    A failing migration is logged and stops the run, so later ones never run against
+    a schema they do not expect; it is retried on the next start.
+    """
+    migrations = MIGRATIONS if migrations is None else migrations
+    init_migrations_table(cursor)
+    done = set(applied_versions(cursor))
+
+    applied = []
+    for version, description, apply in sorted(migrations, key=lambda m: m[0]):
+        if version in done:
+            continue
+        try:
+            apply(cursor)
+        except Exception as e:
+            logger.error(f"Schema migration {version} ({description}) failed: {e}")
+            break
+        cursor.execute(
+            f"INSERT IGNORE INTO {MIGRATIONS_TABLE} (version, description) VALUES (%s, %s)",
+            (version, description)
+        )
+        applied.append(version)
+        logger.info(f"Applied schema migration {version}: {description}")
+    return applied
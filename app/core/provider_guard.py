@@ -0,0 +1,248 @@
+"""
+Per-provider request guard: an adaptive token bucket plus a circuit breaker.
+
+Every upstream request of a provider ("tradingview", "investing", "google", "yahoo") passes
+through get_guard(provider): the shared HTTP sessions / async clients (app/core/http_client.py)
+do it for every request, yfinance calls go through ProviderGuard.call().
+
+- Rate: PROVIDER_RATE_LIMITS[provider] requests per second, bursts of PROVIDER_RATE_BURST.
+  A 429/403 halves the rate (down to PROVIDER_RATE_MIN) and pauses the provider until its
+  Retry-After (PROVIDER_THROTTLE_HOLD when absent); successes restore the rate gradually.
+  A caller that would wait longer than PROVIDER_RATE_MAX_WAIT for a token fails fast.
+- Breaker: CIRCUIT_FAILURE_THRESHOLD consecutive failures (429/403, 5xx after retries,
+  connection errors) open the circuit; for CIRCUIT_RESET_TIMEOUT seconds requests fail fast
+  with ProviderUnavailable, then a single probe decides whether it closes again.
+
+Callers that hold cached data (quote cache, stale DB cache rows) serve it on ProviderUnavailable.
+"""
+import asyncio
+import email.utils
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.exceptions import CustomException
+from app.core.metrics import register_metrics_source
+from app.core.rate_limiter import AdaptiveRateLimiter
+from app.schemas.response import ResponseCode
+
+logger = logging.getLogger("fastapi")
+
+THROTTLE_STATUSES = (403, 429)
+
+
+class ProviderUnavailable(CustomException):
+    """Raised instead of calling a provider whose circuit is open or whose rate budget is exhausted."""
+
+    def __init__(self, provider: str, reason: str, retry_in: float = 0.0):
+        self.provider = provider
+        self.retry_in = retry_in
+        super().__init__(
+            ResponseCode.SERVICE_UNAVAILABLE,
+            f"{provider} temporarily unavailable ({reason}), retry in {retry_in:.0f}s",
+            {"provider": provider, "retry_in": round(retry_in, 1)}
+        )
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After header (delta-seconds or HTTP-date) -> seconds from now."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures; open rejects calls for
+    `reset_timeout` seconds, then half-open admits one probe: success closes the circuit,
+    failure opens it again. A probe that never reports back is replaced after reset_timeout.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stats = {"opened": 0, "rejected": 0}
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_started = None
+            if self.state == self.HALF_OPEN and (
+                    self._probe_started is None or now - self._probe_started >= self.reset_timeout):
+                self._probe_started = now
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def release(self):
+        """The admitted call never reached the provider; let another probe through."""
+        with self._lock:
+            self._probe_started = None
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self.state != self.CLOSED:
+                self.state = self.CLOSED
+                self._probe_started = None
+
+    def record_failure(self) -> bool:
+        """Returns True when this failure opened the circuit."""
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self._failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_started = None
+                self._stats["opened"] += 1
+                return True
+            return False
+
+    def retry_in(self) -> float:
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def stats(self) -> Dict[str, Any]:
+        retry_in = self.retry_in()
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._failures,
+                "retry_in": round(retry_in, 1),
+                **self._stats
+            }
+
+
+class ProviderGuard:
+    """Rate limiter and circuit breaker of one provider."""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.limiter = AdaptiveRateLimiter(
+            settings.PROVIDER_RATE_LIMITS.get(provider, settings.PROVIDER_RATE_DEFAULT),
+            burst=settings.PROVIDER_RATE_BURST,
+            min_rate=settings.PROVIDER_RATE_MIN,
+            hold=settings.PROVIDER_THROTTLE_HOLD
+        )
+        self.breaker = CircuitBreaker(settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_TIMEOUT)
+
+    def _admit(self, retry: bool) -> float:
+        # Retries of an admitted request only need a token, not another breaker slot
+        if not retry and not self.breaker.allow():
+            raise ProviderUnavailable(self.provider, "circuit open", self.breaker.retry_in())
+        wait = self.limiter.reserve(settings.PROVIDER_RATE_MAX_WAIT)
+        if wait is None:
+            if not retry:
+                self.breaker.release()
+            raise ProviderUnavailable(self.provider, "rate limited", settings.PROVIDER_RATE_MAX_WAIT)
+        return wait
+
+    def acquire(self, retry: bool = False):
+        """Block until the provider may be called; raises ProviderUnavailable instead of waiting too long."""
+        wait = self._admit(retry)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, retry: bool = False):
+        wait = self._admit(retry)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record(self, status: int, retry_after: Optional[str] = None):
+        """Feed back the final response status (after transport-level retries)."""
+        if status in THROTTLE_STATUSES:
+            delay = parse_retry_after(retry_after)
+            logger.warning(f"{self.provider} throttled us ({status}), slowing down"
+                           + (f", Retry-After {delay:.0f}s" if delay is not None else ""))
+            self.limiter.throttled(delay)
+            self._failure()
+        elif status >= 500:
+            self._failure()
+        else:
+            self.limiter.success()
+            self.breaker.record_success()
+
+    def record_error(self):
+        """Connection error / timeout after retries."""
+        self._failure()
+
+    def _failure(self):
+        if self.breaker.record_failure():
+            logger.error(f"Circuit for {self.provider} opened, failing fast for {self.breaker.reset_timeout:.0f}s")
+
+    def call(self, fn: Callable, *args, throttle_errors: Tuple[type, ...] = (), **kwargs) -> Any:
+        """
+        Run a third-party client call (yfinance) under the guard. Exceptions in throttle_errors
+        count as a 429; other exceptions are the caller's business and do not trip the breaker.
+        """
+        self.acquire()
+        try:
+            result = fn(*args, **kwargs)
+        except throttle_errors:
+            self.record(429)
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        self.record(200)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.breaker.stats(), "limiter": self.limiter.stats()}
+
+
+_guards: Dict[str, ProviderGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def get_guard(provider: str) -> ProviderGuard:
+    """The guard of a provider, created on first use."""
+    guard = _guards.get(provider)
+    if guard is None:
+        with _guards_lock:
+            guard = _guards.get(provider)
+            if guard is None:
+                guard = _guards[provider] = ProviderGuard(provider)
+    return guard
+
+
+def reset_guards():
+    """Drop all limiter/breaker state (settings changes, tests)."""
+    with _guards_lock:
+        _guards.clear()
+
+
+def guard_stats() -> Dict[str, Any]:
+    with _guards_lock:
+        guards = list(_guards.items())
+    return {provider: guard.stats() for provider, guard in guards}
+
+
+register_metrics_source("provider_guards", guard_stats)
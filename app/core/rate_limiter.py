@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket shared by threads and coroutines whose rate follows upstream throttling.
+
+    throttled(retry_after) cuts the rate by `decrease` (not below `min_rate`) and holds every
+    token until Retry-After (or `hold`) has passed; each success() adds back `increase` of the
+    base rate, so the rate climbs back once the provider accepts requests again.
+
+    reserve() takes a token, borrowing from the future when the bucket is empty, and returns
+    how long the caller has to wait for it; callers then sleep (thread) or await (coroutine)
+    outside the lock and are served in reservation order.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: float = 0.1, hold: float = 5.0,
+                 decrease: float = 0.5, increase: float = 0.05):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min(min_rate, rate) if rate > 0 else 0.0
+        self.hold = hold
+        self.decrease = decrease
+        self.increase = increase
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()  # may lie in the future while a Retry-After hold is active
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.throttled_count = 0
+        self.waited_seconds = 0.0
+
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Take a token and return the seconds to wait before using it.
+        Returns None (and takes nothing) when the wait would exceed max_wait.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated:
+                if self.rate > 0:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                else:
+                    self._tokens = float(self.burst)
+                self._updated = now
+            wait = self._updated - now
+            if self.rate > 0 and self._tokens < 1:
+                wait += (1 - self._tokens) / self.rate
+            if max_wait is not None and wait > max_wait:
+                return None
+            if self.rate > 0:
+                self._tokens -= 1
+            self.acquired += 1
+            self.waited_seconds += wait
+            return wait
+
+    def success(self):
+        with self._lock:
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * self.increase)
+
+    def throttled(self, retry_after: Optional[float] = None):
+        """The upstream answered 429/403: slow down and pause until Retry-After."""
+        with self._lock:
+            now = time.monotonic()
+            if self.rate > 0:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+            pause = self.hold if retry_after is None else retry_after
+            self._updated = max(self._updated, now + pause)
+            self._tokens = min(self._tokens, 0.0)
+            self.throttled_count += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rate": round(self.rate, 3),
+                "base_rate": self.base_rate,
+                "burst": self.burst,
+                "acquired": self.acquired,
+                "throttled": self.throttled_count,
+                "paused_for": round(max(0.0, self._updated - time.monotonic()), 3),
+                "waited_seconds": round(self.waited_seconds, 3)
+            }
@@ -0,0 +1,122 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from app.core.config import settings
+from app.core.metrics import register_metrics_source
+
+logger = logging.getLogger("fastapi")
+
+
+class BackgroundRefresher:
+    """
+    Stale-while-revalidate helper for the DB cache tables: callers serve the stale row
+    and hand the refetch to schedule(), which runs it on a small bounded pool.
+
+    - At most one pending/running refresh per key; duplicates are dropped.
+    - A key is not retried within `cooldown` seconds of its last attempt, so a failing
+      upstream is not hammered by every request that sees the stale row.
+    - At most `max_pending` refreshes wait for a worker; beyond that new ones are dropped
+      (the next stale read schedules again).
+    - is_stale() jitters the max age downwards, so rows written together do not all
+      expire (and refresh) at the same moment.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int, jitter: float, cooldown: float):
+        self.name = name
+        self._max_workers = max(1, max_workers)
+        self._max_pending = max_pending
+        self._jitter = min(max(jitter, 0.0), 1.0)
+        self._cooldown = cooldown
+
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, bool] = {}  # key -> started
+        self._last_attempt: Dict[Hashable, float] = {}
+        self._stats = {"scheduled": 0, "deduplicated": 0, "cooled_down": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+    def is_stale(self, age: timedelta, max_age: timedelta) -> bool:
+        return age > max_age * (1 - self._jitter * random.random())
+
+    def schedule(self, key: Hashable, fn: Callable, *args, **kwargs) -> bool:
+        """Queue fn(*args, **kwargs) as the refresh for key. Returns False when it was not queued."""
+        now = time.monotonic()
+        with self._lock:
+            if key in self._inflight:
+                self._stats["deduplicated"] += 1
+                return False
+            last = self._last_attempt.get(key)
+            if last is not None and now - last < self._cooldown:
+                self._stats["cooled_down"] += 1
+                return False
+            pending = sum(1 for started in self._inflight.values() if not started)
+            if pending >= self._max_pending:
+                self._stats["rejected"] += 1
+                return False
+            self._inflight[key] = False
+            self._last_attempt[key] = now
+            self._stats["scheduled"] += 1
+            if len(self._last_attempt) > 4 * self._max_pending:
+                self._prune(now)
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix=f"{self.name}-refresh")
+            pool = self._pool
+
+        try:
+            pool.submit(self._run, key, fn, args, kwargs)
+        except RuntimeError:
+            # Pool shut down (application stopping)
+            with self._lock:
+                self._inflight.pop(key, None)
+            return False
+        return True
+
+    def _run(self, key: Hashable, fn: Callable, args: tuple, kwargs: Dict[str, Any]):
+        with self._lock:
+            self._inflight[key] = True
+        try:
+            fn(*args, **kwargs)
+            outcome = "completed"
+        except Exception as e:
+            logger.error(f"{self.name} refresh failed for {key}: {e}")
+            outcome = "failed"
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def _prune(self, now: float):
+        expired = [k for k, t in self._last_attempt.items() if now - t >= self._cooldown and k not in self._inflight]
+        for k in expired:
+            del self._last_attempt[k]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["running"] = sum(1 for started in self._inflight.values() if started)
+            snapshot["pending"] = len(self._inflight) - snapshot["running"]
+        snapshot["max_workers"] = self._max_workers
+        snapshot["max_pending"] = self._max_pending
+        return snapshot
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared by the DB cache tables; keys are (namespace, cache key), e.g. ("related", "AAPL")
+cache_refresher = BackgroundRefresher(
+    name="cache",
+    max_workers=settings.CACHE_REFRESH_WORKERS,
+    max_pending=settings.CACHE_REFRESH_MAX_PENDING,
+    jitter=settings.CACHE_REFRESH_JITTER,
+    cooldown=settings.CACHE_REFRESH_COOLDOWN
+)
+register_metrics_source("cache_refresher", cache_refresher.stats)
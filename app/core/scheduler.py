@@ -1,6 +1,7 @@
+import asyncio
 from apscheduler.events import EVENT_JOB_SUBMITTED, EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from app.core.database import DBManager
+from app.core.async_database import AsyncDBManager
 
 import logging
 from apscheduler.triggers.cron import CronTrigger
@@ -13,43 +14,50 @@ logger = logging.getLogger("fastapi")
 
 class SchedulerService:
     _scheduler = None
-    _running_logs = {} # job_id -> log_id mapping (simple in-memory tracking)
+    _running_logs = {} # job_id -> pending log_job_start task (resolves to log_id)
+    _pending_log_tasks = set() # strong refs so finish-log tasks are not garbage collected
 
     @classmethod
     def job_listener(cls, event):
         """
         Listener for job events to log execution history.
+        AsyncIOScheduler dispatches events on the event loop, so the DB writes
+        are scheduled as tasks on AsyncDBManager instead of blocking the loop.
         """
         try:
             job_id = event.job_id
-            
+            loop = asyncio.get_running_loop()
+
             if event.code == EVENT_JOB_SUBMITTED:
-                # Job started
+                # Job started: keep the pending insert so finish can await its log id
                 meta = cls.get_job_metadata(job_id)
                 job_name = meta.get("title", job_id)
-                log_id = DBManager.log_job_start(job_id, job_name)
-                if log_id > 0:
-                    cls._running_logs[job_id] = log_id
-                    
-            elif event.code == EVENT_JOB_EXECUTED:
-                # Job finished successfully
-                log_id = cls._running_logs.get(job_id)
-                if log_id:
-                    DBManager.log_job_finish(log_id, "SUCCESS")
-                    # Clean up memory
-                    cls._running_logs.pop(job_id, None)
-                    
-            elif event.code == EVENT_JOB_ERROR:
-                # Job failed
-                log_id = cls._running_logs.get(job_id)
-                if log_id:
+                cls._running_logs[job_id] = loop.create_task(AsyncDBManager.log_job_start(job_id, job_name))
+
+            elif event.code in (EVENT_JOB_EXECUTED, EVENT_JOB_ERROR):
+                start_task = cls._running_logs.pop(job_id, None)
+                if start_task is None:
+                    return
+
+                if event.code == EVENT_JOB_EXECUTED:
+                    status, msg = "SUCCESS", ""
+                else:
+                    status = "FAILED"
                     msg = str(event.exception) if event.exception else "Unknown error"
-                    DBManager.log_job_finish(log_id, "FAILED", msg)
-                    cls._running_logs.pop(job_id, None)
-                    
+
+                task = loop.create_task(cls._log_job_finish(start_task, status, msg))
+                cls._pending_log_tasks.add(task)
+                task.add_done_callback(cls._pending_log_tasks.discard)
+
         except Exception as e:
             logger.error(f"Error in job listener: {e}")
 
+    @classmethod
+    async def _log_job_finish(cls, start_task: "asyncio.Task", status: str, message: str):
+        log_id = await start_task
+        if log_id > 0:
+            await AsyncDBManager.log_job_finish(log_id, status, message)
+
     @classmethod
     def start(cls):
         if cls._scheduler:
@@ -0,0 +1,120 @@
+import asyncio
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+from app.core.metrics import register_metrics_source
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls: while a call for `key` is in flight, other callers
+    with the same key wait for it and share its result (or exception) instead of issuing
+    their own upstream request. Nothing is cached once the call returns.
+
+    Works across threads (sync services, executor workers). Followers get a deep copy of
+    the result so callers may still mutate what they receive.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = {"calls": 0, "executed": 0, "coalesced": 0, "errors": 0}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._stats["executed"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["in_flight"] = len(self._calls)
+        return snapshot
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines on one event loop: followers await the leader's task
+    instead of blocking a thread. Same sharing and copying rules as SingleFlight.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._stats = {"calls": 0, "executed": 0, "coalesced": 0, "errors": 0}
+
+    async def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        self._stats["calls"] += 1
+        future = self._calls.get(key)
+        if future is not None:
+            self._stats["coalesced"] += 1
+            # shield: a cancelled follower must not cancel the shared call
+            return copy.deepcopy(await asyncio.shield(future))
+
+        self._stats["executed"] += 1
+        future = self._calls[key] = asyncio.ensure_future(fn(*args, **kwargs))
+        try:
+            return await asyncio.shield(future)
+        except BaseException:
+            if future.done() and not future.cancelled() and future.exception() is not None:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            if future.done():
+                self._calls.pop(key, None)
+            else:
+                # Leader cancelled while the call runs on: keep it shared until it finishes
+                future.add_done_callback(lambda _: self._calls.pop(key, None))
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = dict(self._stats)
+        snapshot["in_flight"] = len(self._calls)
+        return snapshot
+
+
+# Shared by all upstream providers; keys start with the provider name, e.g. ("yahoo", "info", "AAPL")
+upstream_flight = SingleFlight("upstream")
+register_metrics_source("single_flight", upstream_flight.stats)
+
+# Same key space, for the *_async provider variants
+async_upstream_flight = AsyncSingleFlight("upstream_async")
+register_metrics_source("single_flight_async", async_upstream_flight.stats)
@@ -0,0 +1,171 @@
+"""
+SQL instrumentation shared by the pymysql (DBManager) and aiomysql (AsyncDBManager) cursors.
+
+- Every statement is timed into a per-statement latency histogram keyed by a short
+  fingerprint ("SELECT fast_finance_yahoo_stock"), exposed as the "sql" metrics source.
+- Statement text is logged at SQL_LOG_LEVEL (DEBUG by default, i.e. off under the default
+  INFO root level), sampled at SQL_LOG_SAMPLE_RATE. Formatting is lazy: nothing is rendered
+  unless a handler actually emits the record, and long queries/arguments are truncated.
+- Statements slower than SQL_LOG_SLOW_MS are always logged at WARNING.
+"""
+import bisect
+import logging
+import random
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict
+
+from app.core.config import settings
+from app.core.metrics import register_metrics_source
+
+logger = logging.getLogger("fastapi.sql")
+
+# Histogram bucket upper bounds in milliseconds (last bucket: +inf)
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_VERB_TABLE = re.compile(
+    r"^\s*(?:(SELECT)\b.*?\bFROM\s+`?(\w+)|(INSERT)\s+(?:IGNORE\s+)?INTO\s+`?(\w+)|(UPDATE)\s+`?(\w+)"
+    r"|(DELETE)\s+FROM\s+`?(\w+)|(CREATE|ALTER|DROP|TRUNCATE)\s+TABLE\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?`?(\w+))",
+    re.IGNORECASE | re.DOTALL
+)
+
+
+@lru_cache(maxsize=512)
+def _fingerprint_cached(head: str) -> str:
+    match = _VERB_TABLE.match(head)
+    if not match:
+        words = head.split()
+        return words[0].upper() if words else "?"
+    groups = [g for g in match.groups() if g]
+    return f"{groups[0].upper()} {groups[1]}"
+
+
+def _text(query: Any) -> str:
+    # pymysql hands multi-row executemany statements to execute() already encoded
+    if isinstance(query, (bytes, bytearray)):
+        return query.decode("utf-8", errors="replace")
+    return query
+
+
+def fingerprint(query: Any) -> str:
+    # Only the head of the statement matters; keeps multi-MB bulk statements cheap
+    return _fingerprint_cached(_text(query[:300]))
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}...<{len(text) - limit} more chars>"
+
+
+class _LazyQuery:
+    __slots__ = ("query",)
+
+    def __init__(self, query: str):
+        self.query = query
+
+    def __str__(self):
+        limit = settings.SQL_LOG_MAX_QUERY_LENGTH
+        # Collapse whitespace on a bounded head only; the full text may be megabytes
+        head = " ".join(_text(self.query[:4 * limit]).split())
+        if len(self.query) > 4 * limit:
+            head += f" ...<{len(self.query)} bytes total>"
+        return _truncate(head, limit)
+
+
+class _LazyArgs:
+    __slots__ = ("args",)
+
+    def __init__(self, args: Any):
+        self.args = args
+
+    @staticmethod
+    def _render(value: Any) -> str:
+        limit = settings.SQL_LOG_MAX_ARG_LENGTH
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return f"<{len(value)} bytes>"
+        return _truncate(repr(value), limit)
+
+    def __str__(self):
+        args = self.args
+        if args is None:
+            return "-"
+        if isinstance(args, dict):
+            return "{" + ", ".join(f"{k!r}: {self._render(v)}" for k, v in args.items()) + "}"
+        if isinstance(args, (list, tuple)):
+            return "(" + ", ".join(self._render(v) for v in args) + ")"
+        return self._render(args)
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "errors", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        buckets = {f"le_{bound}ms": n for bound, n in zip(LATENCY_BUCKETS_MS, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": buckets
+        }
+
+
+class SqlStats:
+    """Thread-safe per-fingerprint latency histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, _Histogram] = {}
+
+    def observe(self, key: str, elapsed_ms: float, error: bool = False):
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = _Histogram()
+            hist.counts[bucket] += 1
+            hist.count += 1
+            hist.total_ms += elapsed_ms
+            hist.max_ms = max(hist.max_ms, elapsed_ms)
+            if error:
+                hist.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {key: hist.snapshot() for key, hist in sorted(self._histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+sql_stats = SqlStats()
+register_metrics_source("sql", sql_stats.snapshot)
+
+
+def _log_level() -> int:
+    return getattr(logging, settings.SQL_LOG_LEVEL.upper(), logging.DEBUG)
+
+
+def record_statement(query: str, args: Any, elapsed_ms: float, error: bool = False):
+    """Record one executed statement: histogram always, log line only when enabled/sampled or slow."""
+    sql_stats.observe(fingerprint(query), elapsed_ms, error)
+
+    slow = elapsed_ms >= settings.SQL_LOG_SLOW_MS
+    level = logging.WARNING if slow else _log_level()
+    if not logger.isEnabledFor(level):
+        return
+    if not slow and settings.SQL_LOG_SAMPLE_RATE < 1.0 and random.random() >= settings.SQL_LOG_SAMPLE_RATE:
+        return
+    logger.log(level, "[SQL] %.1fms %s %% %s%s", elapsed_ms, _LazyQuery(query), _LazyArgs(args),
+               " (failed)" if error else "")
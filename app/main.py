@@ -109,6 +109,19 @@ def create_app() -> FastAPI:
             # Don't fail up just log
             print(f"Startup task failed: {e}")
 
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        from app.core.database import DBManager
+        from app.core.async_database import AsyncDBManager
+        from app.core.executor import yahoo_executor
+        from app.core.refresher import cache_refresher
+        from app.core.http_client import close_sessions, close_async_clients
+        DBManager.close_pool()
+        yahoo_executor.shutdown()
+        cache_refresher.shutdown()
+        close_sessions()
+        await close_async_clients()
+        await AsyncDBManager.close_pool()
 
     return app
 
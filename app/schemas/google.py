@@ -1,6 +1,7 @@
 from enum import Enum
 from typing import List, Optional, Dict, Any, Union
 from pydantic import BaseModel, Field, ConfigDict
+from app.schemas.response import HistoryResponseFormat
 
 # --- Enums ---
 
@@ -34,6 +35,7 @@ class GoogleHistoryRequest(BaseModel):
     symbol: str = Field(..., description="股票代码 / Stock Symbol", example="AAPL")
     exchange: str = Field(..., description="交易所代码 / Exchange Code", example="NASDAQ")
     range: GoogleHistoryRange = Field(default=GoogleHistoryRange.mo1, description="时间范围 / Time Range")
+    format: HistoryResponseFormat = Field(default=HistoryResponseFormat.records, description="返回格式: records / columnar (按字段的数组) / arrow (Arrow IPC 二进制流) / Response Format")
 
 # --- Response Models ---
 
@@ -67,7 +69,7 @@ class GoogleHistoryResponse(BaseModel):
     symbol: str
     exchange: str
     range: str
-    data: List[GoogleHistoryItem]
+    data: Union[List[GoogleHistoryItem], Dict[str, List[Any]]]
 
 # --- Scraping Models ---
 
@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import Generic, TypeVar, Any, Optional
 from pydantic import BaseModel
 
@@ -11,6 +12,13 @@ class ResponseCode:
     NOT_FOUND = "404000"
     INTERNAL_ERROR = "500000"
     VALIDATION_ERROR = "422000"
+    SERVICE_UNAVAILABLE = "503000"
+    GATEWAY_TIMEOUT = "504000"
+
+class HistoryResponseFormat(str, Enum):
+    records = "records"    # [{date, open, ...}, ...]
+    columnar = "columnar"  # {date: [...], open: [...], ...}
+    arrow = "arrow"        # Arrow IPC stream (application/vnd.apache.arrow.stream), requires pyarrow
 
 class BaseResponse(BaseModel, Generic[T]):
     code: str
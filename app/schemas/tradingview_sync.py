@@ -22,5 +22,8 @@ class SyncTaskStatus(BaseModel):
     status: str
     processed_count: int
     total_count: int = 0
+    inserted_count: int = 0  # 新增行数
+    updated_count: int = 0  # 内容有变化而更新的行数
+    unchanged_count: int = 0  # 内容未变化而跳过写入的行数
     last_error: Optional[str] = None
     last_run_time: Optional[datetime] = None
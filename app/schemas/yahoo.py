@@ -1,6 +1,7 @@
 from enum import Enum
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from pydantic import BaseModel, Field, ConfigDict
+from app.schemas.response import HistoryResponseFormat
 
 # --- Enums ---
 
@@ -41,6 +42,10 @@ class FinancialsFrequency(str, Enum):
     yearly = "yearly"
     quarterly = "quarterly"
 
+class HistoryFormat(str, Enum):
+    records = "records"
+    columnar = "columnar"
+
 # --- Request Models ---
 
 class YahooInfoRequest(BaseModel):
@@ -57,6 +62,7 @@ class YahooHistoryRequest(BaseModel):
     interval: YahooInterval = Field(default=YahooInterval.d1, description="K线间隔 / Interval")
     auto_adjust: bool = Field(default=False, description="是否自动复权 / Auto Adjust")
     repair: bool = Field(default=True, description="是否修复100x错误 / Repair")
+    format: HistoryResponseFormat = Field(default=HistoryResponseFormat.records, description="返回格式: records / columnar (按字段的数组) / arrow (Arrow IPC 二进制流) / Response Format")
 
 # ... (Previous code continues, skipping down to Response)
 
@@ -232,6 +238,7 @@ class StockBaseDataRequestItem(BaseModel):
 
 class StockBaseDataBatchRequest(BaseModel):
     is_return_history: bool = Field(False, description="是否返回历史K线数据")
+    history_format: HistoryFormat = Field(HistoryFormat.records, description="历史K线格式: records (对象数组) / columnar (按字段的数组)")
     stock_list: List[StockBaseDataRequestItem] = Field(..., description="股票列表")
 
     model_config = {
@@ -256,6 +263,13 @@ class StockBaseDataBatchRequest(BaseModel):
         }
     }
 
+class YahooBatchLatestPriceRequest(BaseModel):
+    stock_list: List[StockBaseDataRequestItem] = Field(..., description="股票列表")
+
+class YahooBatchLatestPriceResponseItem(YahooLatestPriceResponse):
+    symbol: str = Field(..., description="请求的股票代码", example="AAPL")
+    exchange_acronym: str = Field(..., description="交易所缩写", example="NASDAQ")
+
 class CompanyOfficer(BaseModel):
     name: Optional[str] = None
     age: Optional[int] = None
@@ -445,6 +459,6 @@ class StockBaseDataResponseItem(BaseModel):
     five_year_trading_date_range: Optional[str] = Field(None, description="近5年交易日区间")
     
     # History
-    history: Optional[List[Dict[str, Any]]] = Field(None, description="近5年历史K线")
+    history: Optional[Union[List[Dict[str, Any]], Dict[str, List[Any]]]] = Field(None, description="近5年历史K线 (history_format=columnar 时为按字段的数组)")
 
 
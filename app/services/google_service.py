@@ -1,35 +1,23 @@
 
-import requests
+import asyncio
 import json
 import random
 import datetime
 import logging
 from bs4 import BeautifulSoup
 from typing import List, Dict, Any, Optional, Union
-from app.core.config import settings
+from app.core.http_client import get_session, get_async_client
 from app.core.utils import recursive_camel_case
+from app.core.singleflight import upstream_flight, async_upstream_flight
 
 logger = logging.getLogger("fastapi")
 
 class GoogleService:
     __base_path = 'https://www.google.com/finance/_/GoogleFinanceUi/data/batchexecute?'
-    __session = requests.Session()
-    
-    # Configure headers
-    __session.headers.update({
+    # Shared keep-alive session (proxy: PROXY_GOOGLE), see app/core/http_client.py
+    __headers = {
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    })
-    
-    # Configure Proxy
-    if settings.PROXY_GOOGLE:
-        __proxies = {
-            "http": settings.PROXY_GOOGLE,
-            "https": settings.PROXY_GOOGLE
-        }
-        __session.proxies.update(__proxies)
-        logger.info(f"Google Finance proxy set to: {settings.PROXY_GOOGLE}")
-    else:
-        __proxies = None
+    }
 
     __timeout = 15.0
 
@@ -94,95 +82,152 @@ class GoogleService:
 
     @classmethod
     def _batch_exec(cls, envelopes):
-        envs = envelopes if isinstance(envelopes, list) else [envelopes]
+        # Identical concurrent RPCs (same ids + data) share one upstream request
+        key = ("google", "batch_exec", cls._dump_json(envelopes))
+        return upstream_flight.do(key, cls._batch_exec_request, envelopes)
+
+    @classmethod
+    async def _batch_exec_async(cls, envelopes):
+        key = ("google", "batch_exec", cls._dump_json(envelopes))
+        return await async_upstream_flight.do(key, cls._batch_exec_request_async, envelopes)
+
+    @classmethod
+    def _batch_exec_call(cls, envs):
+        """(url, form payload) of a batchexecute call for the envelopes"""
         rpcids = '%2C'.join(list(dict.fromkeys([e['id'] for e in envs])))
         
-        if len(envs) == 0:
-            return []
-        elif len(envs) == 1:
+        if len(envs) == 1:
             payload = cls._dump_json([[[envs[0]['id'], cls._dump_json(envs[0]['data']), None, 'generic']]])
         else:
             payload = cls._dump_json([[[e['id'], cls._dump_json(e['data']), None, str(i + 1)] for i, e in enumerate(envs)]])
             
         path = f'rpcids={rpcids}&f.sid=-{cls._rand_num_str(19)}&bl=boq_finance-ui_20211101.11_p0&hl=en&_reqid={cls._rand_num_str(8)}'
+        return cls.__base_path + path, payload
+
+    @classmethod
+    def _batch_exec_request(cls, envelopes):
+        envs = envelopes if isinstance(envelopes, list) else [envelopes]
+        if len(envs) == 0:
+            return []
+        url, payload = cls._batch_exec_call(envs)
         
         try:
-            rsp = cls.__session.post(
-                cls.__base_path + path, 
+            rsp = get_session("google").post(
+                url, 
                 data={'f.req': payload}, # Use data for form-url-encoded kind of behavior if params fails, but user used params
                 params={'f.req': payload}, # Google usually expects this in body for POST but batch endpoint supports both. User used params.
+                headers=cls.__headers,
                 timeout=cls.__timeout
             )
             rsp.raise_for_status()
+            return cls._parse_batch_exec(rsp.text)
             
-            # Response parsing
-            # Google often returns: )]}' \n ... JSON ...
-            # User code: json.loads(rsp.text.split('\n')[2])
-            lines = rsp.text.split('\n')
-            
-            target_line = None
-            for line in lines:
-                if line.startswith('[['):
-                    target_line = line
-                    break
-            
-            if not target_line and len(lines) > 2:
-                 target_line = lines[2] # Fallback to user logic
-            
-            if not target_line:
-                raise Exception("Empty or invalid response format from Google Finance")
+        except Exception as e:
+            logger.error(f"Google Service Error: {e}")
+            raise e
 
-            rsps = json.loads(target_line)
-            
-            datas = []
-            for r in rsps:
-                if r[0] == 'er': 
-                    logger.error(f"Google RPC Error: {r[5]}")
-                    # Don't raise immediately for batch, maybe insert None? 
-                    # User raised exception.
-                    raise Exception(f'Google RPC Error: {r[5]}')
-                elif r[0] == 'wrb.fr':
-                    cur = json.loads(r[2])
-                    # Logic to insert at specific index
-                    idx = int(r[6] if r[6] != 'generic' else 1) - 1
-                    # Ensure datas list is long enough
-                    while len(datas) <= idx:
-                        datas.append(None)
-                    datas[idx] = cur if len(cur) > 0 else []
-            
-            return datas if len(datas) > 1 else datas[0]
-            
+    @classmethod
+    async def _batch_exec_request_async(cls, envelopes):
+        envs = envelopes if isinstance(envelopes, list) else [envelopes]
+        if len(envs) == 0:
+            return []
+        url, payload = cls._batch_exec_call(envs)
+
+        try:
+            rsp = await get_async_client("google").request(
+                "POST", url,
+                data={'f.req': payload},
+                params={'f.req': payload},
+                headers=cls.__headers,
+                timeout=cls.__timeout
+            )
+            rsp.raise_for_status()
+            return cls._parse_batch_exec(rsp.text)
         except Exception as e:
             logger.error(f"Google Service Error: {e}")
             raise e
 
+    @staticmethod
+    def _parse_batch_exec(text: str):
+        # Response parsing
+        # Google often returns: )]}' \n ... JSON ...
+        # User code: json.loads(rsp.text.split('\n')[2])
+        lines = text.split('\n')
+        
+        target_line = None
+        for line in lines:
+            if line.startswith('[['):
+                target_line = line
+                break
+        
+        if not target_line and len(lines) > 2:
+             target_line = lines[2] # Fallback to user logic
+        
+        if not target_line:
+            raise Exception("Empty or invalid response format from Google Finance")
+
+        rsps = json.loads(target_line)
+        
+        datas = []
+        for r in rsps:
+            if r[0] == 'er': 
+                logger.error(f"Google RPC Error: {r[5]}")
+                # Don't raise immediately for batch, maybe insert None? 
+                # User raised exception.
+                raise Exception(f'Google RPC Error: {r[5]}')
+            elif r[0] == 'wrb.fr':
+                cur = json.loads(r[2])
+                # Logic to insert at specific index
+                idx = int(r[6] if r[6] != 'generic' else 1) - 1
+                # Ensure datas list is long enough
+                while len(datas) <= idx:
+                    datas.append(None)
+                datas[idx] = cur if len(cur) > 0 else []
+        
+        return datas if len(datas) > 1 else datas[0]
+
+    @staticmethod
+    def _search_envelope(query: str):
+        # RPC ID 'mKsvE' for search
+        return {'id': 'mKsvE', 'data': [query, [], True, True]}
+
+    @classmethod
+    def _parse_search(cls, rsp) -> List[Dict[str, Any]]:
+        # rsp is typically [[match1], [match2], ...] wrapped
+        # User code: [parse_detail(e[3]) for e in rsp[0]]
+        if not rsp or len(rsp) == 0:
+            return []
+        
+        # rsp[0] contains the matches
+        matches = rsp[0]
+        results = []
+        
+        for e in matches:
+            # e[3] is the detail block
+            parsed = cls._parse_detail(e[3])
+            if parsed:
+                results.append(parsed)
+        
+        return results
+
     @classmethod
     def search(cls, query: str) -> List[Dict[str, Any]]:
-        # RPC ID 'mKsvE' for search
         try:
-            rsp = cls._batch_exec({'id': 'mKsvE', 'data': [query, [], True, True]})
-            # rsp is typically [[match1], [match2], ...] wrapped
-            # User code: [parse_detail(e[3]) for e in rsp[0]]
-            if not rsp or len(rsp) == 0:
-                return []
-            
-            # rsp[0] contains the matches
-            matches = rsp[0]
-            results = []
-            
-            for e in matches:
-                # e[3] is the detail block
-                parsed = cls._parse_detail(e[3])
-                if parsed:
-                    results.append(parsed)
-            
-            return results
+            return cls._parse_search(cls._batch_exec(cls._search_envelope(query)))
         except Exception as e:
             logger.error(f"Search error for {query}: {e}")
             return []
 
     @classmethod
-    def get_details(cls, items: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    async def search_async(cls, query: str) -> List[Dict[str, Any]]:
+        try:
+            return cls._parse_search(await cls._batch_exec_async(cls._search_envelope(query)))
+        except Exception as e:
+            logger.error(f"Search error for {query}: {e}")
+            return []
+
+    @staticmethod
+    def _details_envelopes(items: List[Dict[str, str]]):
         # items: [{"symbol": "AAPL", "exchange": "NASDAQ"}, ...]
         # RPC ID 'xh8wxf'
         # Data format: [[[None, ["CODE", "EXCHANGE"]]], True, False]
@@ -192,34 +237,39 @@ class GoogleService:
             symbol = item.get("symbol")
             exchange = item.get("exchange")
             req_data.append({'id': 'xh8wxf', 'data': [[[None, [symbol, exchange]]], True, False]})
+        return req_data
+
+    @classmethod
+    def _parse_details(cls, responses) -> List[Dict[str, Any]]:
+        # batch_exec returns a single item for a single request: standardize to a list
+        if not isinstance(responses, list):
+            responses = [responses]
             
+        results = []
+        for rsp in responses:
+            # rsp is complex array structure
+            # User code: parse_detail(out_array(e))
+            # out_array digs down
+            try:
+                data_block = cls._out_array(rsp)
+                parsed = cls._parse_detail(data_block)
+                results.append(parsed)
+            except:
+                results.append(None)
+        return results
+
+    @classmethod
+    def get_details(cls, items: List[Dict[str, str]]) -> List[Dict[str, Any]]:
         try:
-            responses = cls._batch_exec(req_data)
-            
-            # If batch_exec returns single item for single request, ensure list
-            if len(items) == 1 and not isinstance(responses, list):
-                responses = [responses]
-            # Wait, user's batch_exec returns single item if len(envs)==1. 
-            # If we sent list, we expect list back?
-            # User code: return datas if len(datas) > 1 else datas[0]
-            # We should standardize to always list for get_details?
-            # Let's adjust logic.
-            
-            if not isinstance(responses, list):
-                responses = [responses]
-                
-            results = []
-            for rsp in responses:
-                # rsp is complex array structure
-                # User code: parse_detail(out_array(e))
-                # out_array digs down
-                try:
-                    data_block = cls._out_array(rsp)
-                    parsed = cls._parse_detail(data_block)
-                    results.append(parsed)
-                except:
-                    results.append(None)
-            return results
+            return cls._parse_details(cls._batch_exec(cls._details_envelopes(items)))
+        except Exception as e:
+            logger.error(f"Get details error: {e}")
+            raise e
+
+    @classmethod
+    async def get_details_async(cls, items: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        try:
+            return cls._parse_details(await cls._batch_exec_async(cls._details_envelopes(items)))
         except Exception as e:
             logger.error(f"Get details error: {e}")
             raise e
@@ -232,7 +282,14 @@ class GoogleService:
         return {}
 
     @classmethod
-    def get_history(cls, symbol: str, exchange: str, range_str: str) -> List[Dict[str, Any]]:
+    async def get_detail_async(cls, symbol: str, exchange: str) -> Dict[str, Any]:
+        results = await cls.get_details_async([{"symbol": symbol, "exchange": exchange}])
+        if results:
+            return results[0]
+        return {}
+
+    @staticmethod
+    def _history_envelope(symbol: str, exchange: str, range_str: str):
         # Range Mapping & Verified Implicit Intervals:
         # 1: 1d (1 Minute)
         # 2: 5d (30 Minutes)
@@ -258,43 +315,55 @@ class GoogleService:
         
         # RPC ID 'AiCwsd'
         # Data: [[[None, ["CODE", "EXCHANGE"]]], range_val]
+        return {'id': 'AiCwsd', 'data': [[[None, [symbol, exchange]]], range_val]}
+
+    @classmethod
+    def _parse_history(cls, rsp) -> List[Dict[str, Any]]:
+        # User code: out_array(rsp)[3][0][1] -> list of [date, [start, end, etc], volume, ...]
+        # i[0] date, i[1] trading?, i[2] volume
         
-        try:
-            rsp = cls._batch_exec({'id': 'AiCwsd', 'data': [[[None, [symbol, exchange]]], range_val]})
+        data_block = cls._out_array(rsp)
+        if len(data_block) > 3 and data_block[3] and len(data_block[3]) > 0:
+             quotes_raw = data_block[3][0][1]
+        else:
+            return []
+            
+        results = []
+        for i in quotes_raw:
+            dt = cls._parse_datetime(i[0])
+            # trading info usually in i[1]: [open, close, high, low]? 
+            # User parse_trading: [0] last, [1] change, [2] percent. Not standard OHLC.
+            # History usually returns OHLC. 
+            # Google Finance History: [timestamp_min, close?, ?? ]
+            # User snippet: 'trading': parse_trading(i[1]), 'volume': i[2]
+            # parse_trading(i) -> last, change, percent
             
-            # User code: out_array(rsp)[3][0][1] -> list of [date, [start, end, etc], volume, ...]
-            # i[0] date, i[1] trading?, i[2] volume
+            # Let's trust user parsing logic for now
+            # BUT history usually needs Close price. 
+            # i[1][0] is likely the 'close' price for that interval.
             
-            data_block = cls._out_array(rsp)
-            if len(data_block) > 3 and data_block[3] and len(data_block[3]) > 0:
-                 quotes_raw = data_block[3][0][1]
-            else:
-                return []
-                
-            results = []
-            for i in quotes_raw:
-                dt = cls._parse_datetime(i[0])
-                # trading info usually in i[1]: [open, close, high, low]? 
-                # User parse_trading: [0] last, [1] change, [2] percent. Not standard OHLC.
-                # History usually returns OHLC. 
-                # Google Finance History: [timestamp_min, close?, ?? ]
-                # User snippet: 'trading': parse_trading(i[1]), 'volume': i[2]
-                # parse_trading(i) -> last, change, percent
-                
-                # Let's trust user parsing logic for now
-                # BUT history usually needs Close price. 
-                # i[1][0] is likely the 'close' price for that interval.
-                
-                trading = cls._parse_trading(i[1])
-                
-                results.append({
-                    "date": dt.isoformat(),
-                    "close": trading.get('last') if trading else None,
-                    "volume": i[2]
-                })
-                
-            return results
+            trading = cls._parse_trading(i[1])
+            
+            results.append({
+                "date": dt.isoformat(),
+                "close": trading.get('last') if trading else None,
+                "volume": i[2]
+            })
+            
+        return results
+
+    @classmethod
+    def get_history(cls, symbol: str, exchange: str, range_str: str) -> List[Dict[str, Any]]:
+        try:
+            return cls._parse_history(cls._batch_exec(cls._history_envelope(symbol, exchange, range_str)))
+        except Exception as e:
+            logger.error(f"Get history error for {symbol}:{exchange}: {e}")
+            return []
 
+    @classmethod
+    async def get_history_async(cls, symbol: str, exchange: str, range_str: str) -> List[Dict[str, Any]]:
+        try:
+            return cls._parse_history(await cls._batch_exec_async(cls._history_envelope(symbol, exchange, range_str)))
         except Exception as e:
             logger.error(f"Get history error for {symbol}:{exchange}: {e}")
             return []
@@ -306,125 +375,141 @@ class GoogleService:
         """
         url = f"https://www.google.com/finance/quote/{symbol}:{exchange}?hl=en"
         try:
-            rsp = cls.__session.get(url, timeout=cls.__timeout)
+            rsp = get_session("google").get(url, headers=cls.__headers, timeout=cls.__timeout)
             rsp.raise_for_status()
-            soup = BeautifulSoup(rsp.text, 'html.parser')
-            
-            # 1. Price
-            price_div = soup.find(class_="YMlKec fxKbKc")
-            price = price_div.text if price_div else None
-            
-            # 2. Currency
-            # e.g. "USD" usually near price or in stats
-            # For now simplified/skip or try to find in header
-            currency = "USD" # Default or find text
-
-            # 3. Change %
-            # NydbP nRedzd (negative) or P2Luy (positive)? Obfuscated.
-            # Look for percentage in header area
-            # Alternative: in generic batch it is reliable. Here just try best effort?
-            # Let's skip obscure change percent and rely on Stats for now if header is hard
-            
-            # 4. Stats
-            stats = {}
-            labels = ["Previous close", "Day range", "Year range", "Market cap", "Avg Volume", "P/E ratio", "Dividend yield", "Primary exchange"]
-            
-            for label in labels:
-                label_el = soup.find(string=label)
-                if label_el:
-                    parent = label_el.parent
-                    if parent:
-                        # Traversal logic from debug
-                        curr = parent
-                        found = False
-                        for i in range(3):
-                            if not curr: break
-                            sibling = curr.find_next_sibling()
-                            if sibling:
-                                text = sibling.get_text(strip=True)
-                                # Improved heuristic to avoid tooltips (descriptions)
-                                # Descriptions are usually long and non-numeric
-                                # Values usually have digits or symbols ($/%)
-                                
-                                is_valid = len(text) < 40 and (
-                                    any(c.isdigit() for c in text) or # Must contain digit
-                                    "NASDAQ" in text or "NYSE" in text or "SHA" in text or "HKG" in text # Exchange names
-                                )
-                                
-                                if text and is_valid:
-                                    stats[label] = text
-                                    found = True
-                                    break
-                            curr = curr.parent
-                        
-                        if not found and curr:
-                             # Last resort: P6K39c class?
-                             val_div = curr.find(class_="P6K39c")
-                             if val_div:
-                                 stats[label] = val_div.get_text()
-
-            # 5. About
-            about_data = {}
-            about_header = soup.find("div", string="About")
-            if about_header:
-                section = about_header.find_parent("section")
-                if not section:
-                    section = about_header.parent
-                    while section and len(section.get_text()) < 50:
-                        section = section.parent
-                
-                if section:
-                    desc_div = section.find("div", class_="bLLb2d")
-                    if desc_div:
-                        about_data['description'] = desc_div.get_text(strip=True)
-                    else:
-                        full_text = section.get_text(separator="\n", strip=True)
-                        lines = [l for l in full_text.split("\n") if len(l) > 50]
-                        if lines:
-                            about_data['description'] = lines[0]
-                            
-                    # CEO, Founded etc often in table div.gyFHrc in About section
-                    # Iterate rows?
-                    # Simply extracting description is likely enough for v1
-
-            # 6. Peers
-            peers = []
-            peer_header = soup.find("div", string="You may be interested in")
-            if not peer_header:
-                 peer_header = soup.find("div", string="People also search for")
-            
-            if peer_header:
-                 section = peer_header.find_parent("section")
-                 if section:
-                     links = section.find_all("a")
-                     for l in links:
-                         href = l.get("href", "")
-                         if "quote/" in href:
-                             txt = l.get_text(separator="|", strip=True).split("|")
-                             # txt usually: [Symbol, Name, Price, Change] or [Name, Symbol...]
-                             if len(txt) >= 2:
-                                 # Heuristic: Uppercase short is symbol?
-                                 # Just dump as is, maybe structured
-                                 p_symbol = txt[0]
-                                 p_name = txt[1] if len(txt) > 1 else ""
-                                 p_price = txt[2] if len(txt) > 2 else None
-                                 p_change = txt[3] if len(txt) > 3 else None
-                                 peers.append({
-                                     "symbol": p_symbol, 
-                                     "name": p_name,
-                                     "price": p_price,
-                                     "change_percent": p_change
-                                 })
-
-            return {
-                "symbol": symbol,
-                "exchange": exchange,
-                "price": price,
-                "currency": currency,
-                "stats": stats,
-                "about": about_data,
-                "peers": peers
-            }
+            return cls._parse_quote_page(symbol, exchange, rsp.text)
+        except Exception as e:
+            logger.error(f"Scrape quote error for {symbol}:{exchange}: {e}")
+            return {}
+
+    @classmethod
+    async def scrape_quote_async(cls, symbol: str, exchange: str) -> Dict[str, Any]:
+        url = f"https://www.google.com/finance/quote/{symbol}:{exchange}?hl=en"
+        try:
+            rsp = await get_async_client("google").request("GET", url, headers=cls.__headers, timeout=cls.__timeout)
+            rsp.raise_for_status()
+            # BeautifulSoup parsing is CPU work: keep it off the event loop
+            return await asyncio.to_thread(cls._parse_quote_page, symbol, exchange, rsp.text)
         except Exception as e:
             logger.error(f"Scrape quote error for {symbol}:{exchange}: {e}")
             return {}
+
+    @staticmethod
+    def _parse_quote_page(symbol: str, exchange: str, html: str) -> Dict[str, Any]:
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # 1. Price
+        price_div = soup.find(class_="YMlKec fxKbKc")
+        price = price_div.text if price_div else None
+        
+        # 2. Currency
+        # e.g. "USD" usually near price or in stats
+        # For now simplified/skip or try to find in header
+        currency = "USD" # Default or find text
+
+        # 3. Change %
+        # NydbP nRedzd (negative) or P2Luy (positive)? Obfuscated.
+        # Look for percentage in header area
+        # Alternative: in generic batch it is reliable. Here just try best effort?
+        # Let's skip obscure change percent and rely on Stats for now if header is hard
+        
+        # 4. Stats
+        stats = {}
+        labels = ["Previous close", "Day range", "Year range", "Market cap", "Avg Volume", "P/E ratio", "Dividend yield", "Primary exchange"]
+        
+        for label in labels:
+            label_el = soup.find(string=label)
+            if label_el:
+                parent = label_el.parent
+                if parent:
+                    # Traversal logic from debug
+                    curr = parent
+                    found = False
+                    for i in range(3):
+                        if not curr: break
+                        sibling = curr.find_next_sibling()
+                        if sibling:
+                            text = sibling.get_text(strip=True)
+                            # Improved heuristic to avoid tooltips (descriptions)
+                            # Descriptions are usually long and non-numeric
+                            # Values usually have digits or symbols ($/%)
+                            
+                            is_valid = len(text) < 40 and (
+                                any(c.isdigit() for c in text) or # Must contain digit
+                                "NASDAQ" in text or "NYSE" in text or "SHA" in text or "HKG" in text # Exchange names
+                            )
+                            
+                            if text and is_valid:
+                                stats[label] = text
+                                found = True
+                                break
+                        curr = curr.parent
+                    
+                    if not found and curr:
+                         # Last resort: P6K39c class?
+                         val_div = curr.find(class_="P6K39c")
+                         if val_div:
+                             stats[label] = val_div.get_text()
+
+        # 5. About
+        about_data = {}
+        about_header = soup.find("div", string="About")
+        if about_header:
+            section = about_header.find_parent("section")
+            if not section:
+                section = about_header.parent
+                while section and len(section.get_text()) < 50:
+                    section = section.parent
+            
+            if section:
+                desc_div = section.find("div", class_="bLLb2d")
+                if desc_div:
+                    about_data['description'] = desc_div.get_text(strip=True)
+                else:
+                    full_text = section.get_text(separator="\n", strip=True)
+                    lines = [l for l in full_text.split("\n") if len(l) > 50]
+                    if lines:
+                        about_data['description'] = lines[0]
+                        
+                # CEO, Founded etc often in table div.gyFHrc in About section
+                # Iterate rows?
+                # Simply extracting description is likely enough for v1
+
+        # 6. Peers
+        peers = []
+        peer_header = soup.find("div", string="You may be interested in")
+        if not peer_header:
+             peer_header = soup.find("div", string="People also search for")
+        
+        if peer_header:
+             section = peer_header.find_parent("section")
+             if section:
+                 links = section.find_all("a")
+                 for l in links:
+                     href = l.get("href", "")
+                     if "quote/" in href:
+                         txt = l.get_text(separator="|", strip=True).split("|")
+                         # txt usually: [Symbol, Name, Price, Change] or [Name, Symbol...]
+                         if len(txt) >= 2:
+                             # Heuristic: Uppercase short is symbol?
+                             # Just dump as is, maybe structured
+                             p_symbol = txt[0]
+                             p_name = txt[1] if len(txt) > 1 else ""
+                             p_price = txt[2] if len(txt) > 2 else None
+                             p_change = txt[3] if len(txt) > 3 else None
+                             peers.append({
+                                 "symbol": p_symbol, 
+                                 "name": p_name,
+                                 "price": p_price,
+                                 "change_percent": p_change
+                             })
+
+        return {
+            "symbol": symbol,
+            "exchange": exchange,
+            "price": price,
+            "currency": currency,
+            "stats": stats,
+            "about": about_data,
+            "peers": peers
+        }
@@ -1,7 +1,10 @@
+import asyncio
 import logging
+import httpx
 import requests
-from typing import Dict, Any, List, Optional
-from app.core.config import settings
+from typing import Dict, Any, List, Optional, Tuple
+from app.core.http_client import get_session, get_async_client
+from app.core.singleflight import upstream_flight, async_upstream_flight
 
 logger = logging.getLogger("fastapi")
 
@@ -21,8 +24,17 @@ class InvestingService:
         Returns:
             Dict of search results
         """
-        params = {"q": keyword}
-        
+        key = ("investing", "search", keyword, country_code, filter_type)
+        return upstream_flight.do(key, cls._search, keyword, country_code, filter_type)
+
+    @classmethod
+    async def search_async(cls, keyword: str, country_code: Optional[str] = None, filter_type: bool = True) -> Dict[str, Any]:
+        """Event-loop variant of search()"""
+        key = ("investing", "search", keyword, country_code, filter_type)
+        return await async_upstream_flight.do(key, cls._search_async, keyword, country_code, filter_type)
+
+    @staticmethod
+    def _search_headers(country_code: Optional[str]) -> Dict[str, str]:
         headers = {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "pragma": "no-cache",
@@ -31,40 +43,40 @@ class InvestingService:
         
         if country_code:
             headers["domain-id"] = str(country_code)
+        return headers
 
-        proxies = {}
-        if settings.PROXY_INVESTING:
-            proxies = {
-                "http": settings.PROXY_INVESTING,
-                "https": settings.PROXY_INVESTING,
-            }
+    @staticmethod
+    def _filter_search(data: Dict[str, Any], filter_type: bool) -> Dict[str, Any]:
+        # Remove unused fields
+        for field in ["tools", "events", "@pages"]:
+            data.pop(field, None)
+            
+        # Filter quotes by type
+        if filter_type and "quotes" in data and isinstance(data["quotes"], list):
+            valid_types = ["株式", "股票", "Stock"]
+            data["quotes"] = [
+                item for item in data["quotes"]
+                if any(k in item.get("type", "") for k in valid_types)
+            ]
+            
+        return data
+
+    @classmethod
+    def _search(cls, keyword: str, country_code: Optional[str], filter_type: bool) -> Dict[str, Any]:
+        params = {"q": keyword}
+        headers = cls._search_headers(country_code)
 
         try:
             logger.info(f"Searching Investing.com for '{keyword}' with headers {headers}")
-            response = requests.get(
+            response = get_session("investing").get(
                 cls.BASE_URL, 
                 params=params, 
                 headers=headers, 
-                proxies=proxies, 
                 timeout=10
             )
             response.raise_for_status()
             
-            data = response.json()
-            
-            # Remove unused fields
-            for field in ["tools", "events", "@pages"]:
-                data.pop(field, None)
-                
-            # Filter quotes by type
-            if filter_type and "quotes" in data and isinstance(data["quotes"], list):
-                valid_types = ["株式", "股票", "Stock"]
-                data["quotes"] = [
-                    item for item in data["quotes"]
-                    if any(k in item.get("type", "") for k in valid_types)
-                ]
-                
-            return data
+            return cls._filter_search(response.json(), filter_type)
             
         except requests.RequestException as e:
             logger.error(f"Error searching Investing.com: {str(e)}")
@@ -72,6 +84,20 @@ class InvestingService:
             # For now, returning empty list as per service pattern seen in yahoo_service.
             return []
 
+    @classmethod
+    async def _search_async(cls, keyword: str, country_code: Optional[str], filter_type: bool) -> Dict[str, Any]:
+        headers = cls._search_headers(country_code)
+        try:
+            logger.info(f"Searching Investing.com for '{keyword}' with headers {headers}")
+            response = await get_async_client("investing").request(
+                "GET", cls.BASE_URL, params={"q": keyword}, headers=headers, timeout=10
+            )
+            response.raise_for_status()
+            return cls._filter_search(response.json(), filter_type)
+        except httpx.HTTPError as e:
+            logger.error(f"Error searching Investing.com: {str(e)}")
+            return []
+
     @classmethod
     def get_translations(cls, symbol: str, country_codes: List[str]) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -79,7 +105,43 @@ class InvestingService:
         """
         # 1. Search in US to get base info and ID (using lowercase 'us' as base)
         us_data = cls.search(symbol, country_code="us")
-        
+
+        local_results = []
+        for code in country_codes:
+            try:
+                # Disable type filtering for translations
+                local_results.append((code, cls.search(symbol, country_code=code, filter_type=False)))
+            except Exception as e:
+                logger.warning(f"Failed to fetch translation for {code}: {e}")
+
+        return cls._merge_translations(us_data, local_results)
+
+    @classmethod
+    async def get_translations_async(cls, symbol: str, country_codes: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Event-loop variant of get_translations(): the US search and the per-country searches
+        run concurrently.
+        """
+        results = await asyncio.gather(
+            cls.search_async(symbol, country_code="us"),
+            *(cls.search_async(symbol, country_code=code, filter_type=False) for code in country_codes),
+            return_exceptions=True
+        )
+        us_data = results[0]
+        if isinstance(us_data, Exception):
+            raise us_data
+
+        local_results = []
+        for code, local_data in zip(country_codes, results[1:]):
+            if isinstance(local_data, Exception):
+                logger.warning(f"Failed to fetch translation for {code}: {local_data}")
+                continue
+            local_results.append((code, local_data))
+
+        return cls._merge_translations(us_data, local_results)
+
+    @staticmethod
+    def _merge_translations(us_data: Dict[str, Any], local_results: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
         # Initialize containers
         # Quotes: Map by ID for aggregation
         quotes_map = {}
@@ -121,26 +183,19 @@ class InvestingService:
         add_flat_items(us_data, "us")
 
         # 2. Iterate country codes
-        for code in country_codes:
-            try:
-                # Disable type filtering for translations
-                local_data = cls.search(symbol, country_code=code, filter_type=False)
-                
-                # 1. Quotes (Match against US Base)
-                if "quotes" in local_data and isinstance(local_data["quotes"], list):
-                     for quote in local_data["quotes"]:
-                        q_id = quote.get("id")
-                        if q_id in quotes_map:
-                            quotes_map[q_id]["country_codes"].append({
-                                "country_code": code,
-                                "description": quote.get("description")
-                            })
-                
-                # 2. News/Articles (Accumulate)
-                add_flat_items(local_data, code)
-                                
-            except Exception as e:
-                logger.warning(f"Failed to fetch translation for {code}: {e}")
+        for code, local_data in local_results:
+            # 1. Quotes (Match against US Base)
+            if "quotes" in local_data and isinstance(local_data["quotes"], list):
+                 for quote in local_data["quotes"]:
+                    q_id = quote.get("id")
+                    if q_id in quotes_map:
+                        quotes_map[q_id]["country_codes"].append({
+                            "country_code": code,
+                            "description": quote.get("description")
+                        })
+            
+            # 2. News/Articles (Accumulate)
+            add_flat_items(local_data, code)
 
         # Return categorized results
         return {
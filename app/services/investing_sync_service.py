@@ -1,17 +1,23 @@
-import requests
 import time
 import random
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from typing import List, Dict, Any, Optional
 
+from app.core.config import settings
 from app.core.database import DBManager
+from app.core.http_client import get_session
 from app.core.constants import get_all_exchanges, PLATFORM_INVESTING
 from app.schemas.response import BaseResponse
 from app.schemas.tradingview_sync import SyncTaskStatus
 
 logger = logging.getLogger(__name__)
 
+# Screener locales: "cn" is the primary source (Chinese names), "us" adds the English names
+LOCALES = ("cn", "us")
+PAGE_LIMIT = 100
+
 class InvestingSyncService:
     def __init__(self):
         self._is_running = False
@@ -48,6 +54,8 @@ class InvestingSyncService:
     def _run_sync_process(self):
         logger.info("Starting Investing.com sync process...")
         total_processed = 0
+        self._pool = ThreadPoolExecutor(max_workers=max(1, settings.INVESTING_SYNC_FETCH_WORKERS),
+                                        thread_name_prefix="investing-sync-fetch")
         try:
             exchanges = get_all_exchanges()
             
@@ -78,185 +86,218 @@ class InvestingSyncService:
             self._task_status.last_error = str(e)
             self._task_status.status = "Failed"
         finally:
+            self._pool.shutdown(wait=False, cancel_futures=True)
             self._is_running = False
             self._task_status.is_running = False
-            logger.info(f"Investing sync finished. Total processed: {total_processed}")
+            logger.info(
+                f"Investing sync finished. Total processed: {total_processed}, "
+                f"inserted: {self._task_status.inserted_count}, updated: {self._task_status.updated_count}, "
+                f"unchanged: {self._task_status.unchanged_count}"
+            )
 
     def _sync_exchange(self, exchange_info: Dict[str, str]) -> int:
+        """
+        Fetch CN and EN screener pages concurrently (shared rate budget), merge rows by pairID
+        as pages arrive and upsert merged items in chunks.
+        Only rows still waiting for their other-locale counterpart are held in memory.
+        """
         acronym = exchange_info["acronym"]
-        market_code = exchange_info.get("country_code", "cn").upper() # default cn implies market CN? 
-        # Wait, country_code in constants: 'cn' -> market 'CN'. 'us' -> market? 'US'?
-        # User example: market: "CN".
-        # Let's map country_code to market code roughly.
+        # Map country_code to the screener market code (user example: market "CN")
         market_map = {"cn": "CN", "hk": "HK", "us": "US", "uk": "GB", "sg": "SG", "jp": "JP", "in": "IN", "ca": "CA", "au": "AU", "kr": "KR", "tw": "TW"}
         market = market_map.get(exchange_info.get("country_code", "").lower(), "CN")
         
         exchange_name = exchange_info["investing_code"] # e.g. "Shanghai"
         
-        logger.info(f"[{acronym}] Fetching CN data (market={market}, exchange={exchange_name})...")
-        # 1. Fetch CN Data
-        cn_rows_map = self._fetch_all_rows(domain_id="cn", market=market, exchange=exchange_name)
-        logger.info(f"[{acronym}] Fetched {len(cn_rows_map)} CN rows.")
-        
-        logger.info(f"[{acronym}] Fetching EN data (market={market}, exchange={exchange_name})...")
-        # 2. Fetch EN Data
-        en_rows_map = self._fetch_all_rows(domain_id="us", market=market, exchange=exchange_name)
-        logger.info(f"[{acronym}] Fetched {len(en_rows_map)} EN rows.")
-        
-        # 3. Merge and Save
-        merged_items = []
-        
-        # Iterate over CN rows (primary source)
-        for pair_id, cn_row in cn_rows_map.items():
-            en_row = en_rows_map.get(pair_id)
-            
-            # Extract fields
-            # Row structure: {"asset": {...}, "data": [...]}
-            asset_cn = cn_row.get("asset", {})
-            data_cn = cn_row.get("data", [])
+        logger.info(f"[{acronym}] Fetching CN/EN data (market={market}, exchange={exchange_name})...")
+        merger = _LocaleMerger(acronym, self._task_status)
+        fetched = self._fetch_pages(market, exchange_name, merger)
+        logger.info(f"[{acronym}] Fetched {fetched['cn']} CN rows, {fetched['us']} EN rows.")
+
+        # CN rows without an EN counterpart are still saved (CN is the primary source)
+        merger.finish()
+        merger.flush()
+        return merger.written
+
+    def _fetch_pages(self, market: str, exchange: str, merger: "_LocaleMerger") -> Dict[str, int]:
+        """
+        Page both locales on the shared pool. Up to INVESTING_SYNC_PAGE_PREFETCH pages per locale
+        are requested ahead; a locale stops issuing pages after a short/empty page or an error.
+        """
+        prefetch = max(1, settings.INVESTING_SYNC_PAGE_PREFETCH)
+        state = {domain_id: {"next_skip": 0, "done": False, "in_flight": 0} for domain_id in LOCALES}
+        fetched = {domain_id: 0 for domain_id in LOCALES}
+        pending = {}
+
+        def fill():
+            for domain_id, st in state.items():
+                while not st["done"] and st["in_flight"] < prefetch and self._is_running:
+                    future = self._pool.submit(self._fetch_page, domain_id, market, exchange, st["next_skip"], PAGE_LIMIT)
+                    pending[future] = (domain_id, st["next_skip"])
+                    st["next_skip"] += PAGE_LIMIT
+                    st["in_flight"] += 1
+
+        fill()
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                domain_id, skip = pending.pop(future)
+                st = state[domain_id]
+                st["in_flight"] -= 1
+                rows = future.result()
+                if rows is None or len(rows) < PAGE_LIMIT:
+                    if not st["done"]:
+                        logger.info(f"Stopping pagination: domain={domain_id}, exchange={exchange}, skip={skip}, rows={None if rows is None else len(rows)}")
+                    st["done"] = True
+                if rows:
+                    fetched[domain_id] += len(rows)
+                    merger.add(domain_id, rows)
+            fill()
+        return fetched
+
+    def _fetch_page(self, domain_id: str, market: str, exchange: str, skip: int, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Fetch one screener page. Returns None on error."""
+        try:
+            # Random requested-with (numeric) as per user feedback
+            rand_suffix = "".join([random.choice("0123456789") for _ in range(8)])
             
-            asset_en = en_row.get("asset", {}) if en_row else {}
-            data_en = en_row.get("data", []) if en_row else []
+            headers = {
+                "domain-id": domain_id,
+                "x-requested-with": f"investing-client/{rand_suffix}",
+                "Content-Type": "application/json",
+                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+            }
             
-            # Safe getters
-            def get_data_val(data_list, idx):
-                return data_list[idx].get("value") if len(data_list) > idx else None
+            payload = {
+                "query": {
+                    "filters": [],
+                    "sort": {
+                        "metric": "marketcap_adj_latest",
+                        "direction": "DESC"
+                    },
+                    "prefilters": {
+                        "primaryOnly": True,
+                        "market": market,
+                        "exchange": [exchange]
+                    }
+                },
+                "metrics": [
+                    "investing_exchange",
+                    "investing_sector",
+                    "investing_industry"
+                ],
+                "page": {
+                    "skip": skip,
+                    "limit": limit
+                }
+            }
             
-            # Construct DB Item
-            # tradingview_full_stock_symbol construction: ACRONYM:TICKER
-            # Ticker is in asset['ticker']
-            ticker = asset_cn.get("ticker", "")
+            url = "https://www.investing.com/pro/_/screener-v2/query"
             
-            # DEBUG: Log Ford
-            if ticker == 'F':
-                logger.info(f"Processing Ford (F): CN_PairID={pair_id}, EN_Found={en_row is not None}, CN_Name={asset_cn.get('name')}, EN_Name={asset_en.get('name')}")
+            # Rate limiting: the shared "investing" session paces every request (provider guard)
+            logger.info(f"Requesting page: domain={domain_id}, market={market}, exchange={exchange}, skip={skip}, limit={limit}")
             
-            tv_symbol = f"{acronym}:{ticker}" if ticker else ""
+            resp = get_session("investing").post(url, json=payload, headers=headers, timeout=30)
             
-            item = {
-                "investing_stock_pair_id": pair_id,
-                "investing_stock_uid": asset_cn.get("uid"),
-                "tradingview_full_stock_symbol": tv_symbol,
-                "stock_symbol": ticker,
-                "exchange_acronym": acronym,
-                "logo_url": asset_cn.get("logo"),
-                
-                "name_cn": asset_cn.get("name"),
-                "name_en": asset_en.get("name"), # Might match ticker or English name
+            if resp.status_code != 200:
+                logger.error(f"Investing API error: {resp.status_code} - {resp.text[:500]} - Params: skip={skip}, market={market}, exchange={exchange}")
+                return None
                 
-                # data[1] is Sector, data[2] is Industry (based on user Example columns order)
-                # Metrics: ["investing_exchange", "investing_sector", "investing_industry"]
-                "investing_sector_cn": get_data_val(data_cn, 1),
-                "investing_sector_en": get_data_val(data_en, 1),
-                
-                "investing_industry_cn": get_data_val(data_cn, 2),
-                "investing_industry_en": get_data_val(data_en, 2),
-            }
-            merged_items.append(item)
-        
-        # Batch Upsert
-        # Process in chunks of 500
-        processed = 0
-        chunk_size = 500
-        for i in range(0, len(merged_items), chunk_size):
-            chunk = merged_items[i:i + chunk_size]
-            DBManager.upsert_investing_batch(chunk)
-            processed += len(chunk)
+            rows = resp.json().get("rows", [])
+            logger.info(f"Page fetched: domain={domain_id}, skip={skip}, {len(rows)} rows.")
+            return rows
+        except Exception as e:
+            logger.error(f"Error fetching data at domain={domain_id}, skip={skip}: {e}")
+            return None
+
+
+class _LocaleMerger:
+    """
+    Joins CN and EN screener rows by pairID as pages arrive and upserts merged items
+    in chunks of INVESTING_SYNC_WRITE_CHUNK. Rows are reduced to the few fields used
+    and dropped as soon as they are merged.
+    """
+
+    def __init__(self, acronym: str, status: SyncTaskStatus):
+        self.acronym = acronym
+        self.status = status
+        self.waiting: Dict[str, Dict[int, Dict[str, Any]]] = {domain_id: {} for domain_id in LOCALES}
+        self.merged_ids = set()
+        self.buffer: List[Dict[str, Any]] = []
+        self.written = 0
+
+    @staticmethod
+    def _compact(row: Dict[str, Any]) -> Dict[str, Any]:
+        # Row structure: {"asset": {...}, "data": [...]}
+        asset = row.get("asset", {})
+        data = row.get("data", [])
+
+        # Safe getters
+        def get_data_val(idx):
+            return data[idx].get("value") if len(data) > idx else None
+
+        # data[1] is Sector, data[2] is Industry (based on user Example columns order)
+        # Metrics: ["investing_exchange", "investing_sector", "investing_industry"]
+        return {
+            "uid": asset.get("uid"),
+            "ticker": asset.get("ticker", ""),
+            "logo": asset.get("logo"),
+            "name": asset.get("name"),
+            "sector": get_data_val(1),
+            "industry": get_data_val(2)
+        }
+
+    def add(self, domain_id: str, rows: List[Dict[str, Any]]):
+        other_id = "us" if domain_id == "cn" else "cn"
+        for row in rows:
+            pair_id = row.get("asset", {}).get("pairID")
+            if not pair_id or pair_id in self.merged_ids:
+                continue
+            compact = self._compact(row)
+            other = self.waiting[other_id].pop(pair_id, None)
+            if other is None:
+                self.waiting[domain_id][pair_id] = compact
+                continue
+            cn, en = (compact, other) if domain_id == "cn" else (other, compact)
+            self._emit(pair_id, cn, en)
+
+    def finish(self):
+        for pair_id, cn in list(self.waiting["cn"].items()):
+            self._emit(pair_id, cn, {})
+        self.waiting = {domain_id: {} for domain_id in LOCALES}
+
+    def _emit(self, pair_id: int, cn: Dict[str, Any], en: Dict[str, Any]):
+        self.merged_ids.add(pair_id)
+        # tradingview_full_stock_symbol construction: ACRONYM:TICKER
+        ticker = cn.get("ticker", "")
+        self.buffer.append({
+            "investing_stock_pair_id": pair_id,
+            "investing_stock_uid": cn.get("uid"),
+            "tradingview_full_stock_symbol": f"{self.acronym}:{ticker}" if ticker else "",
+            "stock_symbol": ticker,
+            "exchange_acronym": self.acronym,
+            "logo_url": cn.get("logo"),
             
-        return processed
+            "name_cn": cn.get("name"),
+            "name_en": en.get("name"), # Might match ticker or English name
+            
+            "investing_sector_cn": cn.get("sector"),
+            "investing_sector_en": en.get("sector"),
+            
+            "investing_industry_cn": cn.get("industry"),
+            "investing_industry_en": en.get("industry"),
+        })
+        if len(self.buffer) >= settings.INVESTING_SYNC_WRITE_CHUNK:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        stats = DBManager.upsert_investing_batch(self.buffer)
+        self.written += len(self.buffer)
+        self.status.inserted_count += stats["inserted"]
+        self.status.updated_count += stats["updated"]
+        self.status.unchanged_count += stats["unchanged"]
+        self.buffer = []
 
-    def _fetch_all_rows(self, domain_id: str, market: str, exchange: str) -> Dict[int, Dict]:
-        """
-        Fetch all pages for a given domain/market/exchange.
-        Returns a map of pairID -> row object.
-        """
-        all_rows = {}
-        skip = 0
-        limit = 100
-        
-        while True:
-            try:
-                # Random requested-with (numeric) as per user feedback
-                rand_suffix = "".join([random.choice("0123456789") for _ in range(8)])
-                
-                headers = {
-                    "domain-id": domain_id,
-                    "x-requested-with": f"investing-client/{rand_suffix}",
-                    "Content-Type": "application/json",
-                    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                }
-                
-                payload = {
-                    "query": {
-                        "filters": [],
-                        "sort": {
-                            "metric": "marketcap_adj_latest",
-                            "direction": "DESC"
-                        },
-                        "prefilters": {
-                            "primaryOnly": True,
-                            "market": market,
-                            "exchange": [exchange]
-                        }
-                    },
-                    "metrics": [
-                        "investing_exchange",
-                        "investing_sector",
-                        "investing_industry"
-                    ],
-                    "page": {
-                        "skip": skip,
-                        "limit": limit
-                    }
-                }
-                
-                url = "https://www.investing.com/pro/_/screener-v2/query"
-                
-                proxies = None
-                from app.core.config import settings
-                if settings.PROXY_INVESTING:
-                    proxies = {
-                        "http": settings.PROXY_INVESTING,
-                        "https": settings.PROXY_INVESTING
-                    }
-                
-                # Log request start (debug level to avoid spam, or info if needed for debugging now)
-                logger.info(f"Requesting page: domain={domain_id}, market={market}, exchange={exchange}, skip={skip}, limit={limit}")
-                
-                resp = requests.post(url, json=payload, headers=headers, timeout=30, proxies=proxies)
-                
-                if resp.status_code != 200:
-                    logger.error(f"Investing API error: {resp.status_code} - {resp.text[:500]} - Params: skip={skip}, market={market}, exchange={exchange}")
-                    break
-                    
-                data = resp.json()
-                rows = data.get("rows", [])
-                
-                logger.info(f"Page fetched: {len(rows)} rows. (Total collected so far: {len(all_rows) + len(rows)})")
-                
-                if not rows:
-                    logger.info("Empty rows returned, stopping pagination.")
-                    break
-                    
-                for row in rows:
-                    pair_id = row.get("asset", {}).get("pairID")
-                    if pair_id:
-                        all_rows[pair_id] = row
-                
-                # Check pagination
-                current_rows_count = len(rows)
-                if current_rows_count < limit:
-                    logger.info(f"Fetched fewer rows than limit ({current_rows_count} < {limit}), stopping pagination.")
-                    break
-                    
-                skip += limit
-                
-                # Rate limit protection
-                time.sleep(2)
-            except Exception as e:
-                logger.error(f"Error fetching data at skip={skip}: {e}")
-                break
-                
-        return all_rows
 
 investing_sync_service = InvestingSyncService()
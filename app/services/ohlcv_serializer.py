@@ -0,0 +1,151 @@
+"""
+Column-wise OHLCV DataFrame serialization (replaces per-row iterrows formatting).
+
+ohlcv_columns() formats every field once per column:
+  - dates straight from the int64 index values (no per-row isoformat/strftime/timestamp)
+  - NaN / inf become None via a single mask per column
+and returns {field: [values...]}. columns_to_records() zips it into the usual list of dicts.
+columns_to_arrow_ipc() packs the same columns into an Arrow IPC stream (needs the optional pyarrow).
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.exceptions import CustomException
+from app.schemas.response import ResponseCode
+
+# response field -> yfinance column
+OHLCV_FIELDS = {
+    "open": "Open",
+    "high": "High",
+    "low": "Low",
+    "close": "Close",
+    "adj_close": "Adj Close",
+    "volume": "Volume"
+}
+
+# Date formats for ohlcv_columns(date_fields=...)
+DATE_ISO = "iso"      # Timestamp.isoformat(), e.g. 2026-10-16T00:00:00-04:00
+DATE_DAY = "day"      # 2026-10-16 (exchange-local)
+DATE_EPOCH = "epoch"  # int unix seconds
+
+# Response formats of the /history endpoints
+FORMAT_RECORDS = "records"
+FORMAT_COLUMNAR = "columnar"
+FORMAT_ARROW = "arrow"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+_UNIT_PER_SECOND = {"s": 1, "ms": 1_000, "us": 1_000_000, "ns": 1_000_000_000}
+
+
+def _offset_suffixes(index: pd.DatetimeIndex) -> np.ndarray:
+    # "+HH:MM" per row, formatted once per distinct UTC offset (DST gives at most a few)
+    naive_local = index.tz_localize(None).as_unit("s").asi8
+    utc = index.tz_convert("UTC").tz_localize(None).as_unit("s").asi8
+    offsets = naive_local - utc
+    labels = {}
+    for off in np.unique(offsets):
+        sign = "+" if off >= 0 else "-"
+        hours, minutes = divmod(abs(int(off)) // 60, 60)
+        labels[off] = f"{sign}{hours:02d}:{minutes:02d}"
+    return pd.Series(offsets).map(labels).to_numpy(dtype=object)
+
+
+def _format_dates(index: pd.DatetimeIndex, fmt: str) -> List[Any]:
+    if fmt == DATE_EPOCH:
+        return (index.asi8 // _UNIT_PER_SECOND[index.unit]).tolist()
+
+    local = index.tz_localize(None) if index.tz is not None else index
+    if fmt == DATE_DAY:
+        return np.datetime_as_string(local.values, unit="D").tolist()
+
+    if fmt != DATE_ISO:
+        raise ValueError(f"Unknown date format: {fmt}")
+    if (local.asi8 % _UNIT_PER_SECOND[local.unit]).any():
+        # Sub-second bars are not produced by yfinance; keep exact isoformat semantics anyway
+        return [ts.isoformat() for ts in index]
+    text = np.datetime_as_string(local.values, unit="s").astype(object)
+    if index.tz is not None:
+        text = text + _offset_suffixes(index)
+    return text.tolist()
+
+
+def _format_values(series: pd.Series, na_value: Any = None) -> List[Any]:
+    if series.dtype.kind in "iu":
+        return series.tolist()
+    values = series.to_numpy(dtype="float64", na_value=np.nan)
+    missing = ~np.isfinite(values)
+    out = values.astype(object)
+    if missing.any():
+        out[missing] = na_value
+    return out.tolist()
+
+
+def _format_volume(series: pd.Series, na_value: Any) -> List[Any]:
+    values = series.to_numpy(dtype="float64", na_value=np.nan)
+    missing = ~np.isfinite(values)
+    out = np.where(missing, 0, values).astype(np.int64).astype(object)
+    if missing.any():
+        out[missing] = na_value
+    return out.tolist()
+
+
+def ohlcv_columns(df: pd.DataFrame, date_fields: Optional[Dict[str, str]] = None,
+                  volume_na: Any = 0, newest_first: bool = False) -> Dict[str, List[Any]]:
+    """
+    :param df: yfinance history frame (DatetimeIndex, OHLCV columns; missing columns become None)
+    :param date_fields: output field -> DATE_ISO / DATE_DAY / DATE_EPOCH, default {"date": DATE_ISO}
+    :param volume_na: value used for missing volume
+    :param newest_first: reverse row order
+    """
+    if date_fields is None:
+        date_fields = {"date": DATE_ISO}
+    if newest_first:
+        df = df.iloc[::-1]
+
+    index = df.index
+    if not isinstance(index, pd.DatetimeIndex):
+        index = pd.DatetimeIndex(index)
+
+    columns: Dict[str, List[Any]] = {}
+    for field, fmt in date_fields.items():
+        columns[field] = _format_dates(index, fmt)
+
+    n = len(df)
+    for field, col in OHLCV_FIELDS.items():
+        if col not in df.columns:
+            columns[field] = [volume_na if field == "volume" else None] * n
+        elif field == "volume":
+            columns[field] = _format_volume(df[col], volume_na)
+        else:
+            columns[field] = _format_values(df[col])
+    return columns
+
+
+def columns_to_records(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    keys = list(columns.keys())
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+
+def records_to_columns(records: List[Dict[str, Any]], fields: Optional[List[str]] = None) -> Dict[str, List[Any]]:
+    if fields is None:
+        fields = list(records[0].keys()) if records else []
+    return {field: [r.get(field) for r in records] for field in fields}
+
+
+def columns_to_arrow_ipc(columns: Dict[str, Any]) -> bytes:
+    """
+    Serialize columns as a single-batch Arrow IPC stream.
+    Pass a DatetimeIndex (instead of ISO strings) for date columns to get a native timestamp type.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise CustomException(code=ResponseCode.BAD_REQUEST, message="format=arrow requires the optional 'pyarrow' package")
+
+    table = pa.table({name: pa.array(values) for name, values in columns.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,105 @@
+"""
+Trailing return windows (YTD / 3M / 6M / 1Y / 3Y / 5Y) over daily history.
+
+For every window the base price is the last bar on or before the window anchor
+(exchange-local date). All anchors of all symbols are resolved with a single
+np.searchsorted over one concatenated, sorted day-number array.
+"""
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+RETURN_WINDOWS = ("YTD", "3M", "6M", "1Y", "3Y", "5Y")
+
+_PERIODS = {
+    "3M": relativedelta(months=3),
+    "6M": relativedelta(months=6),
+    "1Y": relativedelta(years=1),
+    "3Y": relativedelta(years=3),
+    "5Y": relativedelta(years=5)
+}
+
+# Symbol i's day numbers are shifted by i * _SYMBOL_STRIDE so one sorted array holds every symbol
+_SYMBOL_STRIDE = 1 << 20
+_EPOCH = date(1970, 1, 1)
+
+ReturnsResult = Tuple[Dict[str, Optional[float]], Dict[str, Optional[str]]]
+
+
+def window_anchors(as_of_date: date) -> Dict[str, date]:
+    anchors = {"YTD": date(as_of_date.year - 1, 12, 31)}
+    for key, delta in _PERIODS.items():
+        anchors[key] = as_of_date - delta
+    return anchors
+
+
+def _local_days(index: pd.DatetimeIndex) -> np.ndarray:
+    # Exchange-local calendar day of each bar, as int64 days since epoch
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.values.astype("datetime64[D]").astype(np.int64)
+
+
+def compute_returns_batch(series: Sequence[Tuple[Optional[pd.DataFrame], Any, date]],
+                          price_col: str = "Adj Close") -> List[ReturnsResult]:
+    """
+    :param series: (history, end_price, as_of_date) per symbol; history may be None/empty
+    :return: per symbol, ({window: return}, {window: "base_date:as_of_date"}), in input order
+    """
+    results: List[ReturnsResult] = []
+    day_chunks, price_chunks, anchor_keys = [], [], []
+    starts = []
+    offset = 0
+
+    for i, (hist, end_price, as_of_date) in enumerate(series):
+        results.append(({k: None for k in RETURN_WINDOWS}, {k: None for k in RETURN_WINDOWS}))
+        starts.append(offset)
+        if hist is None or hist.empty or price_col not in hist.columns or end_price is None:
+            anchor_keys.append(None)
+            continue
+
+        if not hist.index.is_monotonic_increasing:
+            hist = hist.sort_index()
+        days = _local_days(hist.index)
+        day_chunks.append(days + i * _SYMBOL_STRIDE)
+        price_chunks.append(hist[price_col].to_numpy(dtype="float64"))
+        offset += len(days)
+
+        anchors = window_anchors(as_of_date)
+        anchor_keys.append(np.array(
+            [(anchors[k] - _EPOCH).days + i * _SYMBOL_STRIDE for k in RETURN_WINDOWS], dtype=np.int64
+        ))
+
+    if not day_chunks:
+        return results
+
+    all_days = np.concatenate(day_chunks)
+    all_prices = np.concatenate(price_chunks)
+    queried = [i for i, keys in enumerate(anchor_keys) if keys is not None]
+    positions = np.searchsorted(all_days, np.concatenate([anchor_keys[i] for i in queried]), side="right") - 1
+
+    n = len(RETURN_WINDOWS)
+    for j, i in enumerate(queried):
+        hist, end_price, as_of_date = series[i]
+        returns, ranges = results[i]
+        as_of_iso = as_of_date.isoformat()
+        for k, pos in zip(RETURN_WINDOWS, positions[j * n:(j + 1) * n]):
+            # pos below this symbol's first row means no bar on or before the anchor
+            if pos < starts[i]:
+                continue
+            p0 = all_prices[pos]
+            if not p0:
+                continue
+            returns[k] = (end_price / p0) - 1
+            base_day = date.fromordinal(_EPOCH.toordinal() + int(all_days[pos] - i * _SYMBOL_STRIDE))
+            ranges[k] = f"{base_day.isoformat()}:{as_of_iso}"
+
+    return results
+
+
+def compute_returns(hist: Optional[pd.DataFrame], end_price: Any, as_of_date: date,
+                    price_col: str = "Adj Close") -> ReturnsResult:
+    return compute_returns_batch([(hist, end_price, as_of_date)], price_col)[0]
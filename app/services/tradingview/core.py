@@ -1,5 +1,7 @@
 
 import requests
+import httpx
+import asyncio
 import json
 import datetime
 import logging
@@ -8,6 +10,9 @@ from typing import List, Dict, Optional, Any, Union
 from .technicals import Compute, Recommendation
 from app.schemas.tradingview import ScreenerEnum, IntervalEnum
 from app.core.config import settings
+from app.core.http_client import get_session, get_async_client
+from app.core.provider_guard import ProviderUnavailable
+from app.core.singleflight import upstream_flight, async_upstream_flight
 
 logger = logging.getLogger(__name__)
 
@@ -60,17 +65,42 @@ class TradingView:
 
     @staticmethod
     def request(method: str, url: str, **kwargs) -> requests.Response:
-        """Unified request handler with proxy support"""
+        """Unified request handler on the shared TradingView session (keep-alive, proxy, retries)"""
         kwargs.setdefault("headers", TradingView.headers)
         kwargs.setdefault("timeout", 10)
-        
-        if settings.PROXY_TRADINGVIEW:
-            kwargs["proxies"] = {
-                "http": settings.PROXY_TRADINGVIEW,
-                "https": settings.PROXY_TRADINGVIEW
-            }
-            
-        return requests.request(method, url, **kwargs)
+        return get_session("tradingview").request(method, url, **kwargs)
+
+    @staticmethod
+    async def request_async(method: str, url: str, **kwargs) -> httpx.Response:
+        """request() on the shared async TradingView client"""
+        kwargs.setdefault("headers", TradingView.headers)
+        kwargs.setdefault("timeout", 10)
+        return await get_async_client("tradingview").request(method, url, **kwargs)
+
+    @staticmethod
+    def scan(scan_url: str, payload: dict) -> List[dict]:
+        """
+        POST a scanner request and return its "data" rows.
+        Identical concurrent scans (same screener + payload) share one upstream request.
+        """
+        def fetch():
+            res = TradingView.request("POST", scan_url, json=payload)
+            res.raise_for_status()
+            return res.json()["data"]
+
+        key = ("tradingview", "scan", scan_url, json.dumps(payload, sort_keys=True))
+        return upstream_flight.do(key, fetch)
+
+    @staticmethod
+    async def scan_async(scan_url: str, payload: dict) -> List[dict]:
+        """Event-loop variant of scan()"""
+        async def fetch():
+            res = await TradingView.request_async("POST", scan_url, json=payload)
+            res.raise_for_status()
+            return res.json()["data"]
+
+        key = ("tradingview", "scan", scan_url, json.dumps(payload, sort_keys=True))
+        return await async_upstream_flight.do(key, fetch)
 
     @staticmethod
     def data(symbols: List[str], interval: str, indicators: List[str]) -> dict:
@@ -95,43 +125,59 @@ class TradingView:
         }
         return json_body
 
+    SEARCH_URL = "https://symbol-search.tradingview.com/symbol_search"
+
     @staticmethod
     def search(text: str, type_filter: str = None) -> List[dict]:
         """Search for assets on TradingView using custom headers to bypass WAF"""
-        url = "https://symbol-search.tradingview.com/symbol_search"
         params = {"text": text, "type": type_filter}
         
         # 强制 GET 请求，这是绕过 WAF 的关键
         try:
-            res = TradingView.request("GET", url, params=params)
+            res = TradingView.request("GET", TradingView.SEARCH_URL, params=params)
             res.raise_for_status() # 抛出非 200 异常
             
             # 安全解析 JSON
-            symbols = res.json()
-            
-            results = []
-            for symbol in symbols:
-                logo = None
-                if "logoid" in symbol:
-                    logo = f"https://s3-symbol-logo.tradingview.com/{symbol['logoid']}.svg"
-                elif "base-currency-logoid" in symbol:
-                    logo = f"https://s3-symbol-logo.tradingview.com/{symbol['base-currency-logoid']}.svg"
-                elif "country" in symbol:
-                    logo = f"https://s3-symbol-logo.tradingview.com/country/{symbol['country']}.svg"
-                    
-                results.append({
-                    "symbol": symbol["symbol"],
-                    "exchange": symbol["exchange"],
-                    "type": symbol.get("type", ""),
-                    "description": symbol.get("description", ""),
-                    "logo": logo
-                })
-            return results
+            return TradingView._parse_search(res.json())
             
         except Exception as e:
             logger.error(f"TradingView Search Error: {e}")
             raise e
 
+    @staticmethod
+    async def search_async(text: str, type_filter: str = None) -> List[dict]:
+        """Event-loop variant of search()"""
+        # requests drops None params, httpx would send them empty
+        params = {k: v for k, v in {"text": text, "type": type_filter}.items() if v is not None}
+        try:
+            res = await TradingView.request_async("GET", TradingView.SEARCH_URL, params=params)
+            res.raise_for_status()
+            return TradingView._parse_search(res.json())
+        except Exception as e:
+            logger.error(f"TradingView Search Error: {e}")
+            raise e
+
+    @staticmethod
+    def _parse_search(symbols: List[dict]) -> List[dict]:
+        results = []
+        for symbol in symbols:
+            logo = None
+            if "logoid" in symbol:
+                logo = f"https://s3-symbol-logo.tradingview.com/{symbol['logoid']}.svg"
+            elif "base-currency-logoid" in symbol:
+                logo = f"https://s3-symbol-logo.tradingview.com/{symbol['base-currency-logoid']}.svg"
+            elif "country" in symbol:
+                logo = f"https://s3-symbol-logo.tradingview.com/country/{symbol['country']}.svg"
+                
+            results.append({
+                "symbol": symbol["symbol"],
+                "exchange": symbol["exchange"],
+                "type": symbol.get("type", ""),
+                "description": symbol.get("description", ""),
+                "logo": logo
+            })
+        return results
+
 
 def calculate(indicators_val: dict, indicators_key: List[str], screener: str, symbol: str, exchange: str, interval: str) -> Analysis:
     """内部计算函数，处理指标数据并生成推荐信结果"""
@@ -315,8 +361,7 @@ class TA_Handler:
         self.interval = interval
         self.indicators = TradingView.indicators.copy()
         
-    def get_analysis(self) -> Analysis:
-        """Fetch and compute analysis"""
+    def _scan_request(self):
         if not self.screener or not self.exchange or not self.symbol:
              raise ValueError("Screener, Exchange, and Symbol are required.")
              
@@ -324,39 +369,53 @@ class TA_Handler:
         payload = TradingView.data([exchange_symbol], self.interval, self.indicators)
         
         scan_url = f"{TradingView.scan_url}{self.screener.lower()}/scan"
+        return exchange_symbol, scan_url, payload
+
+    def _analysis_from(self, data: List[dict], exchange_symbol: str) -> Analysis:
+        if not data:
+            raise ValueError(f"No analysis data found for {exchange_symbol}")
+            
+        # data[0]["d"] 是指标值的数组
+        result_values = data[0]["d"]
         
+        # 映射为 dict
+        indicators_val = {}
+        for i, key in enumerate(self.indicators):
+             if i < len(result_values):
+                 indicators_val[key] = result_values[i]
+                 
+        return calculate(
+            indicators_val=indicators_val,
+            indicators_key=self.indicators,
+            screener=self.screener,
+            symbol=self.symbol,
+            exchange=self.exchange,
+            interval=self.interval
+        )
+
+    def get_analysis(self) -> Analysis:
+        """Fetch and compute analysis"""
+        exchange_symbol, scan_url, payload = self._scan_request()
         try:
-            res = TradingView.request("POST", scan_url, json=payload)
-            res.raise_for_status()
-            
-            data = res.json()["data"]
-            if not data:
-                raise ValueError(f"No analysis data found for {exchange_symbol}")
-                
-            # data[0]["d"] 是指标值的数组
-            result_values = data[0]["d"]
-            
-            # 映射为 dict
-            indicators_val = {}
-            for i, key in enumerate(self.indicators):
-                 if i < len(result_values):
-                     indicators_val[key] = result_values[i]
-                     
-            return calculate(
-                indicators_val=indicators_val,
-                indicators_key=self.indicators,
-                screener=self.screener,
-                symbol=self.symbol,
-                exchange=self.exchange,
-                interval=self.interval
-            )
-            
+            return self._analysis_from(TradingView.scan(scan_url, payload), exchange_symbol)
+        except Exception as e:
+            logger.error(f"TA_Handler get_analysis error: {e}")
+            raise e
+
+    async def get_analysis_async(self) -> Analysis:
+        """Event-loop variant of get_analysis()"""
+        exchange_symbol, scan_url, payload = self._scan_request()
+        try:
+            return self._analysis_from(await TradingView.scan_async(scan_url, payload), exchange_symbol)
         except Exception as e:
             logger.error(f"TA_Handler get_analysis error: {e}")
             raise e
 
-def get_multiple_analysis(screener: str, interval: str, symbols: List[str]) -> Dict[str, Analysis]:
-    """Fetch multiple analysis"""
+def _multiple_scan_request(screener: str, interval: str, symbols: List[str]):
+    """
+    Validate the symbols and split them (upper-cased, de-duplicated) into scanner payloads
+    of at most TRADINGVIEW_SCAN_CHUNK_SIZE tickers. Returns (scan_url, [(chunk, payload), ...]).
+    """
     if not screener or not symbols:
          raise ValueError("Screener and Symbols are required.")
          
@@ -364,55 +423,110 @@ def get_multiple_analysis(screener: str, interval: str, symbols: List[str]) -> D
     for s in symbols:
         if ":" not in s:
             raise ValueError(f"Invalid symbol format: {s}. Expected EXCHANGE:SYMBOL")
-            
-    payload = TradingView.data(symbols, interval, TradingView.indicators)
+
+    unique = list(dict.fromkeys(s.upper() for s in symbols))
+    size = max(1, settings.TRADINGVIEW_SCAN_CHUNK_SIZE)
+    chunks = [unique[i:i + size] for i in range(0, len(unique), size)]
     scan_url = f"{TradingView.scan_url}{screener.lower()}/scan"
-    
+    return scan_url, [(chunk, TradingView.data(chunk, interval, TradingView.indicators)) for chunk in chunks]
+
+# 5xx and connection errors are already retried by the async client (HTTP_RETRIES); a chunk is
+# only retried again after a timeout, or after a 429 once the guard's Retry-After pause has passed.
+RETRYABLE_SCAN_ERRORS = (httpx.TimeoutException,)
+
+def _retryable(e: Exception) -> bool:
+    if isinstance(e, ProviderUnavailable):
+        return False
+    if isinstance(e, RETRYABLE_SCAN_ERRORS):
+        return True
+    return getattr(getattr(e, "response", None), "status_code", None) == 429
+
+async def _scan_chunk_async(scan_url: str, payload: dict) -> List[dict]:
+    """scan_async() with up to TRADINGVIEW_SCAN_CHUNK_RETRIES retries (exponential HTTP_RETRY_BACKOFF)"""
+    attempt = 0
+    while True:
+        try:
+            return await TradingView.scan_async(scan_url, payload)
+        except Exception as e:
+            if attempt >= settings.TRADINGVIEW_SCAN_CHUNK_RETRIES or not _retryable(e):
+                raise
+            logger.warning(f"TradingView scan chunk failed ({e}), retry {attempt + 1}")
+            await asyncio.sleep(settings.HTTP_RETRY_BACKOFF * (2 ** attempt))
+            attempt += 1
+
+def _merge_chunks(chunks: List[tuple], outcomes: List[Union[List[dict], BaseException]]) -> List[dict]:
+    """
+    Concatenate the rows of all chunks. A chunk that still failed after its retries only leaves
+    its own symbols without data; when every chunk failed the first error is raised.
+    """
+    errors = [o for o in outcomes if isinstance(o, BaseException)]
+    if errors and len(errors) == len(outcomes):
+        raise errors[0]
+    data = []
+    for (chunk, _), outcome in zip(chunks, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.error(f"TradingView scan chunk of {len(chunk)} symbols ({chunk[0]} ...) failed: {outcome}")
+        else:
+            data.extend(outcome)
+    return data
+
+def _multiple_analysis_from(data: List[dict], screener: str, interval: str, symbols: List[str]) -> Dict[str, Analysis]:
     final_results = {}
+
+    # data 是一个 list，每一项对应一个 symbol 的结果
+    # item["s"] 是 "EXCHANGE:SYMBOL"
+    # item["d"] 是 values array
     
-    try:
-        res = TradingView.request("POST", scan_url, json=payload)
-        res.raise_for_status()
+    for item in data:
+        symbol_key = item["s"]
+        values = item["d"]
         
-        data = res.json()["data"]
+        # map to dict
+        indicators_val = {}
+        for i, key in enumerate(TradingView.indicators):
+            if i < len(values):
+                indicators_val[key] = values[i]
         
-        # data 是一个 list，每一项对应一个 symbol 的结果
-        # item["s"] 是 "EXCHANGE:SYMBOL"
-        # item["d"] 是 values array
+        split_sym = symbol_key.split(":")
+        exchange_name = split_sym[0]
+        ticker_name = split_sym[1]
         
-        for item in data:
-            symbol_key = item["s"]
-            values = item["d"]
-            
-            # map to dict
-            indicators_val = {}
-            for i, key in enumerate(TradingView.indicators):
-                if i < len(values):
-                    indicators_val[key] = values[i]
-            
-            split_sym = symbol_key.split(":")
-            exchange_name = split_sym[0]
-            ticker_name = split_sym[1]
-            
-            analysis = calculate(
-                indicators_val=indicators_val,
-                indicators_key=TradingView.indicators,
-                screener=screener,
-                symbol=ticker_name,
-                exchange=exchange_name,
-                interval=interval
-            )
-            
-            final_results[symbol_key] = analysis
-            
-        # 填充没有数据的 symbol 为 None
-        for s in symbols:
-            s_upper = s.upper()
-            if s_upper not in final_results:
-                final_results[s_upper] = None
-                
-        return final_results
+        analysis = calculate(
+            indicators_val=indicators_val,
+            indicators_key=TradingView.indicators,
+            screener=screener,
+            symbol=ticker_name,
+            exchange=exchange_name,
+            interval=interval
+        )
+        
+        final_results[symbol_key] = analysis
         
+    # 填充没有数据的 symbol 为 None
+    for s in symbols:
+        s_upper = s.upper()
+        if s_upper not in final_results:
+            final_results[s_upper] = None
+            
+    return final_results
+
+async def get_multiple_analysis_async(screener: str, interval: str, symbols: List[str]) -> Dict[str, Analysis]:
+    """
+    Fetch multiple analysis.
+    Symbols are scanned in chunks (TRADINGVIEW_SCAN_CHUNK_SIZE), up to TRADINGVIEW_SCAN_CONCURRENCY
+    chunks at a time; the shared TradingView rate limiter paces the requests.
+    """
+    scan_url, chunks = _multiple_scan_request(screener, interval, symbols)
+    semaphore = asyncio.Semaphore(max(1, settings.TRADINGVIEW_SCAN_CONCURRENCY))
+
+    async def run(payload: dict) -> List[dict]:
+        async with semaphore:
+            return await _scan_chunk_async(scan_url, payload)
+
+    try:
+        outcomes = await asyncio.gather(*(run(payload) for _, payload in chunks), return_exceptions=True)
+        data = _merge_chunks(chunks, outcomes)
+        return _multiple_analysis_from(data, screener, interval, symbols)
     except Exception as e:
         logger.error(f"get_multiple_analysis error: {e}")
         raise e
@@ -1,16 +1,35 @@
 import logging
-import requests
 import json
-import time
+import queue
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+from app.core.config import settings
 from app.core.database import DBManager
+from app.core.http_client import get_session
 from app.core.constants import EXCHANGE_MAPPING
 from app.schemas.tradingview_sync import SyncTaskStatus, TradingViewStockBase
 
 logger = logging.getLogger("fastapi")
 
+RANGE_SIZE = 800 # Match curl example range size
+
+
+def _format_date(ts):
+    if ts is None:
+        return None
+    try:
+        # Verify ts type and cast if necessary
+        val = float(ts)
+        # Use datetime.fromtimestamp with utc to handle negative timestamps safely
+        dt = datetime.fromtimestamp(val, tz=timezone.utc)
+        return dt.strftime('%Y-%m-%d')
+    except Exception:
+        # Fallback to the raw value
+        return str(ts)
+
+
 class TradingViewSyncService:
     _instance = None
     _lock = threading.Lock()
@@ -62,12 +81,18 @@ class TradingViewSyncService:
             self._task_status.status = "Stopping..."
 
     def _run_sync_process(self, ipo_offer_date_type: Optional[str] = None):
+        """
+        Staged pipeline:
+          fetch   - one task per exchange on a small pool, every range request paced by the shared
+                    TradingView rate limiter / circuit breaker (app/core/provider_guard.py)
+          write   - a single writer thread transforms raw pages and upserts them in batches
+        Fetchers hand raw pages to the writer through a bounded queue, so a slow DB pauses fetching.
+        """
         logger.info(f"Starting TradingView sync process (IPO Filter: {ipo_offer_date_type})...")
+        total_processed = 0
         try:
             DBManager.init_tradingview_table()
             
-            total_processed = 0
-            
             # Use defined exchanges or a predefined list of major exchanges if specific traversal is needed.
             # The user request implies "Traverse exchange". We can use EXCHANGE_MAPPING from constants.py
             # But that mapping is limited. The user prompt curl example includes:
@@ -84,17 +109,36 @@ class TradingViewSyncService:
                     exchanges.append(ex)
             
             logger.info(f"Target exchanges for sync: {exchanges}")
-            self._task_status.total_count = 0 # converting to 'unknown' or just tracking processed
-            
-            for exchange in exchanges:
-                if self._stop_event.is_set():
-                    break
-                    
-                self._task_status.status = f"Processing {exchange}..."
-                count = self._sync_exchange(exchange, ipo_offer_date_type)
-                total_processed += count
-                self._task_status.processed_count = total_processed
-                
+            self._task_status.total_count = 0 # filled in from each exchange's totalCount as first pages arrive
+
+            pages: queue.Queue = queue.Queue(maxsize=settings.TRADINGVIEW_SYNC_QUEUE_SIZE)
+            progress = {"exchanges_done": 0, "exchanges": len(exchanges), "processed": 0}
+            progress_lock = threading.Lock()
+
+            writer = threading.Thread(target=self._write_pages, args=(pages, progress, progress_lock),
+                                      name="tradingview-sync-writer", daemon=True)
+            writer.start()
+            self._task_status.status = f"Processing 0/{len(exchanges)} exchanges..."
+
+            try:
+                with ThreadPoolExecutor(max_workers=max(1, settings.TRADINGVIEW_SYNC_FETCH_WORKERS),
+                                        thread_name_prefix="tradingview-sync-fetch") as pool:
+                    futures = [
+                        pool.submit(self._sync_exchange, exchange, pages, progress_lock, ipo_offer_date_type)
+                        for exchange in exchanges
+                    ]
+                    for future in as_completed(futures):
+                        future.result()
+                        with progress_lock:
+                            progress["exchanges_done"] += 1
+                            if not self._stop_event.is_set():
+                                self._task_status.status = f"Processing {progress['exchanges_done']}/{len(exchanges)} exchanges..."
+            finally:
+                # Let the writer drain what is already fetched
+                pages.put(None)
+                writer.join()
+                total_processed = progress["processed"]
+
             self._task_status.status = "Completed"
             
         except Exception as e:
@@ -112,115 +156,129 @@ class TradingViewSyncService:
             except Exception as e:
                 logger.error(f"Cleanup failed: {e}")
                 
-            logger.info(f"TradingView sync finished. Total processed: {total_processed}")
+            logger.info(
+                f"TradingView sync finished. Total processed: {total_processed}, "
+                f"inserted: {self._task_status.inserted_count}, updated: {self._task_status.updated_count}, "
+                f"unchanged: {self._task_status.unchanged_count}"
+            )
 
-    def _sync_exchange(self, exchange: str, ipo_offer_date_type: Optional[str] = None) -> int:
+    def _sync_exchange(self, exchange: str, pages: queue.Queue,
+                       progress_lock: threading.Lock, ipo_offer_date_type: Optional[str] = None) -> int:
         """
-        Fetch and save stocks for a specific exchange.
-        Handles pagination manually via range.
+        Fetch stage for one exchange: page through the ranges and hand raw items to the writer.
+        Handles pagination manually via range. Returns the number of raw items fetched.
         """
-        processed_count = 0
-        BATCH_SIZE = 800 # Match curl example range size
+        fetched = 0
         start = 0
         
-        while True:
-            if self._stop_event.is_set():
-                break
-                
+        while not self._stop_event.is_set():
             try:
                 # Log batch start
-                logger.info(f"[{exchange}] Fetching batch range: {start} - {start + BATCH_SIZE}...")
+                logger.info(f"[{exchange}] Fetching batch range: {start} - {start + RANGE_SIZE}...")
                 
-                data = self._fetch_from_tradingview(exchange, start, start + BATCH_SIZE, ipo_offer_date_type)
+                data = self._fetch_from_tradingview(exchange, start, start + RANGE_SIZE, ipo_offer_date_type)
                 
                 if not data or not data.get('data'):
                     logger.info(f"[{exchange}] No more data received.")
                     break
                     
                 items = data['data']
-                total_count_resp = data.get('totalCount', 0)
-                
-                # Transform items for DB
-                db_items = []
-                for item in items:
-                    # item structure: "s": "NASDAQ:NVDA", "d": [{...}, ...]
-                    s_value = item.get('s')
-                    d_values = item.get('d', [])
-                    
-                    if not s_value or not d_values:
-                        continue
-                        
-                    meta = d_values[0] if len(d_values) > 0 and isinstance(d_values[0], dict) else {}
-                    
-                    # Columns indices based on payload:
-                    # 0: ticker-view (meta dict)
-                    # ...
-                    # 18: sector.tr
-                    # ...
-                    # 20: sector
-                    # ...
-                    # 23: ipo_offer_date
-                    # 24: ipo_offer_price_usd
-                    # 25: ipo_deal_amount_usd
-                    
-                    # Safe extraction helper
-                    def get_val(idx):
-                        return d_values[idx] if len(d_values) > idx else None
-                    
-                    def format_date(ts):
-                        if ts is None:
-                            return None
-                        try:
-                            # Verify ts type and cast if necessary
-                            val = float(ts)
-                            # Use datetime.fromtimestamp with utc to handle negative timestamps safely
-                            from datetime import timezone
-                            dt = datetime.fromtimestamp(val, tz=timezone.utc)
-                            return dt.strftime('%Y-%m-%d')
-                        except Exception as e:
-                            # Log conversion error for debugging if needed, but here just fallback
-                            # logger.warning(f"Date formatting failed for {ts}: {e}")
-                            return str(ts)
+                if start == 0:
+                    with progress_lock:
+                        self._task_status.total_count += data.get('totalCount') or 0
 
-                    # Mapping
-                    db_item = {
-                        "tradingview_full_stock_symbol": s_value,
-                        "stock_symbol": meta.get('name', s_value.split(':')[-1] if ':' in s_value else s_value),
-                        "exchange_acronym": meta.get('exchange', exchange),
-                        "name": meta.get('name', ''),
-                        "description": meta.get('description', ''),
-                        "logoid": meta.get('logoid', ''),
-                        
-                        "sector_tr": get_val(18),
-                        "sector": get_val(20),
-                        "ipo_offer_date": format_date(get_val(23)),
-                        "ipo_offer_price": get_val(24),
-                        "ipo_deal_amount": get_val(25)
-                    }
-                    db_items.append(db_item)
-                    
-                # Save to DB
-                DBManager.upsert_tradingview_batch(db_items)
-                processed_count += len(db_items)
-                
-                # Log batch success
-                logger.info(f"[{exchange}] Processed batch items: {len(db_items)}. Total so far: {processed_count}")
+                # Blocks while the writer is behind (backpressure)
+                pages.put((exchange, items))
+                fetched += len(items)
                 
                 # Check if we reached end
-                if len(items) < BATCH_SIZE:
+                if len(items) < RANGE_SIZE:
                     break
                     
-                start += BATCH_SIZE
-                
-                # Be nice to API
-                time.sleep(1.0) # Increased delay slightly to be safer and give better log pacing
+                start += RANGE_SIZE
                 
             except Exception as e:
                 logger.error(f"Error syncing exchange {exchange}: {e}")
-                # Optional: break or continue? break to avoid infinite loops on error
+                # break to avoid infinite loops on error
                 break
                 
-        return processed_count
+        return fetched
+
+    def _write_pages(self, pages: queue.Queue, progress: Dict[str, int], progress_lock: threading.Lock):
+        """Write stage: transform raw pages and upsert them in batches of TRADINGVIEW_SYNC_WRITE_BATCH rows."""
+        buffer: List[Dict[str, Any]] = []
+
+        def flush():
+            if not buffer:
+                return
+            stats = DBManager.upsert_tradingview_batch(buffer)
+            with progress_lock:
+                progress["processed"] += len(buffer)
+                self._task_status.processed_count = progress["processed"]
+                self._task_status.inserted_count += stats["inserted"]
+                self._task_status.updated_count += stats["updated"]
+                self._task_status.unchanged_count += stats["unchanged"]
+            logger.info(f"Saved TradingView batch: {len(buffer)} items. Total so far: {progress['processed']}")
+            buffer.clear()
+
+        while True:
+            page = pages.get()
+            if page is None:
+                break
+            exchange, items = page
+            try:
+                buffer.extend(db_item for db_item in (self._transform_item(item, exchange) for item in items) if db_item)
+                if len(buffer) >= settings.TRADINGVIEW_SYNC_WRITE_BATCH:
+                    flush()
+            except Exception as e:
+                logger.error(f"Error writing TradingView batch for {exchange}: {e}")
+                buffer.clear()
+        try:
+            flush()
+        except Exception as e:
+            logger.error(f"Error writing TradingView batch: {e}")
+
+    @staticmethod
+    def _transform_item(item: Dict[str, Any], exchange: str) -> Optional[Dict[str, Any]]:
+        # item structure: "s": "NASDAQ:NVDA", "d": [{...}, ...]
+        s_value = item.get('s')
+        d_values = item.get('d', [])
+        
+        if not s_value or not d_values:
+            return None
+            
+        meta = d_values[0] if len(d_values) > 0 and isinstance(d_values[0], dict) else {}
+        
+        # Columns indices based on payload:
+        # 0: ticker-view (meta dict)
+        # ...
+        # 18: sector.tr
+        # ...
+        # 20: sector
+        # ...
+        # 23: ipo_offer_date
+        # 24: ipo_offer_price_usd
+        # 25: ipo_deal_amount_usd
+        
+        # Safe extraction helper
+        def get_val(idx):
+            return d_values[idx] if len(d_values) > idx else None
+
+        # Mapping
+        return {
+            "tradingview_full_stock_symbol": s_value,
+            "stock_symbol": meta.get('name', s_value.split(':')[-1] if ':' in s_value else s_value),
+            "exchange_acronym": meta.get('exchange', exchange),
+            "name": meta.get('name', ''),
+            "description": meta.get('description', ''),
+            "logoid": meta.get('logoid', ''),
+            
+            "sector_tr": get_val(18),
+            "sector": get_val(20),
+            "ipo_offer_date": _format_date(get_val(23)),
+            "ipo_offer_price": get_val(24),
+            "ipo_deal_amount": get_val(25)
+        }
 
     def _fetch_from_tradingview(self, exchange: str, range_start: int, range_end: int, ipo_offer_date_type: Optional[str] = None) -> Dict[str, Any]:
         url = 'https://scanner.tradingview.com/global/scan?label-product=popup-screener-stock'
@@ -296,7 +354,7 @@ class TradingViewSyncService:
         ]
         
         try:
-            resp = requests.post(url, headers=headers, data=json.dumps(payload), timeout=30)
+            resp = get_session("tradingview").post(url, headers=headers, data=json.dumps(payload), timeout=30)
             resp.raise_for_status()
             return resp.json()
         except Exception as e:
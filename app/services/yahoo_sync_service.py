@@ -1,12 +1,41 @@
 import asyncio
 import logging
-from typing import List
+import time
+from typing import Any, Dict, List, Optional
 import yfinance as yf
 from yfinance import EquityQuery
+from yfinance.exceptions import YFRateLimitError
+from app.core.config import settings
 from app.core.database import DBManager
+from app.core.provider_guard import get_guard
 
 logger = logging.getLogger("fastapi")
 
+# 单个交易所最多翻页到的 offset，防止异常情况下死循环
+MAX_EXCHANGE_OFFSET = 100000
+
+
+class _AdaptivePageSize:
+    """
+    yf.screen 分页大小自适应: 上游响应快则逐步加大，慢或出错则减半。
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, target_latency: float):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.size = min(max(initial, self.minimum), self.maximum)
+        self.target_latency = target_latency
+
+    def on_success(self, latency: float):
+        if latency > 2 * self.target_latency:
+            self.size = max(self.minimum, self.size // 2)
+        elif latency < self.target_latency:
+            self.size = min(self.maximum, self.size + max(self.minimum, self.size // 2))
+
+    def on_error(self):
+        self.size = max(self.minimum, self.size // 2)
+
+
 class YahooSyncService:
     _is_running = False
 
@@ -18,6 +47,9 @@ class YahooSyncService:
     async def sync_all_stocks():
         """
         全量同步所有定义的交易所股票数据到本地数据库。
+
+        多个交易所并发抓取 (请求经 Yahoo 共享限流器/熔断器，见 app/core/provider_guard.py)，抓到的批次放入队列，
+        由单独的写库协程消费，写库与下一页抓取重叠进行。
         """
         if YahooSyncService._is_running:
             logger.warning("同步任务正在运行中，跳过本次请求。")
@@ -25,120 +57,176 @@ class YahooSyncService:
 
         YahooSyncService._is_running = True
         logger.info("开始每日股票全量同步...")
-        
+        start = time.monotonic()
+
         try:
             from app.core.constants import get_all_exchanges
-            
-            # 获取所有交易所配置
-            exchanges_config = get_all_exchanges()
-            
-            total_new_all = 0
-            total_processed_all = 0
-
-            # 遍历每个交易所进行查询
-            for ex in exchanges_config:
-                region = ex.get("country_code", "").lower()
-                exchange_code = ex.get("yahoo_exchange_code")
-                acronym = ex.get("acronym")
-
-                if not region or not exchange_code:
-                    continue
-
-                logger.info(f"正在同步交易所: {acronym} (Region: {region}, Code: {exchange_code})")
-                
-                offset = 0
-                limit = 100
-                
-                while True:
+
+            # 获取所有交易所配置，跳过缺少地区或交易所代码的
+            exchanges = [
+                ex for ex in get_all_exchanges()
+                if ex.get("country_code") and ex.get("yahoo_exchange_code")
+            ]
+
+            queue: asyncio.Queue = asyncio.Queue(maxsize=settings.YAHOO_SYNC_WRITE_QUEUE_SIZE)
+            totals = {"processed": 0, "inserted": 0, "updated": 0, "unchanged": 0, "requests": 0}
+            writer = asyncio.create_task(YahooSyncService._write_batches(queue, totals))
+            semaphore = asyncio.Semaphore(max(1, settings.YAHOO_SYNC_EXCHANGE_CONCURRENCY))
+
+            async def sync_one(ex: Dict[str, Any]):
+                async with semaphore:
                     try:
-                        # 构造查询条件: 地区 + 交易所代码
-                        query = EquityQuery("and", [
-                            EquityQuery("eq", ["region", region]),
-                            EquityQuery("is-in", ["exchange", exchange_code])
-                        ])
-                        
-                        resp = await asyncio.to_thread(
-                            yf.screen,
-                            query,
-                            size=limit,
-                            sortField="dayvolume",
-                            sortAsc=False,
-                            offset=offset
-                        )
-                        
-                        quotes = resp.get("quotes", [])
-                        if not quotes:
-                            # 当前交易所数据已取完
-                            break
-                        
-                        # 打印批次日志
-                        if quotes:
-                            first_sym = quotes[0].get("symbol", "N/A")
-                            last_sym = quotes[-1].get("symbol", "N/A")
-                            logger.info(f"[{acronym}] 处理批次 Offset: {offset}, 数量: {len(quotes)}. 范围: {first_sym} - {last_sym}")
-
-                        batch_stocks = []
-                        
-                        for q in quotes:
-                            raw_symbol = q.get("symbol")
-                            if not raw_symbol: continue
-                            
-                            # 1. 去掉后缀，只保留纯代码
-                            # 例如 600036.SS -> 600036
-                            symbol = raw_symbol.split(".")[0]
-                            
-                            # 2. 名称获取逻辑: shortName > displayName > prevName > symbol
-                            name = q.get("shortName")
-                            if not name: name = q.get("displayName")
-                            if not name: name = q.get("prevName")
-                            if not name: name = symbol
-                            
-                            # Normalize name (User request: fix all uppercase)
-                            if name:
-                                name = name.title()
-                            
-                            # 3. 构造 yahoo_stock 表所需数据
-                            market_cap = q.get("marketCap", 0.0)
-                            if market_cap is None: market_cap = 0.0
-                            
-                            currency = q.get("currency", "")
-                            
-                            # Calculate Market Cap USD
-                            usd_rate = ex.get("usd_rate", 1.0)
-                            market_cap_usd = float(market_cap) * float(usd_rate)
-
-                            batch_stocks.append({
-                                "yahoo_stock_symbol": raw_symbol,
-                                "yahoo_exchange_symbol": exchange_code,
-                                "stock_symbol": symbol,
-                                "exchange_acronym": acronym,
-                                "name": name,
-                                "currency": currency,
-                                "market_cap": str(market_cap),
-                                "market_cap_usd": str(market_cap_usd)
-                            })
-                        
-                        # 批量写入数据库 (yahoo_stock)
-                        if batch_stocks:
-                            count = DBManager.upsert_yahoo_stock_batch(batch_stocks)
-                            total_new_all += count # upsert_yahoo_stock_batch returns total count, assuming all are "new/updated"
-                            # stats logic might need adjustment but for now just sum up
-                            total_processed_all += len(batch_stocks)
-                        
-                        offset += limit
-                        
-                        # 安全保险：防止单个交易所数据量也过大导致的死循环
-                        if offset > 100000:
-                            logger.warning(f"[{acronym}] 达到单交易所 100,000 条限制，停止该交易所同步。")
-                            break
-                            
-                        # 小睡一下避免请求过快
-                        await asyncio.sleep(0.5)
-                        
+                        await YahooSyncService._sync_exchange(ex, queue, totals)
                     except Exception as e:
-                        logger.error(f"同步 [{acronym}] 时出错 (Offset {offset}): {e}")
-                        break
-            
-            logger.info(f"股票全量同步完成。总处理: {total_processed_all}, 新增: {total_new_all}")
+                        # 单个交易所出错不影响其他交易所
+                        logger.error(f"同步交易所 [{ex.get('acronym')}] 失败: {e}")
+
+            producers = [asyncio.create_task(sync_one(ex)) for ex in exchanges]
+            try:
+                await asyncio.gather(*producers)
+            finally:
+                # 先停掉仍在运行的生产者 (例如整体任务被取消)，再通知写库协程结束并等待剩余批次写完
+                for task in producers:
+                    task.cancel()
+                await asyncio.gather(*producers, return_exceptions=True)
+                await queue.put(None)
+                await writer
+
+            logger.info(
+                f"股票全量同步完成。总处理: {totals['processed']}, 新增: {totals['inserted']}, "
+                f"更新: {totals['updated']}, 未变化: {totals['unchanged']}, "
+                f"耗时: {time.monotonic() - start:.1f}s, 上游请求: {totals['requests']}"
+            )
         finally:
             YahooSyncService._is_running = False
+
+    @staticmethod
+    async def _sync_exchange(ex: Dict[str, Any], queue: asyncio.Queue, totals: Dict[str, int]):
+        """生产者: 分页抓取单个交易所，每页转换后放入写库队列。"""
+        region = ex.get("country_code", "").lower()
+        exchange_code = ex.get("yahoo_exchange_code")
+        acronym = ex.get("acronym")
+
+        logger.info(f"正在同步交易所: {acronym} (Region: {region}, Code: {exchange_code})")
+
+        # 构造查询条件: 地区 + 交易所代码
+        query = EquityQuery("and", [
+            EquityQuery("eq", ["region", region]),
+            EquityQuery("is-in", ["exchange", exchange_code])
+        ])
+        pager = _AdaptivePageSize(
+            settings.YAHOO_SYNC_PAGE_SIZE,
+            settings.YAHOO_SYNC_MIN_PAGE_SIZE,
+            settings.YAHOO_SYNC_MAX_PAGE_SIZE,
+            settings.YAHOO_SYNC_TARGET_LATENCY
+        )
+
+        offset = 0
+        failures = 0
+        while True:
+            size = pager.size
+            totals["requests"] += 1
+            started = time.monotonic()
+            try:
+                resp = await asyncio.to_thread(
+                    get_guard("yahoo").call,
+                    yf.screen,
+                    query,
+                    size=size,
+                    sortField="dayvolume",
+                    sortAsc=False,
+                    offset=offset,
+                    throttle_errors=(YFRateLimitError,)
+                )
+            except Exception as e:
+                failures += 1
+                pager.on_error()
+                if failures > settings.YAHOO_SYNC_MAX_RETRIES:
+                    logger.error(f"同步 [{acronym}] 时出错 (Offset {offset})，已重试 {failures - 1} 次，放弃该交易所: {e}")
+                    return
+                logger.warning(f"同步 [{acronym}] 时出错 (Offset {offset})，第 {failures} 次重试，分页大小降为 {pager.size}: {e}")
+                await asyncio.sleep(min(2 ** failures, 30))
+                continue
+
+            failures = 0
+            pager.on_success(time.monotonic() - started)
+
+            quotes = (resp or {}).get("quotes", [])
+            if not quotes:
+                # 当前交易所数据已取完
+                return
+
+            # 打印批次日志
+            first_sym = quotes[0].get("symbol", "N/A")
+            last_sym = quotes[-1].get("symbol", "N/A")
+            logger.info(f"[{acronym}] 处理批次 Offset: {offset}, 数量: {len(quotes)}. 范围: {first_sym} - {last_sym}")
+
+            batch_stocks = [s for s in (YahooSyncService._quote_to_stock(q, ex) for q in quotes) if s]
+            if batch_stocks:
+                await queue.put(batch_stocks)
+
+            offset += len(quotes)
+            total = resp.get("total")
+            if isinstance(total, int) and offset >= total:
+                return
+
+            # 安全保险：防止单个交易所数据量也过大导致的死循环
+            if offset > MAX_EXCHANGE_OFFSET:
+                logger.warning(f"[{acronym}] 达到单交易所 {MAX_EXCHANGE_OFFSET:,} 条限制，停止该交易所同步。")
+                return
+
+    @staticmethod
+    async def _write_batches(queue: asyncio.Queue, totals: Dict[str, int]):
+        """消费者: 依次把批次写入 yahoo_stock 表，收到 None 结束。"""
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+            try:
+                stats = await asyncio.to_thread(DBManager.upsert_yahoo_stock_batch, batch)
+                for key, value in stats.items():
+                    totals[key] += value
+                totals["processed"] += len(batch)
+            except Exception as e:
+                logger.error(f"写入 yahoo_stock 批次失败 ({len(batch)} 条): {e}")
+
+    @staticmethod
+    def _quote_to_stock(q: Dict[str, Any], ex: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        raw_symbol = q.get("symbol")
+        if not raw_symbol:
+            return None
+
+        # 1. 去掉后缀，只保留纯代码
+        # 例如 600036.SS -> 600036
+        symbol = raw_symbol.split(".")[0]
+
+        # 2. 名称获取逻辑: shortName > displayName > prevName > symbol
+        name = q.get("shortName")
+        if not name: name = q.get("displayName")
+        if not name: name = q.get("prevName")
+        if not name: name = symbol
+
+        # Normalize name (User request: fix all uppercase)
+        if name:
+            name = name.title()
+
+        # 3. 构造 yahoo_stock 表所需数据
+        market_cap = q.get("marketCap", 0.0)
+        if market_cap is None: market_cap = 0.0
+
+        currency = q.get("currency", "")
+
+        # Calculate Market Cap USD
+        usd_rate = ex.get("usd_rate", 1.0)
+        market_cap_usd = float(market_cap) * float(usd_rate)
+
+        return {
+            "yahoo_stock_symbol": raw_symbol,
+            "yahoo_exchange_symbol": ex.get("yahoo_exchange_code"),
+            "stock_symbol": symbol,
+            "exchange_acronym": ex.get("acronym"),
+            "name": name,
+            "currency": currency,
+            "market_cap": str(market_cap),
+            "market_cap_usd": str(market_cap_usd)
+        }
@@ -0,0 +1,96 @@
+"""
+Benchmark: DBManager._bulk_upsert (executemany committed every DB_BULK_CHUNK_SIZE rows) vs. the
+baseline write (one executemany over all rows, one commit), in rows/sec.
+
+Both go through pymysql's executemany, which rewrites INSERT ... VALUES (%s, ...) into multi-row
+statements of up to max_stmt_length bytes; what differs is the transaction size.
+
+Needs a reachable MySQL (MYSQL_* settings / .env), e.g. a throwaway local instance:
+
+    docker run -d --rm -p 3306:3306 -e MYSQL_ALLOW_EMPTY_PASSWORD=yes -e MYSQL_DATABASE=fast_finance mysql:8
+    MYSQL_SERVER=127.0.0.1 python bench_db_bulk.py [rows]
+
+Works on a scratch table (bench_bulk_upsert) that is dropped afterwards.
+"""
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+from app.core.database import DBManager
+
+TABLE = "bench_bulk_upsert"
+COLUMNS = ["yahoo_stock_symbol", "yahoo_exchange_symbol", "stock_symbol", "exchange_acronym",
+           "name", "currency", "market_cap", "market_cap_usd", "content_hash"]
+UPDATE = ", ".join(f"{c}=VALUES({c})" for c in COLUMNS[1:])
+
+
+def make_rows(n, generation):
+    return [
+        (f"S{i}.X", "NMS", f"S{i}", "NASDAQ", f"Company {i} gen {generation}", "USD",
+         str(1e9 + i), str(1e9 + i), f"{generation:032d}")
+        for i in range(n)
+    ]
+
+
+def baseline_write(conn, cursor, rows):
+    values = ", ".join(["%s"] * len(COLUMNS))
+    cursor.executemany(
+        f"INSERT INTO {TABLE} ({', '.join(COLUMNS)}) VALUES ({values}) ON DUPLICATE KEY UPDATE {UPDATE}",
+        rows
+    )
+    conn.commit()
+
+
+def timed(label, n, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32}: {elapsed:7.3f} s  {n / elapsed:12,.0f} rows/s")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    # Same logging cost as the service (INFO to a stream)
+    logging.basicConfig(level=logging.INFO, stream=open(os.devnull, "w"))
+
+    try:
+        conn = DBManager.get_connection()
+    except Exception as e:
+        print(f"MySQL not reachable ({e}); see the module docstring.")
+        sys.exit(1)
+
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(f"""
+        CREATE TABLE {TABLE} (
+            id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            yahoo_stock_symbol VARCHAR(50) UNIQUE NOT NULL,
+            yahoo_exchange_symbol VARCHAR(20), stock_symbol VARCHAR(50), exchange_acronym VARCHAR(20),
+            name VARCHAR(255), currency VARCHAR(10),
+            market_cap DECIMAL(38, 18), market_cap_usd DECIMAL(38, 18), content_hash CHAR(32)
+        )
+    """)
+    conn.commit()
+
+    try:
+        print(f"{n} rows, table {TABLE}")
+        timed("baseline insert (1 txn)", n, lambda: baseline_write(conn, cursor, make_rows(n, 1)))
+        timed("baseline update (1 txn)", n, lambda: baseline_write(conn, cursor, make_rows(n, 2)))
+        for chunk in (500, 1000, 5000):
+            gen = chunk
+            timed(f"chunked update (chunk {chunk})", n,
+                  lambda: DBManager._bulk_upsert(conn, cursor, TABLE, COLUMNS, make_rows(n, gen), UPDATE, chunk_size=chunk))
+        cursor.execute(f"TRUNCATE TABLE {TABLE}")
+        timed("chunked insert (chunk 1000)", n,
+              lambda: DBManager._bulk_upsert(conn, cursor, TABLE, COLUMNS, make_rows(n, 9), UPDATE, chunk_size=1000))
+    finally:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        conn.commit()
+        conn.close()
+        DBManager.close_pool()
+
+
+if __name__ == "__main__":
+    main()
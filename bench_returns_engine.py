@@ -0,0 +1,58 @@
+"""
+Micro-benchmark: vectorized returns engine vs. the per-anchor boolean-mask lookup
+previously inlined in YahooService._build_base_data_item.
+
+    python bench_returns_engine.py [symbols]
+"""
+import os
+import sys
+import timeit
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.getcwd())
+from app.services.returns_engine import compute_returns, compute_returns_batch, window_anchors
+
+
+def legacy_returns(hist, end_price, as_of_date):
+    returns, ranges = {}, {}
+    for key, anchor in window_anchors(as_of_date).items():
+        sub = hist[hist.index.date <= anchor]
+        returns[key], ranges[key] = None, None
+        if sub.empty:
+            continue
+        row = sub.iloc[-1]
+        p0 = float(row["Adj Close"])
+        if p0:
+            returns[key] = (end_price / p0) - 1
+            ranges[key] = f"{row.name.date().isoformat()}:{as_of_date.isoformat()}"
+    return returns, ranges
+
+
+def main():
+    n_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    as_of = date(2026, 10, 16)
+    index = pd.date_range("2021-09-01", as_of, freq="B", tz="America/New_York", name="Date")
+    rng = np.random.default_rng(0)
+    series = [
+        (pd.DataFrame({"Adj Close": 100 + np.cumsum(rng.normal(0, 1, len(index)))}, index=index), 150.0, as_of)
+        for _ in range(n_symbols)
+    ]
+
+    assert [legacy_returns(*s) for s in series] == compute_returns_batch(series)
+
+    runs = 5
+    legacy = timeit.timeit(lambda: [legacy_returns(*s) for s in series], number=runs) / runs
+    single = timeit.timeit(lambda: [compute_returns(*s) for s in series], number=runs) / runs
+    batch = timeit.timeit(lambda: compute_returns_batch(series), number=runs) / runs
+
+    print(f"{n_symbols} symbols x {len(index)} bars")
+    print(f"legacy mask per anchor : {legacy * 1000:8.2f} ms")
+    print(f"engine per symbol      : {single * 1000:8.2f} ms  ({legacy / single:.1f}x)")
+    print(f"engine whole batch     : {batch * 1000:8.2f} ms  ({legacy / batch:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
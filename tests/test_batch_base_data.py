@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services import yahoo_service
+from app.services.yahoo_service import YahooService
+
+SYMBOLS = ["AAPL", "MSFT", "SLOW", "BAD", "NVDA"]
+
+
+@pytest.fixture
+def batch(monkeypatch):
+    class FakeTickers:
+        # Like yf.Tickers, keyed by the upper-cased symbol
+        def __init__(self, symbols):
+            self.tickers = {s.upper(): s.upper() for s in symbols.split()}
+
+    monkeypatch.setattr(yahoo_service.yf, "Tickers", FakeTickers)
+    monkeypatch.setattr(YahooService, "_resolve_batch_symbols", staticmethod(
+        lambda items: {i["stock_symbol"]: {"stock_symbol": i["stock_symbol"], "exchange_acronym": "NASDAQ",
+                                          "yahoo_symbol": i["stock_symbol"]} for i in items}
+    ))
+    monkeypatch.setattr(settings, "YAHOO_BATCH_WORKERS", 4)
+    monkeypatch.setattr(settings, "YAHOO_BATCH_SYMBOL_TIMEOUT", 0.3)
+    return [{"stock_symbol": s, "exchange_acronym": "NASDAQ"} for s in SYMBOLS]
+
+
+def check_results(results):
+    assert [r["yahoo_symbol"] for r in results] == SYMBOLS
+    assert [("price" in r) for r in results] == [True, True, False, False, True]
+
+
+def test_async_batch_is_concurrent_ordered_and_tolerates_failures(batch, monkeypatch):
+    async def process(t, original_info, y_sym, is_return_history, history_format="records"):
+        if y_sym == "SLOW":
+            await asyncio.sleep(5)
+        if y_sym == "BAD":
+            raise RuntimeError("boom")
+        await asyncio.sleep(0.1)
+        return {**original_info, "price": 1.0}
+
+    monkeypatch.setattr(YahooService, "_process_base_data_symbol_async", staticmethod(process))
+
+    start = time.monotonic()
+    results = asyncio.run(YahooService.get_batch_stock_base_data_async(batch))
+    assert time.monotonic() - start < 1.0
+    check_results(results)
+
+
+def test_mixed_case_symbols_resolve_their_tickers(batch, monkeypatch):
+    async def process(t, original_info, y_sym, is_return_history, history_format="records"):
+        return {**original_info, "ticker": t}
+
+    monkeypatch.setattr(YahooService, "_process_base_data_symbol_async", staticmethod(process))
+    mixed = [{"stock_symbol": s, "exchange_acronym": "NASDAQ"} for s in ["AAPL", "msft", "Nvda"]]
+
+    results = asyncio.run(YahooService.get_batch_stock_base_data_async(mixed))
+    assert [r["yahoo_symbol"] for r in results] == ["AAPL", "msft", "Nvda"]
+    assert [r["ticker"] for r in results] == ["AAPL", "MSFT", "NVDA"]
+
+
+def test_stream_yields_items_as_they_complete(batch, monkeypatch):
+    delays = {"AAPL": 0.2, "MSFT": 0.0, "SLOW": 0.1, "BAD": 0.05, "NVDA": 0.15}
+
+    async def process(t, original_info, y_sym, is_return_history, history_format="records"):
+        await asyncio.sleep(delays[y_sym])
+        return {**original_info, "price": 1.0}
+
+    monkeypatch.setattr(YahooService, "_process_base_data_symbol_async", staticmethod(process))
+
+    async def collect():
+        return [item["yahoo_symbol"] async for item in YahooService.iter_batch_stock_base_data_async(batch)]
+
+    assert asyncio.run(collect()) == sorted(SYMBOLS, key=delays.get)
+
+
+def test_stream_endpoint_emits_ndjson(batch, monkeypatch):
+    import json
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    async def process(t, original_info, y_sym, is_return_history, history_format="records"):
+        if y_sym == "BAD":
+            raise RuntimeError("boom")
+        return {"symbol": original_info["stock_symbol"], "exchange_acronym": "NASDAQ", "yahoo_symbol": y_sym, "name": y_sym}
+
+    monkeypatch.setattr(YahooService, "_process_base_data_symbol_async", staticmethod(process))
+
+    response = TestClient(app).post("/api/v1/yahoo/batch/get_stock_base_data/stream", json={"stock_list": batch})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["yahoo_symbol"] for line in lines) == sorted(SYMBOLS)
+    assert [line["name"] for line in lines if line["yahoo_symbol"] == "BAD"] == [None]
+
+
+def test_async_batch_steps_share_the_batch_route_limit(batch, monkeypatch):
+    from app.core.executor import UpstreamExecutor
+
+    executor = UpstreamExecutor("test", max_workers=8, default_limit=8, timeout=5, max_waiting=64,
+                                route_limits={"batch": 2})
+    monkeypatch.setattr(yahoo_service, "yahoo_executor", executor)
+    monkeypatch.setattr(settings, "YAHOO_BATCH_SYMBOL_TIMEOUT", 5)
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def snapshot(t, y_sym):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.05)
+        with lock:
+            active["now"] -= 1
+        return {"end_price": None, "as_of_date": None}
+
+    monkeypatch.setattr(YahooService, "_fetch_quote_snapshot", staticmethod(snapshot))
+    monkeypatch.setattr(YahooService, "_build_base_data_item", staticmethod(
+        lambda original_info, y_sym, *args: {**original_info, "price": 1.0}
+    ))
+
+    try:
+        results = asyncio.run(YahooService.get_batch_stock_base_data_async(batch))
+    finally:
+        executor.shutdown()
+
+    assert [r["price"] for r in results] == [1.0] * len(SYMBOLS)
+    assert active["peak"] == 2
+    assert executor.stats()["routes"]["batch"]["completed"] == 2 * len(SYMBOLS)
@@ -0,0 +1,71 @@
+import time
+
+from app.core import cache as cache_module
+from app.core.cache import TTLCache, get_cache
+from app.core.database import DBManager
+
+
+def test_ttl_expiry_counts_miss():
+    cache = TTLCache("t", ttl=0.05, max_entries=10, max_bytes=0)
+    cache.set("a", "x")
+    assert cache.get("a") == "x"
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["expired"] == 1
+    assert stats["entries"] == 0
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = TTLCache("t", ttl=60, max_entries=2, max_bytes=0)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")  # "b" becomes least recently used
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+    cache = TTLCache("t", ttl=60, max_entries=100, max_bytes=10)
+    cache.set("a", b"12345")
+    cache.set("b", b"12345")
+    cache.set("c", b"12345")
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 10
+    cache.set("big", b"x" * 11)  # larger than the whole budget: never stored
+    assert cache.get("big") is None
+
+
+def test_db_getter_served_from_l1_and_invalidated_on_upsert(monkeypatch):
+    calls = []
+
+    class Cursor:
+        def execute(self, sql, args=None):
+            calls.append(sql)
+
+        def fetchone(self):
+            return {"data": "[1]", "update_time": "t0"}
+
+    class Conn:
+        def cursor(self):
+            return Cursor()
+
+        def commit(self):
+            pass
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(DBManager, "get_connection", staticmethod(lambda: Conn()))
+    monkeypatch.setattr(cache_module, "_caches", {})
+
+    first = DBManager.get_yahoo_stock_related_cache("AAPL")
+    second = DBManager.get_yahoo_stock_related_cache("AAPL")
+    assert first == second == {"data": "[1]", "updated_at": "t0"}
+    assert len(calls) == 1
+    assert get_cache("related").stats()["hits"] == 1
+
+    DBManager.upsert_yahoo_stock_related_cache("AAPL", "[2]")
+    DBManager.get_yahoo_stock_related_cache("AAPL")
+    assert len(calls) == 3
+    # A refresh dates the row even when the scraped data did not change
+    assert "update_time=CURRENT_TIMESTAMP" in calls[1]
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from app.core.db_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.open = True
+        self.rollbacks = 0
+        self.pings = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if not self.open:
+            raise Exception("gone away")
+
+    def close(self):
+        self.open = False
+
+
+def make_pool(**kwargs):
+    created = []
+
+    def creator():
+        conn = FakeConnection()
+        created.append(conn)
+        return conn
+
+    return ConnectionPool(creator, **kwargs), created
+
+
+def test_reuses_released_connection():
+    pool, created = make_pool(max_size=2)
+    conn = pool.acquire()
+    conn.close()
+    conn = pool.acquire()
+    conn.close()
+
+    assert len(created) == 1
+    assert created[0].rollbacks == 2
+    stats = pool.stats()
+    assert stats["acquired"] == 2
+    assert stats["idle"] == 1
+    assert stats["in_use"] == 0
+
+
+def test_bounded_size_times_out():
+    pool, _ = make_pool(max_size=1, acquire_timeout=0.05)
+    held = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    assert pool.stats()["timeouts"] == 1
+    held.close()
+
+
+def test_waiter_gets_released_connection():
+    pool, created = make_pool(max_size=1, acquire_timeout=2)
+    held = pool.acquire()
+    got = []
+
+    def worker():
+        conn = pool.acquire()
+        got.append(conn)
+        conn.close()
+
+    t = threading.Thread(target=worker)
+    t.start()
+    time.sleep(0.05)
+    held.close()
+    t.join(2)
+
+    assert len(got) == 1
+    assert len(created) == 1
+    assert pool.stats()["waits"] == 1
+
+
+def test_recycles_expired_and_discards_dead():
+    pool, created = make_pool(max_size=1, max_lifetime=0.0)
+    pool.acquire().close()
+    pool.acquire().close()
+    assert len(created) == 2
+    assert pool.stats()["recycled"] == 1
+
+    pool, created = make_pool(max_size=1, ping_interval=0.0)
+    conn = pool.acquire()
+    conn.close()
+    created[0].open = False
+    conn = pool.acquire()
+    assert conn._raw is created[1]
+    conn.close()
+
+
+def test_unreleased_proxy_is_returned_on_gc():
+    pool, _ = make_pool(max_size=1)
+    conn = pool.acquire()
+    del conn
+    assert pool.stats()["in_use"] == 0
@@ -0,0 +1,93 @@
+import pytest
+from pymysql.cursors import RE_INSERT_VALUES
+
+from app.core.database import DBManager
+
+
+class FakeCursor:
+    """Minimal stand-in for a DictCursor over a {key: content_hash} table."""
+
+    def __init__(self, stored, fail_on_chunk=None):
+        self.stored = stored
+        self.written = []
+        self.chunks = 0
+        self.fail_on_chunk = fail_on_chunk
+        self._result = []
+
+    def execute(self, sql, args=None):
+        self._result = [{"k": key, "content_hash": self.stored[key]} for key in args if key in self.stored]
+
+    def fetchall(self):
+        return self._result
+
+    def executemany(self, sql, rows):
+        # Must stay in the form pymysql rewrites into multi-row VALUES statements
+        assert RE_INSERT_VALUES.match(sql)
+        assert "content_hash=VALUES(content_hash)" in sql
+        self.chunks += 1
+        if self.chunks == self.fail_on_chunk:
+            raise RuntimeError("lost connection")
+        self.written.append(list(rows))
+
+
+class FakeConn:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+COLUMNS = ["yahoo_stock_symbol", "name", "market_cap"]
+
+
+def test_only_new_and_changed_rows_are_written():
+    same = ("AAPL", "Apple Inc.", "3.0e12")
+    changed = ("MSFT", "Microsoft", "3.1e12")
+    stored = {
+        "AAPL": DBManager._row_hash(same),
+        "MSFT": DBManager._row_hash(("MSFT", "Microsoft", "2.9e12")),
+        "LEGACY": None
+    }
+    cursor = FakeCursor(stored)
+    rows = [same, changed, ("NVDA", "Nvidia", "4e12"), ("LEGACY", "Old row", "1")]
+
+    stats = DBManager._delta_upsert(FakeConn(), cursor, "fast_finance_yahoo_stock", COLUMNS, rows, "name=VALUES(name)")
+
+    assert stats == {"inserted": 1, "updated": 2, "unchanged": 1}
+    written, = cursor.written
+    assert [row[0] for row in written] == ["MSFT", "NVDA", "LEGACY"]
+    # The stored hash travels with each written row
+    assert written[0][-1] == DBManager._row_hash(changed)
+
+
+def test_all_unchanged_skips_the_write():
+    row = ("AAPL", "Apple Inc.", "3.0e12")
+    cursor = FakeCursor({"AAPL": DBManager._row_hash(row)})
+    stats = DBManager._delta_upsert(FakeConn(), cursor, "fast_finance_yahoo_stock", COLUMNS, [row, row], "name=VALUES(name)")
+    assert stats == {"inserted": 0, "updated": 0, "unchanged": 1}
+    assert cursor.written == []
+
+
+def test_bulk_upsert_commits_per_chunk():
+    cursor, conn = FakeCursor({}), FakeConn()
+    rows = [(f"S{i}", "x", "1") for i in range(25)]
+
+    written = DBManager._bulk_upsert(conn, cursor, "t", COLUMNS, rows, "name=VALUES(name), content_hash=VALUES(content_hash)", chunk_size=10)
+    assert written == 25
+    assert [len(chunk) for chunk in cursor.written] == [10, 10, 5]
+    assert conn.commits == 3
+
+
+def test_bulk_upsert_failure_keeps_earlier_chunks_committed():
+    cursor, conn = FakeCursor({}, fail_on_chunk=2), FakeConn()
+    rows = [(f"S{i}", "x", "1") for i in range(25)]
+
+    with pytest.raises(RuntimeError):
+        DBManager._bulk_upsert(conn, cursor, "t", COLUMNS, rows, "content_hash=VALUES(content_hash)", chunk_size=10)
+    assert [len(chunk) for chunk in cursor.written] == [10]
+    assert (conn.commits, conn.rollbacks) == (1, 1)
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.executor import UpstreamBusyError, UpstreamExecutor, UpstreamTimeoutError
+
+
+def make_executor(**kwargs):
+    params = dict(name="test", max_workers=4, default_limit=2, timeout=2.0, max_waiting=8)
+    params.update(kwargs)
+    return UpstreamExecutor(**params)
+
+
+def test_route_limit_bounds_concurrency():
+    executor = make_executor(default_limit=2)
+    lock = threading.Lock()
+    current = {"now": 0, "peak": 0}
+
+    def work(i):
+        with lock:
+            current["now"] += 1
+            current["peak"] = max(current["peak"], current["now"])
+        time.sleep(0.05)
+        with lock:
+            current["now"] -= 1
+        return i
+
+    async def main():
+        return await asyncio.gather(*(executor.run("history", work, i) for i in range(6)))
+
+    assert asyncio.run(main()) == list(range(6))
+    assert current["peak"] == 2
+    stats = executor.stats()["routes"]["history"]
+    assert stats["completed"] == 6
+    assert stats["active"] == 0 and stats["waiting"] == 0
+    executor.shutdown()
+
+
+def test_slow_route_does_not_block_other_routes():
+    executor = make_executor(default_limit=1, timeout=0.1)
+    release = threading.Event()
+
+    async def main():
+        slow = asyncio.ensure_future(executor.run("history", release.wait, 5))
+        fast = await executor.run("info", lambda: "ok")
+        with pytest.raises(UpstreamTimeoutError):
+            await slow
+        return fast
+
+    assert asyncio.run(main()) == "ok"
+    release.set()
+    assert executor.stats()["routes"]["history"]["timeouts"] == 1
+    executor.shutdown()
+
+
+def test_rejects_when_route_queue_is_full():
+    executor = make_executor(default_limit=1, max_waiting=1, timeout=1.0)
+    release = threading.Event()
+
+    async def main():
+        first = asyncio.ensure_future(executor.run("news", release.wait, 5))
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(executor.run("news", lambda: 2))
+        await asyncio.sleep(0.01)
+        with pytest.raises(UpstreamBusyError):
+            await executor.run("news", lambda: 3)
+        release.set()
+        return await first, await second
+
+    assert asyncio.run(main()) == (True, 2)
+    assert executor.stats()["routes"]["news"]["rejected"] == 1
+    executor.shutdown()
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.history_codec import HistoryCodecError, decode_history, encode_history, is_encoded_history
+from app.services.yahoo_service import YahooService
+
+
+def make_history(tz="Asia/Shanghai", rows=1300):
+    index = pd.date_range("2021-01-04", periods=rows, freq="B", tz=tz, name="Date")
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    return pd.DataFrame({
+        "Open": close + 0.5,
+        "High": close + 1.0,
+        "Low": close - 1.0,
+        "Close": close,
+        "Adj Close": close * 0.97,
+        "Volume": rng.integers(1_000, 5_000_000, rows),
+        "Dividends": 0.0,
+        "Stock Splits": 0.0
+    }, index=index)
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_roundtrip_preserves_values_and_timezone(compress):
+    df = make_history()
+    df.iloc[3, 0] = np.nan
+    payload = encode_history(df, meta={"symbol": "600519.SS"}, compress=compress)
+
+    assert is_encoded_history(payload)
+    decoded, meta = decode_history(payload)
+    pd.testing.assert_frame_equal(decoded, df, check_freq=False)
+    assert str(decoded.index.tz) == "Asia/Shanghai"
+    assert meta == {"symbol": "600519.SS"}
+
+
+def test_smaller_than_legacy_json():
+    df = make_history()
+    assert len(encode_history(df)) * 3 < len(df.to_json(orient="index", date_format="iso"))
+
+
+def test_rejects_unknown_version():
+    payload = bytearray(encode_history(make_history(rows=5)))
+    payload[4] = 99
+    with pytest.raises(HistoryCodecError):
+        decode_history(bytes(payload))
+
+
+def test_service_store_roundtrip():
+    df = make_history(tz="America/New_York", rows=20)
+    payload = YahooService._dump_history_cache(df, {"symbol": "AAPL"})
+    decoded, meta = YahooService._decode_history_store(payload, "America/New_York", "AAPL")
+
+    pd.testing.assert_frame_equal(decoded, df, check_freq=False)
+    assert meta == {"symbol": "AAPL"}
+    assert YahooService._decode_history_store(df.to_json(orient="index"), "America/New_York", "AAPL") == (None, {})
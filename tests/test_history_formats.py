@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import yahoo_service
+from app.services.google_service import GoogleService
+
+pa = pytest.importorskip("pyarrow")
+
+client = TestClient(app)
+
+
+class FakeTicker:
+    def __init__(self, symbol):
+        pass
+
+    def history(self, **kwargs):
+        index = pd.date_range("2026-10-16 09:30", periods=4, freq="1min", tz="America/New_York", name="Datetime")
+        return pd.DataFrame({
+            "Open": [1.0, 2.0, np.nan, 4.0], "High": 5.0, "Low": 0.5, "Close": [1.5, 2.5, 3.5, 4.5],
+            "Volume": [10, 20, 30, 40]
+        }, index=index)
+
+
+@pytest.fixture
+def yahoo_history(monkeypatch):
+    monkeypatch.setattr(yahoo_service.yf, "Ticker", FakeTicker)
+
+
+def post_yahoo(fmt):
+    return client.post("/api/v1/yahoo/history", json={
+        "stock_symbol": "AAPL", "exchange_acronym": "NASDAQ", "period": "1d", "interval": "1m", "format": fmt
+    })
+
+
+def test_yahoo_columnar_matches_records(yahoo_history):
+    records = post_yahoo("records").json()["data"]
+    columns = post_yahoo("columnar").json()["data"]
+
+    assert list(columns) == ["date", "open", "high", "low", "close", "adj_close", "volume"]
+    assert [dict(zip(columns, row)) for row in zip(*columns.values())] == records
+    assert columns["open"][2] is None
+
+
+def test_yahoo_arrow_stream(yahoo_history):
+    response = post_yahoo("arrow")
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 4
+    assert str(table.schema.field("date").type) == "timestamp[us, tz=America/New_York]"
+    assert table.column("volume").to_pylist() == [10, 20, 30, 40]
+
+
+def test_google_columnar_and_arrow(monkeypatch):
+    rows = [
+        {"date": "2026-10-15T16:00:00+00:00", "close": 10.0, "volume": 100},
+        {"date": "2026-10-16T16:00:00+00:00", "close": 11.0, "volume": None}
+    ]
+    async def get_history_async(cls, *args):
+        return rows
+
+    monkeypatch.setattr(GoogleService, "get_history_async", classmethod(get_history_async))
+    payload = {"symbol": "AAPL", "exchange": "NASDAQ", "range": "1mo"}
+
+    columnar = client.post("/api/v1/google/history", json={**payload, "format": "columnar"}).json()["data"]["data"]
+    assert columnar == {"date": [r["date"] for r in rows], "close": [10.0, 11.0], "volume": [100, None]}
+
+    response = client.post("/api/v1/google/history", json={**payload, "format": "arrow"})
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column("close").to_pylist() == [10.0, 11.0]
@@ -0,0 +1,108 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from app.services.yahoo_service import YahooService
+
+TZ = "America/New_York"
+
+
+class FakeTicker:
+    """Serves slices of a fixed daily series and records history() calls."""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.calls = []
+
+    def history(self, start=None, end=None, period=None, **kwargs):
+        # Stored and refetched bars must be comparable in the overlap check
+        assert kwargs.get("repair") is True
+        self.calls.append((start, end))
+        index = self.frame.index
+        mask = (index >= pd.Timestamp(start, tz=TZ)) & (index < pd.Timestamp(end, tz=TZ))
+        return self.frame[mask]
+
+
+def make_series(end="2026-10-16"):
+    index = pd.date_range("2021-06-01", end, freq="B", tz=TZ, name="Date")
+    close = np.linspace(100.0, 200.0, len(index))
+    return pd.DataFrame({
+        "Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+        "Adj Close": close * 0.98, "Volume": np.arange(len(index), dtype="int64")
+    }, index=index)
+
+
+def snapshot_for(frame, as_of, split=None):
+    as_of_ts = pd.Timestamp(as_of, tz=TZ)
+    upto = frame[frame.index <= as_of_ts]
+    return {
+        "info": {"lastSplitDate": split},
+        "tz_name": TZ,
+        "as_of_date": date.fromisoformat(as_of),
+        "hist_short": upto.iloc[-7:]
+    }
+
+
+def seed_store(frame, as_of):
+    ticker = FakeTicker(frame)
+    hist, payload = YahooService._refresh_history(ticker, "AAPL", snapshot_for(frame, as_of), None)
+    assert len(ticker.calls) == 1
+    return hist, payload
+
+
+def test_next_day_appends_tail_without_download():
+    frame = make_series()
+    _, payload = seed_store(frame, "2026-10-15")
+
+    ticker = FakeTicker(frame)
+    hist, new_payload = YahooService._refresh_history(ticker, "AAPL", snapshot_for(frame, "2026-10-16"), payload)
+
+    assert ticker.calls == []
+    assert new_payload is not None
+    assert hist.index[-1] == pd.Timestamp("2026-10-16", tz=TZ)
+    assert hist.index[0] >= pd.Timestamp(YahooService._history_window_start(date(2026, 10, 16)), tz=TZ)
+    assert not hist.index.duplicated().any()
+
+
+def test_unchanged_series_is_not_rewritten():
+    frame = make_series()
+    _, payload = seed_store(frame, "2026-10-16")
+    ticker = FakeTicker(frame)
+    _, new_payload = YahooService._refresh_history(ticker, "AAPL", snapshot_for(frame, "2026-10-16"), payload)
+    assert ticker.calls == [] and new_payload is None
+
+
+def test_gap_fetches_only_missing_tail():
+    frame = make_series()
+    _, payload = seed_store(frame, "2026-09-01")
+
+    ticker = FakeTicker(frame)
+    hist, _ = YahooService._refresh_history(ticker, "AAPL", snapshot_for(frame, "2026-10-16"), payload)
+
+    assert len(ticker.calls) == 1
+    assert ticker.calls[0][0] > date(2026, 8, 1)
+    assert hist.index[-1] == pd.Timestamp("2026-10-16", tz=TZ)
+    assert not hist.index.duplicated().any()
+
+
+def test_dividend_readjustment_triggers_full_refetch():
+    frame = make_series()
+    _, payload = seed_store(frame, "2026-10-15")
+
+    adjusted = frame.copy()
+    adjusted["Adj Close"] *= 0.99
+    ticker = FakeTicker(adjusted)
+    hist, _ = YahooService._refresh_history(ticker, "AAPL", snapshot_for(adjusted, "2026-10-16"), payload)
+
+    assert len(ticker.calls) == 1
+    assert ticker.calls[0][0] == YahooService._history_window_start(date(2026, 10, 16))
+    assert np.allclose(hist["Adj Close"], adjusted.loc[hist.index, "Adj Close"])
+
+
+def test_split_marker_change_triggers_full_refetch():
+    frame = make_series()
+    _, payload = seed_store(frame, "2026-10-15")
+    ticker = FakeTicker(frame)
+    YahooService._refresh_history(ticker, "AAPL", snapshot_for(frame, "2026-10-16", split=1790000000), payload)
+    assert len(ticker.calls) == 1
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core import http_client
+from app.core.config import settings
+from app.core.provider_guard import ProviderUnavailable, get_guard, reset_guards
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_RETRY_BACKOFF", 0)
+    http_client.close_sessions()
+    reset_guards()
+    yield http_client
+    http_client.close_sessions()
+    reset_guards()
+
+
+@pytest.fixture
+def server():
+    """Local HTTP/1.1 server answering with the queued statuses (then 200), recording client ports."""
+    seen = {"ports": [], "statuses": []}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            seen["ports"].append(self.client_address[1])
+            status = seen["statuses"].pop(0) if seen["statuses"] else 200
+            body = b"ok"
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}/", seen
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_one_session_per_provider_with_its_proxy(sessions, monkeypatch):
+    monkeypatch.setattr(settings, "PROXY_INVESTING", "http://proxy:8080")
+    monkeypatch.setattr(settings, "PROXY_TRADINGVIEW", None)
+
+    investing = sessions.get_session("investing")
+    assert sessions.get_session("investing") is investing
+    assert investing.proxies == {"http": "http://proxy:8080", "https": "http://proxy:8080"}
+    assert sessions.get_session("tradingview").proxies == {}
+
+
+def test_connections_are_reused_and_5xx_retried(sessions, server):
+    url, seen = server
+    session = sessions.get_session("tradingview")
+    session.trust_env = False  # ignore any proxy configured in the environment
+
+    for _ in range(3):
+        assert session.get(url).status_code == 200
+    assert len(set(seen["ports"])) == 1
+
+    seen["statuses"] = [503, 502]
+    assert session.get(url).status_code == 200
+
+    # 429 is left to the caller (rate limiting happens above the session)
+    seen["statuses"] = [429]
+    assert session.get(url).status_code == 429
+    assert sessions.session_stats()["tradingview"]["status"] == {"2xx": 4, "4xx": 1}
+
+
+def test_async_client_reuses_connections_and_retries_5xx(sessions, server, monkeypatch):
+    url, seen = server
+    monkeypatch.setattr(settings, "PROXY_GOOGLE", None)
+
+    async def main():
+        client = sessions.get_async_client("google")
+        statuses = [r.status_code for r in await asyncio.gather(*(client.request("GET", url) for _ in range(3)))]
+        seen["statuses"] = [503]
+        statuses.append((await client.request("GET", url)).status_code)
+        stats = client.stats()
+        await sessions.close_async_clients()
+        return statuses, stats
+
+    statuses, stats = asyncio.run(main())
+
+    assert statuses == [200, 200, 200, 200]
+    assert stats["retries"] == 1
+    assert stats["status"] == {"2xx": 4}
+    # Three concurrent requests at most open three connections; the retry reuses one of them
+    assert len(set(seen["ports"])) <= 3
+
+
+def test_throttling_slows_the_provider_down_and_opens_the_circuit(sessions, server, monkeypatch):
+    url, seen = server
+    monkeypatch.setattr(settings, "CIRCUIT_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "PROVIDER_RATE_LIMITS", {"investing": 50.0})
+    session = sessions.get_session("investing")
+    session.trust_env = False
+    guard = get_guard("investing")
+
+    seen["statuses"] = [429]
+    assert session.get(url).status_code == 429
+    assert guard.limiter.rate == 25.0
+    # One success does not reset the slowdown, it only starts the recovery
+    assert session.get(url).status_code == 200
+    assert guard.breaker.state == "closed"
+
+    seen["statuses"] = [429, 429]
+    session.get(url)
+    session.get(url)
+    requests_seen = len(seen["ports"])
+    with pytest.raises(ProviderUnavailable):
+        session.get(url)
+    assert len(seen["ports"]) == requests_seen  # failed fast, the server never saw it
+
+    stats = sessions.session_stats()["investing"]
+    assert stats["status"] == {"2xx": 1, "4xx": 3}
@@ -0,0 +1,34 @@
+import asyncio
+import time
+
+from app.services.investing_service import InvestingService
+
+RESPONSES = {
+    "us": {"quotes": [{"id": 1, "symbol": "AAPL", "description": "Apple Inc"}], "news": [{"title": "n"}]},
+    "cn": {"quotes": [{"id": 1, "description": "苹果"}, {"id": 2, "description": "other"}], "articles": [{"title": "a"}]},
+}
+
+
+def test_async_translations_fan_out_concurrently_and_match_sync(monkeypatch):
+    async def search_async(cls, keyword, country_code=None, filter_type=True):
+        await asyncio.sleep(0.2)
+        if country_code == "jp":
+            raise RuntimeError("blocked")
+        return RESPONSES[country_code]
+
+    def search(cls, keyword, country_code=None, filter_type=True):
+        if country_code == "jp":
+            raise RuntimeError("blocked")
+        return RESPONSES[country_code]
+
+    monkeypatch.setattr(InvestingService, "search_async", classmethod(search_async))
+    monkeypatch.setattr(InvestingService, "search", classmethod(search))
+
+    start = time.monotonic()
+    result = asyncio.run(InvestingService.get_translations_async("AAPL", ["cn", "jp"]))
+    assert time.monotonic() - start < 0.35
+
+    assert result["quotes"][0]["country_codes"] == [{"country_code": "cn", "description": "苹果"}]
+    assert [n["country_code"] for n in result["news"]] == ["us"]
+    assert [a["country_code"] for a in result["articles"]] == ["cn"]
+    assert result == InvestingService.get_translations("AAPL", ["cn", "jp"])
@@ -0,0 +1,46 @@
+from app.core.config import settings
+from app.services import investing_sync_service as module
+from app.services.investing_sync_service import PAGE_LIMIT, InvestingSyncService
+
+
+def make_row(pair_id, name, sector):
+    return {
+        "asset": {"pairID": pair_id, "uid": f"u{pair_id}", "ticker": f"T{pair_id}", "name": name},
+        "data": [{"value": "ex"}, {"value": sector}, {"value": f"{sector}-ind"}]
+    }
+
+
+def test_locales_merged_by_pair_id_and_written_in_chunks(monkeypatch):
+    total = 2 * PAGE_LIMIT + 30
+    # EN lacks the last 5 CN rows and has one extra row; order differs slightly between locales
+    cn_ids = list(range(1, total + 1))
+    en_ids = [i + 1 if i % 2 else i - 1 for i in range(2, total - 5 + 2)] + [9999]
+    requested = []
+
+    def fake_fetch(self, domain_id, market, exchange, skip, limit):
+        requested.append((domain_id, skip))
+        ids = cn_ids if domain_id == "cn" else en_ids
+        if domain_id == "cn":
+            return [make_row(i, f"名称{i}", "科技") for i in ids[skip:skip + limit]]
+        return [make_row(i, f"Name{i}", "Tech") for i in ids[skip:skip + limit]]
+
+    writes = []
+    monkeypatch.setattr(InvestingSyncService, "_fetch_page", fake_fetch)
+    monkeypatch.setattr(module.DBManager, "upsert_investing_batch", lambda items: writes.append(list(items)) or {"inserted": len(items), "updated": 0, "unchanged": 0})
+    monkeypatch.setattr(module, "get_all_exchanges", lambda: [{"acronym": "SSE", "country_code": "cn", "investing_code": "Shanghai"}])
+    monkeypatch.setattr(settings, "INVESTING_SYNC_WRITE_CHUNK", 50)
+
+    status = module.InvestingSyncService().start_sync_task()
+
+    items = [item for batch in writes for item in batch]
+    assert status.status == "Completed" and status.processed_count == total
+    assert sorted(item["investing_stock_pair_id"] for item in items) == cn_ids
+    assert all(len(batch) <= 50 for batch in writes)
+
+    by_id = {item["investing_stock_pair_id"]: item for item in items}
+    assert by_id[7]["name_cn"] == "名称7" and by_id[7]["name_en"] == "Name7"
+    assert by_id[7]["investing_sector_en"] == "Tech" and by_id[7]["investing_industry_cn"] == "科技-ind"
+    assert by_id[total]["name_en"] is None
+    assert by_id[total]["tradingview_full_stock_symbol"] == f"SSE:T{total}"
+    # Both locales stop after their short page
+    assert ("cn", 2 * PAGE_LIMIT) in requested and ("us", 2 * PAGE_LIMIT) in requested
@@ -0,0 +1,79 @@
+import pytest
+
+from yfinance.exceptions import YFRateLimitError
+
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.provider_guard import reset_guards
+from app.services import yahoo_service
+from app.services.yahoo_service import YahooService
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    calls = []
+
+    def fetch_quotes(symbols):
+        calls.append(list(symbols))
+        if "BOOM" in symbols:
+            raise RuntimeError("429")
+        if "LIMIT" in symbols:
+            raise YFRateLimitError()
+        return {s.upper(): {"symbol": s.upper(), "regularMarketPrice": float(len(s)), "regularMarketTime": 1700000000}
+                for s in symbols if s != "GONE"}
+
+    monkeypatch.setattr(YahooService, "_fetch_quotes", staticmethod(fetch_quotes))
+    monkeypatch.setattr(settings, "YAHOO_QUOTE_BATCH_SIZE", 2)
+    get_cache("quote").clear()
+    reset_guards()
+    yield calls
+    get_cache("quote").clear()
+    reset_guards()
+
+
+def test_misses_are_fetched_in_chunks_and_cached(upstream):
+    prices = YahooService.get_latest_prices(["AAPL", "MSFT", "NVDA", "AAPL", "GONE"])
+
+    assert upstream == [["AAPL", "MSFT"], ["NVDA", "GONE"]]
+    assert set(prices) == {"AAPL", "MSFT", "NVDA"}
+    assert prices["NVDA"]["current_price"] == 4.0
+
+    # Second refresh: cached symbols cost nothing, unknown ones are asked again
+    YahooService.get_latest_prices(["AAPL", "MSFT", "NVDA", "GONE"])
+    assert upstream[2:] == [["GONE"]]
+
+
+def test_failed_chunk_only_drops_its_symbols(upstream):
+    prices = YahooService.get_latest_prices(["BOOM", "AAPL", "MSFT"])
+    assert set(prices) == {"MSFT"}
+
+
+def test_batch_resolves_symbols_and_keeps_request_order(upstream, monkeypatch):
+    monkeypatch.setattr(yahoo_service, "get_stock_info", lambda symbol, acronym, platform:
+                        {"stock_symbol": f"{symbol}.SS"} if acronym == "SSE" else None)
+    items = [{"stock_symbol": "GONE", "exchange_acronym": "NASDAQ"},
+             {"stock_symbol": "601933", "exchange_acronym": "SSE"},
+             {"stock_symbol": "AAPL", "exchange_acronym": "NASDAQ"}]
+
+    result = YahooService.get_batch_latest_price(items)
+
+    assert [r["symbol"] for r in result] == ["GONE", "601933", "AAPL"]
+    assert [r["stock_symbol"] for r in result] == ["GONE", "601933.SS", "AAPL"]
+    assert [r.get("current_price") for r in result] == [None, 9.0, 4.0]
+    assert upstream == [["GONE", "601933.SS"], ["AAPL"]]
+
+
+def test_open_circuit_serves_expired_quotes(upstream, monkeypatch):
+    monkeypatch.setattr(settings, "CIRCUIT_FAILURE_THRESHOLD", 1)
+    monkeypatch.setattr(settings, "PROVIDER_THROTTLE_HOLD", 0)
+    cache = get_cache("quote")
+    monkeypatch.setattr(cache, "ttl", 0)
+    YahooService.get_latest_prices(["AAPL", "MSFT"])
+
+    # Yahoo throttles: the circuit opens, later chunks fail fast and fall back to the expired entries
+    assert YahooService.get_latest_prices(["LIMIT"]) == {}
+    prices = YahooService.get_latest_prices(["AAPL", "MSFT", "NVDA"])
+
+    assert upstream == [["AAPL", "MSFT"], ["LIMIT"]]
+    assert set(prices) == {"AAPL", "MSFT"}
+    assert prices["AAPL"]["current_price"] == 4.0
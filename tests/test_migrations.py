@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+
+import pymysql
+import pytest
+
+from app.core.config import settings
+from app.core.migrations import MIGRATIONS, run_migrations
+
+
+class FakeCursor:
+    """Records statements; answers the migrations-table and information_schema lookups."""
+
+    def __init__(self, applied=(), indexes=()):
+        self.applied = list(applied)
+        self.indexes = set(indexes)
+        self.statements = []
+        self._result = []
+
+    def execute(self, sql, args=None):
+        self.statements.append(" ".join(sql.split()))
+        if "information_schema.STATISTICS" in sql:
+            self._result = [{"cnt": int(tuple(args) in self.indexes)}]
+        elif sql.startswith("SELECT version"):
+            self._result = [{"version": v} for v in self.applied]
+        elif sql.startswith("INSERT IGNORE"):
+            self.applied.append(args[0])
+
+    def fetchone(self):
+        return self._result[0]
+
+    def fetchall(self):
+        return self._result
+
+
+def test_pending_migrations_run_in_order_and_are_recorded():
+    calls = []
+    migrations = [
+        (2, "second", lambda cursor: calls.append(2)),
+        (1, "first", lambda cursor: calls.append(1)),
+        (3, "third", lambda cursor: calls.append(3)),
+    ]
+    cursor = FakeCursor(applied=[2])
+
+    assert run_migrations(cursor, migrations) == [1, 3]
+    assert calls == [1, 3]
+    assert cursor.applied == [2, 1, 3]
+    # Second start: nothing left to do
+    assert run_migrations(cursor, migrations) == []
+
+
+def test_failing_migration_stops_the_run():
+    def broken(cursor):
+        raise RuntimeError("boom")
+
+    later = []
+    cursor = FakeCursor()
+    applied = run_migrations(cursor, [(1, "broken", broken), (2, "later", lambda c: later.append(2))])
+
+    assert applied == []
+    assert later == []
+    assert cursor.applied == []
+
+
+def test_listing_indexes_skip_existing_ones():
+    cursor = FakeCursor(indexes={("fast_finance_tradingview_stock", "idx_exchange_create_time")})
+    run_migrations(cursor, MIGRATIONS[:1])
+
+    created = [s for s in cursor.statements if s.startswith("CREATE INDEX")]
+    assert created == ["CREATE INDEX idx_create_time ON fast_finance_tradingview_stock (create_time)"]
+
+
+# --- Query plans (needs the configured MySQL; skipped when it is unreachable) ---
+
+@pytest.fixture
+def mysql_cursor():
+    try:
+        conn = pymysql.connect(
+            host=settings.MYSQL_SERVER, port=settings.MYSQL_PORT, user=settings.MYSQL_USER,
+            password=settings.MYSQL_PASSWORD, database=settings.MYSQL_DB, charset='utf8mb4',
+            cursorclass=pymysql.cursors.DictCursor, connect_timeout=3
+        )
+    except Exception as e:
+        pytest.skip(f"MySQL not reachable: {e}")
+    cursor = conn.cursor()
+    yield cursor
+    conn.close()
+
+
+def _scratch_copy(cursor, table: str) -> str:
+    # Same DDL and indexes as the real table, gone when the connection closes
+    from app.core.database import DBManager
+    DBManager.init_tradingview_table(cursor)
+    DBManager.init_investing_table(cursor)
+    DBManager.init_yahoo_stock_table(cursor)
+    run_migrations(cursor)
+    scratch = f"tmp_{table}"
+    cursor.execute(f"CREATE TEMPORARY TABLE {scratch} LIKE {table}")
+    return scratch
+
+
+def _plan(cursor, sql, args):
+    cursor.execute("EXPLAIN " + sql, args)
+    return cursor.fetchone()
+
+
+@pytest.mark.parametrize("table, key_column, key", [
+    ("fast_finance_tradingview_stock", "tradingview_full_stock_symbol", lambda i: f"EX{i % 20}:S{i}"),
+    ("fast_finance_investing_stock", "investing_stock_pair_id", lambda i: i),
+])
+def test_listing_queries_use_indexes(mysql_cursor, table, key_column, key):
+    scratch = _scratch_copy(mysql_cursor, table)
+    now = datetime.now().replace(microsecond=0)
+    # 20 exchanges, create_time spread over ~3 months
+    mysql_cursor.executemany(
+        f"INSERT INTO {scratch} ({key_column}, exchange_acronym, create_time) VALUES (%s, %s, %s)",
+        [(key(i), f"EX{i % 20}", now - timedelta(hours=i)) for i in range(2000)]
+    )
+    mysql_cursor.execute(f"ANALYZE TABLE {scratch}")
+    mysql_cursor.fetchall()
+
+    since = now - timedelta(days=2)
+    plans = {
+        "exchange": _plan(mysql_cursor, f"SELECT * FROM {scratch} WHERE 1=1 AND exchange_acronym = %s", ("EX3",)),
+        "exchange+since": _plan(mysql_cursor, f"SELECT * FROM {scratch} WHERE 1=1 AND exchange_acronym = %s AND create_time >= %s", ("EX3", since)),
+        "since": _plan(mysql_cursor, f"SELECT * FROM {scratch} WHERE 1=1 AND create_time >= %s", (since,)),
+    }
+    for name, plan in plans.items():
+        assert plan["type"] != "ALL", f"{name}: full scan {plan}"
+    assert plans["exchange"]["key"] == "idx_exchange_create_time"
+    assert plans["exchange+since"]["key"] == "idx_exchange_create_time"
+    assert plans["since"]["key"] == "idx_create_time"
+
+
+def test_yahoo_symbol_lookup_uses_unique_key(mysql_cursor):
+    scratch = _scratch_copy(mysql_cursor, "fast_finance_yahoo_stock")
+    mysql_cursor.executemany(
+        f"INSERT INTO {scratch} (yahoo_stock_symbol, exchange_acronym) VALUES (%s, %s)",
+        [(f"S{i}.X", f"EX{i % 20}") for i in range(2000)]
+    )
+    mysql_cursor.execute(f"ANALYZE TABLE {scratch}")
+    mysql_cursor.fetchall()
+
+    plan = _plan(mysql_cursor, f"SELECT * FROM {scratch} WHERE yahoo_stock_symbol IN (%s, %s, %s)", ("S1.X", "S2.X", "S3.X"))
+    assert plan["type"] != "ALL"
+    assert plan["key"] == "yahoo_stock_symbol"
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.ohlcv_serializer import DATE_DAY, DATE_EPOCH, DATE_ISO, columns_to_records, ohlcv_columns
+
+
+def make_frame(tz, freq="D", periods=400, start="2025-01-01"):
+    index = pd.date_range(start, periods=periods, freq=freq, tz=tz, name="Date")
+    rng = np.random.default_rng(3)
+    close = 100 + rng.normal(0, 1, periods).cumsum()
+    df = pd.DataFrame({
+        "Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+        "Adj Close": close * 0.9, "Volume": rng.integers(0, 10_000, periods)
+    }, index=index)
+    df.iloc[5, df.columns.get_loc("Close")] = np.nan
+    df["Volume"] = df["Volume"].astype("float64")
+    df.iloc[7, df.columns.get_loc("Volume")] = np.nan
+    return df
+
+
+def legacy_history_records(df):
+    """The iterrows() serializer previously used by YahooService.get_history."""
+    df = df.reset_index()
+    date_col = "Date" if "Date" in df.columns else "Datetime"
+    result = []
+    for _, row in df.iterrows():
+        result.append({
+            "date": row[date_col].isoformat(),
+            "open": row.get("Open") if pd.notna(row.get("Open")) else None,
+            "high": row.get("High") if pd.notna(row.get("High")) else None,
+            "low": row.get("Low") if pd.notna(row.get("Low")) else None,
+            "close": row.get("Close") if pd.notna(row.get("Close")) else None,
+            "adj_close": row.get("Adj Close") if pd.notna(row.get("Adj Close")) else None,
+            "volume": int(row.get("Volume")) if pd.notna(row.get("Volume")) else 0
+        })
+    return result
+
+
+@pytest.mark.parametrize("tz,freq", [
+    ("America/New_York", "D"),      # crosses both DST transitions
+    ("Asia/Kolkata", "D"),          # +05:30
+    ("America/New_York", "5min"),
+    (None, "D"),
+])
+def test_records_match_legacy_iterrows(tz, freq):
+    df = make_frame(tz, freq)
+    assert columns_to_records(ohlcv_columns(df)) == legacy_history_records(df)
+
+
+def test_missing_adj_close_column():
+    df = make_frame("UTC", periods=10).drop(columns=["Adj Close"]).iloc[:3]
+    records = columns_to_records(ohlcv_columns(df))
+    assert [r["adj_close"] for r in records] == [None, None, None]
+
+
+def test_batch_shape_newest_first():
+    df = make_frame("Asia/Shanghai", periods=10)
+    columns = ohlcv_columns(
+        df, date_fields={"date_raw": DATE_ISO, "date": DATE_DAY, "date_timestamp": DATE_EPOCH},
+        volume_na=None, newest_first=True
+    )
+    last = df.index[-1]
+    assert list(columns)[:3] == ["date_raw", "date", "date_timestamp"]
+    assert columns["date_raw"][0] == last.isoformat()
+    assert columns["date"][0] == last.strftime("%Y-%m-%d")
+    assert columns["date_timestamp"][0] == int(last.timestamp())
+    assert columns["volume"][9 - 7] is None
+    assert all(len(v) == 10 for v in columns.values())
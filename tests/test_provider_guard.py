@@ -0,0 +1,113 @@
+import time
+from email.utils import formatdate
+
+import pytest
+
+from app.core.config import settings
+from app.core.provider_guard import CircuitBreaker, ProviderUnavailable, get_guard, parse_retry_after, reset_guards
+from app.core.rate_limiter import AdaptiveRateLimiter
+
+
+@pytest.fixture
+def guards(monkeypatch):
+    monkeypatch.setattr(settings, "CIRCUIT_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "CIRCUIT_RESET_TIMEOUT", 0.2)
+    reset_guards()
+    yield get_guard
+    reset_guards()
+
+
+def test_limiter_slows_down_on_throttling_and_recovers():
+    limiter = AdaptiveRateLimiter(10.0, burst=2, min_rate=1.0, hold=5.0)
+    assert limiter.reserve() == 0 and limiter.reserve() == 0
+    assert limiter.reserve() == pytest.approx(0.1, abs=0.01)
+
+    limiter = AdaptiveRateLimiter(10.0, burst=2, min_rate=1.0, hold=5.0)
+    limiter.throttled(retry_after=2.0)
+    assert limiter.rate == 5.0
+    # Paused until Retry-After, then one token at the reduced rate
+    assert limiter.reserve() == pytest.approx(2.0 + 0.2, abs=0.02)
+    assert limiter.reserve(max_wait=1.0) is None
+
+    for _ in range(5):
+        limiter.throttled(retry_after=0)
+    assert limiter.rate == 1.0
+    for _ in range(100):
+        limiter.success()
+    assert limiter.rate == 10.0
+    assert limiter.stats()["throttled"] == 6
+
+
+def test_breaker_opens_fails_fast_and_probes_once():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert breaker.record_failure() is True
+    assert not breaker.allow()
+
+    time.sleep(0.12)
+    assert breaker.allow()        # the probe
+    assert not breaker.allow()    # everyone else waits for it
+    breaker.record_failure()      # failed probe re-opens
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.12)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    assert breaker.stats()["opened"] == 2
+
+
+def test_retry_after_formats():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(formatdate(time.time() + 30, usegmt=True)) == pytest.approx(30, abs=2)
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_guard_call_trips_on_throttle_errors_only(guards):
+    class RateLimited(Exception):
+        pass
+
+    guard = guards("yahoo")
+
+    def fail(exc):
+        raise exc
+
+    for _ in range(3):
+        with pytest.raises(KeyError):
+            guard.call(fail, KeyError("symbol"), throttle_errors=(RateLimited,))
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+    guard.limiter.hold = 0
+    for _ in range(2):
+        with pytest.raises(RateLimited):
+            guard.call(fail, RateLimited(), throttle_errors=(RateLimited,))
+    with pytest.raises(ProviderUnavailable) as exc_info:
+        guard.call(lambda: "never called")
+    assert exc_info.value.data["provider"] == "yahoo"
+    assert guard.stats()["state"] == "open"
+
+
+def test_yfinance_calls_fail_fast_while_yahoo_is_tripped(guards, monkeypatch):
+    from app.services import yahoo_service
+    from app.services.yahoo_service import YahooService
+
+    calls = []
+
+    class FakeTicker:
+        def __init__(self, symbol):
+            self.ticker = symbol
+
+        def history(self, **kwargs):
+            calls.append(kwargs)
+            raise AssertionError("Yahoo must not be called while the circuit is open")
+
+    monkeypatch.setattr(yahoo_service.yf, "Ticker", FakeTicker)
+    guard = guards("yahoo")
+    guard.breaker.record_failure()
+    guard.breaker.record_failure()
+
+    with pytest.raises(ProviderUnavailable):
+        YahooService.get_history("AAPL", "1mo", "1d")
+    assert calls == []
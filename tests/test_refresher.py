@@ -0,0 +1,92 @@
+import threading
+import time
+from datetime import timedelta
+
+from app.core.refresher import BackgroundRefresher
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert predicate()
+
+
+def test_one_refresh_per_key_and_cooldown():
+    refresher = BackgroundRefresher("test", max_workers=2, max_pending=10, jitter=0.0, cooldown=60)
+    release = threading.Event()
+    calls = []
+
+    def refresh(key):
+        calls.append(key)
+        release.wait(2)
+
+    assert refresher.schedule("a", refresh, "a")
+    assert not refresher.schedule("a", refresh, "a")
+    assert refresher.schedule("b", refresh, "b")
+    release.set()
+    wait_for(lambda: refresher.stats()["completed"] == 2)
+
+    # Recently attempted: not rescheduled until the cooldown has passed
+    assert not refresher.schedule("a", refresh, "a")
+    stats = refresher.stats()
+    assert sorted(calls) == ["a", "b"]
+    assert stats["deduplicated"] == 1 and stats["cooled_down"] == 1
+    refresher.shutdown()
+
+
+def test_pending_bound_and_failures():
+    refresher = BackgroundRefresher("test", max_workers=1, max_pending=1, jitter=0.0, cooldown=0)
+    release = threading.Event()
+
+    def block():
+        release.wait(2)
+
+    def fail():
+        raise RuntimeError("scrape failed")
+
+    assert refresher.schedule("running", block)
+    wait_for(lambda: refresher.stats()["running"] == 1)
+    assert refresher.schedule("queued", fail)
+    assert not refresher.schedule("dropped", block)
+    release.set()
+    wait_for(lambda: refresher.stats()["failed"] == 1)
+    assert refresher.stats()["rejected"] == 1
+    refresher.shutdown()
+
+
+def test_is_stale_jitter_only_shortens_max_age():
+    refresher = BackgroundRefresher("test", max_workers=1, max_pending=1, jitter=0.5, cooldown=0)
+    day = timedelta(days=1)
+    assert all(refresher.is_stale(day + timedelta(seconds=1), day) for _ in range(50))
+    assert not any(refresher.is_stale(timedelta(hours=11), day) for _ in range(50))
+
+
+def test_analysis_cache_is_served_stale_and_refreshed_in_background(monkeypatch):
+    import json
+    from datetime import datetime
+
+    from app.services import yahoo_service
+    from app.services.yahoo_service import YahooService
+
+    rows = {
+        "FRESH": {"data": json.dumps({"targetMean": 1}), "updated_at": datetime.now()},
+        "STALE": {"data": json.dumps({"targetMean": 2}), "updated_at": datetime.now() - timedelta(days=3)}
+    }
+    fetched, upserted, scheduled = [], {}, []
+
+    def fetch(symbol):
+        fetched.append(symbol)
+        return {"targetMean": 3}
+
+    monkeypatch.setattr(yahoo_service.DBManager, "get_analysis_cache", staticmethod(rows.get))
+    monkeypatch.setattr(yahoo_service.DBManager, "upsert_analysis_cache", staticmethod(upserted.__setitem__))
+    monkeypatch.setattr(YahooService, "_fetch_analysis", staticmethod(fetch))
+    monkeypatch.setattr(yahoo_service.cache_refresher, "schedule", lambda key, fn, *args: scheduled.append(key))
+
+    assert YahooService.get_analysis("FRESH") == {"targetMean": 1}
+    assert YahooService.get_analysis("STALE") == {"targetMean": 2}
+    assert scheduled == [("analysis", "STALE")] and fetched == []
+
+    assert YahooService.get_analysis("NEW") == {"targetMean": 3}
+    assert fetched == ["NEW"] and json.loads(upserted["NEW"]) == {"targetMean": 3}
@@ -0,0 +1,62 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from app.services.returns_engine import RETURN_WINDOWS, compute_returns, compute_returns_batch, window_anchors
+
+
+def make_history(tz, start="2020-01-01", end="2026-10-16", seed=0):
+    index = pd.date_range(start, end, freq="B", tz=tz, name="Date")
+    prices = 50 + np.cumsum(np.random.default_rng(seed).normal(0, 1, len(index))).clip(-40)
+    return pd.DataFrame({"Adj Close": prices}, index=index)
+
+
+def reference_returns(hist, end_price, as_of_date):
+    """The per-anchor boolean mask approach the engine replaces."""
+    returns, ranges = {}, {}
+    for key, anchor in window_anchors(as_of_date).items():
+        sub = hist[hist.index.date <= anchor]
+        returns[key], ranges[key] = None, None
+        if sub.empty:
+            continue
+        p0 = float(sub.iloc[-1]["Adj Close"])
+        if p0:
+            returns[key] = end_price / p0 - 1
+            ranges[key] = f"{sub.index[-1].date().isoformat()}:{as_of_date.isoformat()}"
+    return returns, ranges
+
+
+@pytest.mark.parametrize("tz", ["America/New_York", "Asia/Shanghai", "UTC"])
+def test_matches_reference(tz):
+    hist = make_history(tz)
+    as_of = date(2026, 10, 16)
+    assert compute_returns(hist, 123.0, as_of) == reference_returns(hist, 123.0, as_of)
+
+
+def test_anchor_on_weekend_uses_previous_bar():
+    hist = make_history("America/New_York")
+    # 2025-12-31 is a Wednesday; 2023-07-16 (3Y before 2026-07-16) is a Sunday
+    returns, ranges = compute_returns(hist, 100.0, date(2026, 7, 16))
+    assert ranges["YTD"].startswith("2025-12-31:")
+    assert ranges["3Y"].startswith("2023-07-14:")
+
+
+def test_batch_keeps_order_and_isolates_symbols():
+    as_of = date(2026, 10, 16)
+    short = make_history("Asia/Shanghai", start="2025-01-01", seed=1)
+    full = make_history("America/New_York", seed=2)
+    results = compute_returns_batch([(short, 10.0, as_of), (None, 5.0, as_of), (full, 20.0, as_of)])
+
+    assert results[0] == reference_returns(short, 10.0, as_of)
+    assert results[0][0]["3Y"] is None and results[0][0]["5Y"] is None
+    assert results[1] == ({k: None for k in RETURN_WINDOWS}, {k: None for k in RETURN_WINDOWS})
+    assert results[2] == reference_returns(full, 20.0, as_of)
+
+
+def test_missing_end_price_or_column():
+    hist = make_history("UTC")
+    assert compute_returns(hist, None, date(2026, 1, 5))[0]["1Y"] is None
+    assert compute_returns(hist.rename(columns={"Adj Close": "Close"}), 1.0, date(2026, 1, 5))[0]["1Y"] is None
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+
+from app.core.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(2)
+        return {"rows": [1, 2]}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", fetch))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    while flight.stats()["coalesced"] < 4:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{"rows": [1, 2]}] * 5
+    # Followers get their own copy
+    assert len({id(r) for r in results}) == 5
+    assert flight.stats()["in_flight"] == 0
+
+    # Nothing is cached after completion
+    flight.do("k", fetch)
+    assert len(calls) == 2
+
+
+def test_error_is_shared_and_key_released():
+    flight = SingleFlight("test")
+    started = threading.Event()
+    release = threading.Event()
+
+    def boom():
+        started.set()
+        release.wait(2)
+        raise ValueError("upstream down")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("k", boom)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(2)
+    follower = threading.Thread(target=call)
+    follower.start()
+    while flight.stats()["coalesced"] < 1:
+        time.sleep(0.01)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert errors == ["upstream down", "upstream down"]
+    assert flight.do("k", lambda: 1) == 1
+
+
+def test_async_callers_share_one_call_and_its_error():
+    flight = AsyncSingleFlight("test")
+    calls = []
+
+    async def fetch(fail):
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        if fail:
+            raise RuntimeError("upstream down")
+        return {"rows": [1, 2]}
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("k", fetch, False) for _ in range(5)))
+        errors = await asyncio.gather(*(flight.do("e", fetch, True) for _ in range(3)), return_exceptions=True)
+        return results, errors
+
+    results, errors = asyncio.run(main())
+
+    assert len(calls) == 2
+    assert results == [{"rows": [1, 2]}] * 5
+    assert len({id(r) for r in results}) == 5
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert flight.stats() == {"calls": 8, "executed": 2, "coalesced": 6, "errors": 1, "in_flight": 0}
@@ -0,0 +1,58 @@
+import logging
+
+from app.core.config import settings
+from app.core.sql_instrumentation import fingerprint, record_statement, sql_stats
+
+
+def test_fingerprint():
+    assert fingerprint("SELECT data, create_time FROM fast_finance_yahoo_analysis_cache WHERE symbol = %s") == \
+        "SELECT fast_finance_yahoo_analysis_cache"
+    assert fingerprint("\n  INSERT INTO fast_finance_stock_history_cache (cache_key) VALUES (%s)") == \
+        "INSERT fast_finance_stock_history_cache"
+    assert fingerprint(b"INSERT INTO t (a) VALUES (1),(2)") == "INSERT t"
+    assert fingerprint("CREATE TABLE IF NOT EXISTS fast_finance_job_logs (id INT)") == "CREATE fast_finance_job_logs"
+    assert fingerprint("SET time_zone = '+08:00'") == "SET"
+
+
+def test_histogram_and_lazy_truncated_log(caplog, monkeypatch):
+    sql_stats.reset()
+    monkeypatch.setattr(settings, "SQL_LOG_LEVEL", "INFO")
+    monkeypatch.setattr(settings, "SQL_LOG_MAX_ARG_LENGTH", 20)
+    query = "INSERT INTO fast_finance_stock_history_cache (cache_key, data, data_bin) VALUES (%s, %s, %s)"
+
+    with caplog.at_level(logging.INFO, logger="fastapi.sql"):
+        record_statement(query, ("AAPL_1d", "x" * 10000, b"\0" * 5000), 3.0)
+        record_statement(query, ("MSFT_1d", None, None), 40.0, error=True)
+
+    message = caplog.records[0].getMessage()
+    assert "<5000 bytes>" in message
+    assert "more chars>" in message and len(message) < 400
+    assert caplog.records[1].getMessage().endswith("(failed)")
+
+    stats = sql_stats.snapshot()["INSERT fast_finance_stock_history_cache"]
+    assert stats["count"] == 2 and stats["errors"] == 1
+    assert stats["buckets"]["le_5ms"] == 1 and stats["buckets"]["le_50ms"] == 1
+
+
+def test_disabled_level_skips_formatting_but_slow_statements_log(caplog, monkeypatch):
+    rendered = []
+
+    class Spy:
+        def __repr__(self):
+            rendered.append(1)
+            return "spy"
+
+    monkeypatch.setattr(settings, "SQL_LOG_LEVEL", "DEBUG")
+    monkeypatch.setattr(settings, "SQL_LOG_SLOW_MS", 100.0)
+    with caplog.at_level(logging.INFO, logger="fastapi.sql"):
+        record_statement("SELECT 1 FROM t", (Spy(),), 1.0)
+        assert rendered == [] and not caplog.records
+        record_statement("SELECT 1 FROM t", (Spy(),), 250.0)
+    assert caplog.records[0].levelno == logging.WARNING
+
+    monkeypatch.setattr(settings, "SQL_LOG_LEVEL", "INFO")
+    monkeypatch.setattr(settings, "SQL_LOG_SAMPLE_RATE", 0.0)
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger="fastapi.sql"):
+        record_statement("SELECT 1 FROM t", None, 1.0)
+    assert not caplog.records
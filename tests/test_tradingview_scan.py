@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.tradingview import core
+from app.services.tradingview.core import TradingView, get_multiple_analysis_async
+
+SYMBOLS = ["NASDAQ:AAPL", "NASDAQ:MSFT", "nasdaq:aapl", "NYSE:IBM", "NASDAQ:NVDA", "NYSE:KO"]
+
+
+def _rows(payload):
+    return [{"s": t, "d": [1.0] * len(TradingView.indicators)} for t in payload["symbols"]["tickers"]]
+
+
+@pytest.fixture
+def scanner(monkeypatch):
+    """Fake scanner: records ticker chunks, fails as scripted per first ticker, tracks concurrency."""
+    monkeypatch.setattr(settings, "TRADINGVIEW_SCAN_CHUNK_SIZE", 2)
+    monkeypatch.setattr(settings, "TRADINGVIEW_SCAN_CONCURRENCY", 3)
+    monkeypatch.setattr(settings, "HTTP_RETRY_BACKOFF", 0)
+    state = {"chunks": [], "failures": {}, "active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def begin(payload):
+        tickers = payload["symbols"]["tickers"]
+        with lock:
+            state["chunks"].append(tickers)
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            remaining = state["failures"].get(tickers[0], 0)
+            if remaining:
+                state["failures"][tickers[0]] = remaining - 1
+        return remaining
+
+    def end():
+        with lock:
+            state["active"] -= 1
+
+    async def scan_async(scan_url, payload):
+        failing = begin(payload)
+        try:
+            await asyncio.sleep(0.1)
+            if failing:
+                raise httpx.ReadTimeout("read timeout")
+            return _rows(payload)
+        finally:
+            end()
+
+    monkeypatch.setattr(TradingView, "scan_async", staticmethod(scan_async))
+    return state
+
+
+def test_symbols_are_chunked_dispatched_concurrently_and_merged(scanner):
+    start = time.monotonic()
+    result = asyncio.run(get_multiple_analysis_async("america", "1d", SYMBOLS))
+
+    assert time.monotonic() - start < 0.25
+    assert scanner["peak"] == 3
+    assert sorted(scanner["chunks"]) == [["NASDAQ:AAPL", "NASDAQ:MSFT"], ["NYSE:IBM", "NASDAQ:NVDA"], ["NYSE:KO"]]
+    assert set(result) == {"NASDAQ:AAPL", "NASDAQ:MSFT", "NYSE:IBM", "NASDAQ:NVDA", "NYSE:KO"}
+    assert result["NYSE:KO"].symbol == "KO"
+
+
+def test_failed_chunks_are_retried_then_left_empty(scanner, monkeypatch):
+    monkeypatch.setattr(settings, "TRADINGVIEW_SCAN_CHUNK_RETRIES", 1)
+    scanner["failures"] = {"NASDAQ:AAPL": 1, "NYSE:IBM": 5}
+
+    result = asyncio.run(get_multiple_analysis_async("america", "1d", SYMBOLS))
+
+    # AAPL/MSFT recovered on retry; IBM's chunk gave up after one retry
+    assert [c for c in scanner["chunks"] if c[0] == "NASDAQ:AAPL"] == [["NASDAQ:AAPL", "NASDAQ:MSFT"]] * 2
+    assert [c for c in scanner["chunks"] if c[0] == "NYSE:IBM"] == [["NYSE:IBM", "NASDAQ:NVDA"]] * 2
+    assert result["NASDAQ:MSFT"] is not None and result["NYSE:KO"] is not None
+    assert result["NYSE:IBM"] is None and result["NASDAQ:NVDA"] is None
+
+
+def test_all_chunks_failing_raises(scanner, monkeypatch):
+    monkeypatch.setattr(settings, "TRADINGVIEW_SCAN_CHUNK_RETRIES", 0)
+    scanner["failures"] = {"NASDAQ:AAPL": 1, "NASDAQ:NVDA": 1}
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(get_multiple_analysis_async("america", "1d", ["NASDAQ:AAPL", "NYSE:IBM", "NASDAQ:NVDA", "NYSE:KO"]))
+
+
+def _http_error(status):
+    request = httpx.Request("POST", "https://scanner.tradingview.com/america/scan")
+    response = httpx.Response(status, request=request)
+    return httpx.HTTPStatusError(f"{status}", request=request, response=response)
+
+
+def test_only_timeouts_and_429_are_retried_at_chunk_level():
+    assert core._retryable(httpx.ReadTimeout("read timeout"))
+    assert core._retryable(_http_error(429))
+    # 5xx and connection errors were already retried by the client; 4xx and malformed bodies will not get better
+    assert not core._retryable(_http_error(503))
+    assert not core._retryable(httpx.ConnectError("connection reset"))
+    assert not core._retryable(ConnectionResetError())
+    assert not core._retryable(_http_error(400))
+    assert not core._retryable(KeyError("data"))
+    assert not core._retryable(ValueError("Expecting value"))
+    assert not core._retryable(core.ProviderUnavailable("tradingview", "circuit open"))
@@ -0,0 +1,40 @@
+import threading
+
+from app.core.config import settings
+from app.services import tradingview_sync_service as module
+from app.services.tradingview_sync_service import RANGE_SIZE, tradingview_sync_service
+
+
+def test_pipeline_fetches_all_exchanges_and_batches_writes(monkeypatch):
+    sizes = {"NASDAQ": RANGE_SIZE + 5, "HKEX": 3}
+    requested = []
+    lock = threading.Lock()
+
+    def fake_fetch(self, exchange, range_start, range_end, ipo_offer_date_type=None):
+        with lock:
+            requested.append((exchange, range_start))
+        total = sizes.get(exchange, 0)
+        rows = [
+            {"s": f"{exchange}:S{i}", "d": [{"name": f"S{i}", "exchange": exchange}] + [None] * 22 + [86400]}
+            for i in range(range_start, min(range_end, total))
+        ]
+        return {"data": rows, "totalCount": total}
+
+    writes = []
+    monkeypatch.setattr(module.TradingViewSyncService, "_fetch_from_tradingview", fake_fetch)
+    monkeypatch.setattr(module.DBManager, "init_tradingview_table", lambda: None)
+    monkeypatch.setattr(module.DBManager, "cleanup_tradingview_duplicates", lambda: 0)
+    monkeypatch.setattr(module.DBManager, "upsert_tradingview_batch", lambda items: writes.append(list(items)) or {"inserted": len(items), "updated": 0, "unchanged": 0})
+    monkeypatch.setattr(module, "EXCHANGE_MAPPING", [{"acronym": "NASDAQ"}, {"acronym": "HKEX"}])
+    monkeypatch.setattr(settings, "TRADINGVIEW_SYNC_WRITE_BATCH", 500)
+
+    status = tradingview_sync_service.start_sync_task()
+
+    rows = [row for batch in writes for row in batch]
+    assert len(rows) == sizes["NASDAQ"] + sizes["HKEX"]
+    assert all(len(batch) <= RANGE_SIZE + 500 for batch in writes)
+    assert ("NASDAQ", RANGE_SIZE) in requested
+    assert rows[0]["ipo_offer_date"] == "1970-01-02"
+    assert status.status == "Completed" and not status.is_running
+    assert status.processed_count == len(rows)
+    assert status.total_count == sizes["NASDAQ"] + sizes["HKEX"]
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+
+from app.core import constants
+from app.core.config import settings
+from app.services import yahoo_sync_service
+from app.services.yahoo_sync_service import YahooSyncService, _AdaptivePageSize
+
+
+def test_exchanges_synced_concurrently_and_all_pages_written(monkeypatch):
+    exchanges = [
+        {"country_code": "US", "yahoo_exchange_code": "NMS", "acronym": "NASDAQ", "usd_rate": 1.0},
+        {"country_code": "HK", "yahoo_exchange_code": "HKG", "acronym": "HKEX", "usd_rate": 0.1},
+        {"country_code": "", "yahoo_exchange_code": "XXX", "acronym": "SKIP"}
+    ]
+    rows_per_exchange = 230
+    lock = threading.Lock()
+    active = {"now": 0, "peak": 0}
+    failed_once = set()
+
+    def fake_screen(query, size, sortField, sortAsc, offset):
+        exchange = query.to_dict()["operands"][1]["operands"][0]["operands"][1]
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        try:
+            time.sleep(0.02)
+            if exchange == "HKG" and offset == 0 and exchange not in failed_once:
+                failed_once.add(exchange)
+                raise RuntimeError("429")
+            end = min(offset + size, rows_per_exchange)
+            quotes = [{"symbol": f"{exchange}{i}.X", "shortName": f"name {i}", "marketCap": 10} for i in range(offset, end)]
+            return {"quotes": quotes, "total": rows_per_exchange}
+        finally:
+            with lock:
+                active["now"] -= 1
+
+    written = []
+    monkeypatch.setattr(yahoo_sync_service.yf, "screen", fake_screen)
+    monkeypatch.setattr(constants, "get_all_exchanges", lambda: exchanges)
+    monkeypatch.setattr(yahoo_sync_service.DBManager, "upsert_yahoo_stock_batch", lambda batch: written.extend(batch) or {"inserted": len(batch), "updated": 0, "unchanged": 0})
+    real_sleep = asyncio.sleep
+    monkeypatch.setattr(yahoo_sync_service.asyncio, "sleep", lambda s: real_sleep(0))
+
+    asyncio.run(YahooSyncService.sync_all_stocks())
+
+    symbols = {row["yahoo_stock_symbol"] for row in written}
+    assert len(written) == 2 * rows_per_exchange
+    assert len(symbols) == 2 * rows_per_exchange
+    assert {row["exchange_acronym"] for row in written} == {"NASDAQ", "HKEX"}
+    assert active["peak"] == 2
+    assert not YahooSyncService.is_running()
+
+
+def test_failing_exchange_does_not_stop_the_others(monkeypatch):
+    exchanges = [
+        {"country_code": "US", "yahoo_exchange_code": "NMS", "acronym": "NASDAQ", "usd_rate": 1.0},
+        {"country_code": "HK", "yahoo_exchange_code": "HKG", "acronym": "HKEX", "usd_rate": 0.1}
+    ]
+
+    def fake_screen(query, size, sortField, sortAsc, offset):
+        exchange = query.to_dict()["operands"][1]["operands"][0]["operands"][1]
+        quotes = [{"symbol": f"{exchange}{i}.X", "shortName": f"name {i}"} for i in range(10)]
+        return {"quotes": quotes, "total": 10}
+
+    to_stock = YahooSyncService._quote_to_stock
+
+    def broken_for_hkex(q, ex):
+        if ex["acronym"] == "HKEX":
+            raise ValueError("unexpected quote format")
+        return to_stock(q, ex)
+
+    written = []
+    monkeypatch.setattr(yahoo_sync_service.yf, "screen", fake_screen)
+    monkeypatch.setattr(constants, "get_all_exchanges", lambda: exchanges)
+    monkeypatch.setattr(YahooSyncService, "_quote_to_stock", staticmethod(broken_for_hkex))
+    monkeypatch.setattr(yahoo_sync_service.DBManager, "upsert_yahoo_stock_batch", lambda batch: written.extend(batch) or {"inserted": len(batch), "updated": 0, "unchanged": 0})
+
+    asyncio.run(YahooSyncService.sync_all_stocks())
+
+    assert len(written) == 10
+    assert {row["exchange_acronym"] for row in written} == {"NASDAQ"}
+    assert not YahooSyncService.is_running()
+
+
+def test_adaptive_page_size():
+    pager = _AdaptivePageSize(100, 25, 250, target_latency=1.0)
+    pager.on_success(0.1)
+    assert pager.size == 150
+    pager.on_success(0.1)
+    pager.on_success(0.1)
+    assert pager.size == 250
+    pager.on_success(5.0)
+    assert pager.size == 125
+    for _ in range(5):
+        pager.on_error()
+    assert pager.size == 25
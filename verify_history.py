@@ -1,3 +1,4 @@
+import asyncio
 import sys
 import os
 
@@ -30,7 +31,7 @@ def test_history_toggle():
     items = [{"stock_symbol": "AAPL", "exchange_acronym": "NASDAQ"}]
     
     print("--- Test 1: is_return_history = True ---")
-    results_true = YahooService.get_batch_stock_base_data(items, is_return_history=True)
+    results_true = asyncio.run(YahooService.get_batch_stock_base_data_async(items, is_return_history=True))
     if results_true:
         hist = results_true[0].get("history")
         if hist and len(hist) > 0:
@@ -41,7 +42,7 @@ def test_history_toggle():
         print("FAIL: No results")
 
     print("\n--- Test 2: is_return_history = False ---")
-    results_false = YahooService.get_batch_stock_base_data(items, is_return_history=False)
+    results_false = asyncio.run(YahooService.get_batch_stock_base_data_async(items, is_return_history=False))
     if results_false:
         hist = results_false[0].get("history")
         if hist is None: